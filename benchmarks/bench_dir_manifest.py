@@ -0,0 +1,70 @@
+"""
+ディレクトリ・マニフェスト検証のベンチマーク。
+
+一時ディレクトリにランダムな内容の出力ファイル群を作成し、以下の時間を比較する。
+  - ファイルごとに全体を読み込んでハッシュ（従来の file_content を並べた場合に相当）
+  - dir_manifest のチャンク読み込み＋スレッドプール並列ハッシュ
+  - ハッシュキャッシュが効く2回目以降の検証
+Windows不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_dir_manifest.py
+    python benchmarks/bench_dir_manifest.py --files 200 --size-mb 5 --workers 8
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import dir_manifest
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def read_whole(root, names):
+    return {name: hashlib.sha256(open(os.path.join(root, name), 'rb').read()).hexdigest() for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=60)
+    parser.add_argument('--size-mb', type=float, default=2.0)
+    parser.add_argument('--workers', type=int, default=dir_manifest.DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_manifest_')
+    try:
+        names = [f"export_{i:04d}.csv" for i in range(args.files)]
+        for name in names:
+            with open(os.path.join(root, name), 'wb') as f:
+                f.write(os.urandom(int(args.size_mb * 1024 * 1024)))
+        manifest_path = os.path.join(root, 'manifest.json')
+        expected = dir_manifest.write_manifest(root, manifest_path, exclude=['manifest.json'])
+        print(f"{args.files} files x {args.size_mb} MB, workers={args.workers}, cpus={os.cpu_count()}")
+
+        measure("read whole file + sha256 (serial)", lambda: read_whole(root, names))
+        dir_manifest.hash_cache.clear()
+        measure("chunked sha256, 1 worker", lambda: dir_manifest.compare_directory(
+            root, expected, exclude=['manifest.json'], workers=1))
+        dir_manifest.hash_cache.clear()
+        result = measure(f"chunked sha256, {args.workers} workers", lambda: dir_manifest.compare_directory(
+            root, expected, exclude=['manifest.json'], workers=args.workers))
+        measure("cached (unchanged files)", lambda: dir_manifest.compare_directory(
+            root, expected, exclude=['manifest.json'], workers=args.workers))
+        assert not (result['missing'] or result['extra'] or result['changed']), result
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
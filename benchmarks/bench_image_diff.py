@@ -0,0 +1,71 @@
+"""
+画像比較（image_match）のベンチマーク。
+
+1080p の合成画像に小さな変化を加え、image_diff.compare_images の比較時間と
+ヒートマップ生成時間を測定する。PIL Image からの配列変換を含む時間と、
+配列同士の比較のみの時間を分けて表示する。Windows不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_image_diff.py
+    python benchmarks/bench_image_diff.py --width 3840 --height 2160 --tolerance 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from PIL import Image
+
+from src.utils.image_diff import compare_images, render_heatmap
+
+
+def build_pair(width, height, seed=0):
+    """基準画像と、一部の領域を変更した比較画像を生成"""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    changed = base.copy()
+    changed[100:140, 200:500] = 255
+    changed[height - 30:, :] ^= 4  # タスクバーの時計のような軽微な変化
+    return Image.fromarray(base), Image.fromarray(changed)
+
+
+def measure(label, func, repeat):
+    func()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<32} {elapsed * 1000:8.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--tolerance', type=int, default=8)
+    args = parser.parse_args()
+
+    baseline, actual = build_pair(args.width, args.height)
+    masks = [[0, args.height - 30, args.width, args.height]]
+    print(f"Image: {args.width}x{args.height}")
+
+    result = measure("compare PIL (tolerance=0)", lambda: compare_images(actual, baseline), args.repeat)
+    print(f"  -> {result.summary()}")
+    actual_arr, baseline_arr = np.asarray(actual), np.asarray(baseline)
+    measure("compare arrays (tolerance=0)", lambda: compare_images(actual_arr, baseline_arr), args.repeat)
+    result = measure(f"compare (tolerance={args.tolerance})",
+                     lambda: compare_images(actual, baseline, tolerance=args.tolerance), args.repeat)
+    print(f"  -> {result.summary()}")
+    result = measure("compare (tolerance=0, masked)",
+                     lambda: compare_images(actual, baseline, mask_regions=masks), args.repeat)
+    print(f"  -> {result.summary()}")
+    measure("render_heatmap", lambda: render_heatmap(actual, result), max(1, args.repeat // 4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+画像テンプレートマッチング・ロケーターのベンチマーク。
+
+合成スクリーンショットから切り出したボタン画像を image_locator.TemplateMatcher で探索し、
+全解像度のNCC・ピラミッド探索・ピラミッド＋ROI の時間を比較する。
+比較対象として、偽UIツリー上の descendants() 走査（UIA経由の探索の模擬）の時間も測定する。
+Windows不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_image_locator.py
+    python benchmarks/bench_image_locator.py --call-delay 0.0005
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from fake_ui_tree import FakeElement, build_fake_tree
+from src.utils.image_locator import TemplateMatch, TemplateMatcher, ncc_map, to_gray_array
+
+
+def build_screenshot(width, height, seed=0):
+    """ウィンドウ・文字列風の模様・ボタンを含む合成スクリーンショットを生成"""
+    rng = np.random.default_rng(seed)
+    screen = np.full((height, width, 3), (0, 99, 177), dtype=np.uint8)
+    screen[60:height - 100, 80:width - 80] = 250
+    for y in range(90, height - 140, 18):
+        x = 100
+        while x < width - 160:
+            w = int(rng.integers(10, 60))
+            screen[y:y + 9, x:x + w] = rng.integers(0, 80, 3)
+            x += w + 8
+    # 探索対象のボタン（枠とラベル）
+    bx, by = width - 300, height - 160
+    screen[by:by + 32, bx:bx + 110] = (225, 225, 225)
+    screen[by, bx:bx + 110] = screen[by + 31, bx:bx + 110] = 90
+    screen[by:by + 32, bx] = screen[by:by + 32, bx + 109] = 90
+    screen[by + 12:by + 20, bx + 25:bx + 85:3] = 20
+    template = screen[by - 4:by + 36, bx - 4:bx + 114].copy()
+    return screen, template, (bx - 4, by - 4)
+
+
+def measure(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<32} {elapsed * 1000:10.2f} ms  -> {result}")
+    return result
+
+
+def full_resolution(screen_gray, template_gray, width, height):
+    scores = ncc_map(screen_gray, template_gray)
+    y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+    return TemplateMatch(int(x), int(y), width, height, float(scores[y, x]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--call-delay', type=float, default=0.0005,
+                        help="UIA探索の模擬で1呼び出しごとに待機する秒数")
+    args = parser.parse_args()
+
+    screen, template, expected = build_screenshot(args.width, args.height)
+    screen_gray = to_gray_array(screen)
+    matcher = TemplateMatcher(template)
+    th, tw = template.shape[:2]
+    roi = [args.width // 2, args.height // 2, args.width, args.height]
+    print(f"Screen: {args.width}x{args.height}, template: {tw}x{th}, pyramid levels: {matcher.levels}, "
+          f"expected at {expected}")
+
+    measure("NCC full resolution", lambda: full_resolution(screen_gray, matcher.templates[0], tw, th), args.repeat)
+    found = measure("NCC pyramid", lambda: matcher.find(screen_gray), args.repeat)
+    measure("NCC pyramid + ROI", lambda: matcher.find(screen_gray, roi=roi), args.repeat)
+    assert found and (found.left, found.top) == expected, f"unexpected match: {found}"
+
+    # UIA経由の探索の模擬: 深いツリーを descendants() で列挙してから名前で絞り込む
+    root = FakeElement("App", control_type="Window")
+    root.add(build_fake_tree(depth=4, breadth=6, root_type="Pane"))
+    root.add(FakeElement("OK", control_type="Button"))
+    FakeElement.call_delay = args.call_delay
+    measure(f"UIA descendants (delay={args.call_delay}s)", lambda: next(
+        b for b in root.descendants(control_type="Button") if b.window_text() == "OK"), 1)
+
+
+if __name__ == '__main__':
+    main()
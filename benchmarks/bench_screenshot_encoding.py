@@ -0,0 +1,80 @@
+"""
+スクリーンショット保存形式のベンチマーク。
+
+デスクトップ風の合成画像（単色の広い領域・ウィンドウ枠・文字風の細かい模様）を
+PNG（圧縮レベル別）・可逆WebP・JPEG（品質別）で保存し、エンコード時間とサイズを比較する。
+MaxDimension による縮小の効果も測定する。Windows不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_screenshot_encoding.py
+    python benchmarks/bench_screenshot_encoding.py --width 2560 --height 1440 --max-dimension 1280
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image, ImageDraw, features
+
+from src.utils.screenshot import build_save_options, prepare_image
+
+
+def build_desktop_image(width, height, seed=0):
+    """ウィンドウと文字列を模した合成スクリーンショットを生成"""
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), (0, 99, 177))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        left, top = rng.randrange(0, width // 2), rng.randrange(0, height // 2)
+        right, bottom = left + rng.randrange(width // 4, width // 2), top + rng.randrange(height // 4, height // 2)
+        draw.rectangle((left, top, right, bottom), fill=(255, 255, 255), outline=(120, 120, 120))
+        draw.rectangle((left, top, right, top + 30), fill=(240, 240, 240))
+        for y in range(top + 40, bottom - 12, 18):
+            x = left + 10
+            while x < right - 40:
+                word = rng.randrange(10, 60)
+                draw.rectangle((x, y, x + word, y + 9), fill=(rng.randrange(60), rng.randrange(60), rng.randrange(60)))
+                x += word + 8
+    draw.rectangle((0, height - 40, width, height), fill=(32, 32, 32))
+    return image
+
+
+def measure(label, image, filename, repeat, max_dimension=None, **overrides):
+    options = build_save_options(filename, **overrides)
+    image_format = {'.png': 'PNG', '.webp': 'WEBP', '.jpg': 'JPEG'}[os.path.splitext(filename)[1]]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        buf = io.BytesIO()
+        prepare_image(image, filename, max_dimension).save(buf, format=image_format, **options)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  {buf.tell() / 1024:10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-dimension', type=int, default=1280)
+    args = parser.parse_args()
+
+    image = build_desktop_image(args.width, args.height)
+    print(f"Image: {args.width}x{args.height}, raw {len(image.tobytes()) / 1024:.0f} KiB")
+
+    for level in (1, 6, 9):
+        measure(f"png compress_level={level}", image, 'x.png', args.repeat, png_compress_level=level)
+    if features.check('webp'):
+        measure("webp lossless", image, 'x.webp', args.repeat)
+    else:
+        print("webp lossless                (WebP support not available in this Pillow build)")
+    for quality in (60, 85, 95):
+        measure(f"jpeg quality={quality}", image, 'x.jpg', args.repeat, jpeg_quality=quality)
+    measure(f"png level=6 max={args.max_dimension}", image, 'x.png', args.repeat, max_dimension=args.max_dimension)
+
+
+if __name__ == '__main__':
+    main()
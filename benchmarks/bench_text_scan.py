@@ -0,0 +1,77 @@
+"""
+大きなテキストファイル検証（text_scan）のベンチマーク。
+
+一時ファイルにログ風のテキストを書き出し、以下の時間を比較する。
+  - ファイル全体を読み込んで検証（従来の validate_text_file に相当）
+  - text_scan のチャンク読み込み（exact / contains / regex）
+改行が LF / CRLF / CR のいずれでも、結果がテキストモードで全体を読んだ場合と一致することも確認する。
+Windows不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_text_scan.py
+    python benchmarks/bench_text_scan.py --size-mb 200 --chunk-kb 256
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import text_scan
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def read_whole(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=20.0)
+    parser.add_argument('--chunk-kb', type=int, default=text_scan.DEFAULT_CHUNK_SIZE // 1024)
+    args = parser.parse_args()
+    chunk_size = args.chunk_kb * 1024
+
+    lines = [f"2024-01-01 00:00:{i % 60:02d} INFO 処理 {i} 件目を完了しました" for i in range(200)]
+    block = '\n'.join(lines) + '\n'
+    repeat = max(1, int(args.size_mb * 1024 * 1024 // len(block.encode('utf-8'))))
+    expected = block * repeat + 'END line1\nline2\n'
+    checks = [
+        ('contains (single line)', lambda p: text_scan.find_text(p, 'END line1', chunk_size=chunk_size)[0]),
+        ('contains (across lines)', lambda p: text_scan.find_text(p, 'line1\nline2', chunk_size=chunk_size)[0]),
+        ('regex ^line2$', lambda p: text_scan.search_regex(p, r'(?m)^line2$', chunk_size=chunk_size)[0]),
+        ('exact', lambda p: text_scan.compare_exact(p, expected, chunk_size=chunk_size) is None),
+    ]
+
+    root = tempfile.mkdtemp(prefix='bench_text_scan_')
+    try:
+        for label, newline in (('LF', '\n'), ('CRLF', '\r\n'), ('CR', '\r')):
+            path = os.path.join(root, f"{label}.log")
+            with open(path, 'wb') as f:
+                f.write(expected.replace('\n', newline).encode('utf-8'))
+            print(f"{label}: {os.path.getsize(path) / 1024 / 1024:.1f} MB, chunk={args.chunk_kb} KB")
+
+            content = measure("read whole file (text mode)", lambda: read_whole(path))
+            baseline = ['END line1' in content, 'line1\nline2' in content,
+                        re.search(r'(?m)^line2$', content) is not None, content == expected]
+            del content
+            for (name, check), want in zip(checks, baseline):
+                got = measure(f"text_scan {name}", lambda: check(path))
+                assert got == want, f"{label} {name}: text_scan={got}, whole file={want}"
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
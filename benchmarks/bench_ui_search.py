@@ -0,0 +1,80 @@
+"""
+UIツリー探索のベンチマーク。
+
+descendants() で全ボタンを列挙してからテキスト比較する従来方式と、
+ui_search.find_descendant による幅優先・早期終了探索を偽ツリー上で比較する。
+Windows/UIA不要のため Linux でも実行可能。
+
+実行例:
+    python benchmarks/bench_ui_search.py
+    python benchmarks/bench_ui_search.py --depth 5 --breadth 6 --call-delay 0.0001
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_ui_tree import FakeElement, build_fake_tree
+from src.utils.ui_search import find_descendant, text_contains
+
+
+def descendants_scan(root, needles):
+    """従来方式: 全ボタンを列挙してから順にテキストを比較"""
+    for btn in root.descendants(control_type="Button"):
+        text = btn.window_text()
+        if any(n in text for n in needles):
+            return btn
+    return None
+
+
+def build_dialog_tree(depth, breadth):
+    """深いエディタ領域と浅い保存ダイアログを持つ偽ウィンドウを構築"""
+    root = FakeElement("無題 - メモ帳", control_type="Window")
+    root.add(build_fake_tree(depth=depth, breadth=breadth, root_type="Document"))
+    dialog = root.add(FakeElement("名前を付けて保存", control_type="Window"))
+    pane = dialog.add(FakeElement("", control_type="Pane"))
+    pane.add(FakeElement("保存(S)", control_type="Button"))
+    pane.add(FakeElement("キャンセル", control_type="Button"))
+    return root
+
+
+def measure(label, func, repeat):
+    FakeElement.reset_calls()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    calls = FakeElement.calls // repeat
+    print(f"{label:<28} {elapsed * 1000:10.3f} ms  {calls:8d} calls  -> {result}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--breadth', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--call-delay', type=float, default=0.0,
+                        help="1呼び出しごとの待機秒数（プロセス間呼び出しの模擬）")
+    args = parser.parse_args()
+
+    root = build_dialog_tree(args.depth, args.breadth)
+    needles = ["キャンセル", "Cancel"]
+    FakeElement.call_delay = args.call_delay
+
+    print(f"Tree: depth={args.depth}, breadth={args.breadth}, call_delay={args.call_delay}s")
+    expected = measure("descendants() + filter", lambda: descendants_scan(root, needles), args.repeat)
+    actual = measure("find_descendant (BFS)", lambda: find_descendant(
+        root, text_contains(*needles), control_type="Button"), args.repeat)
+    measure("find_descendant (pruned)", lambda: find_descendant(
+        root, text_contains(*needles), control_type="Button", skip_control_types=["Document"]), args.repeat)
+    measure("find_descendant (depth=3)", lambda: find_descendant(
+        root, text_contains(*needles), control_type="Button", max_depth=3), args.repeat)
+
+    assert actual is expected, "find_descendant returned a different element"
+
+
+if __name__ == '__main__':
+    main()
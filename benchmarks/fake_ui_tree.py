@@ -0,0 +1,113 @@
+"""
+pywinauto wrapper を模した偽のUIツリー実装。
+Windows/UIAが無い環境（Linux CI等）で、ツリー探索ロジックの正しさと
+速度をベンチマークするために使用する。
+各メソッド呼び出しはプロセス間呼び出しを模して calls に計上され、
+call_delay を指定すると1呼び出しごとに待機する。
+"""
+import time
+from typing import List, Optional
+
+
+class FakeElementInfo:
+    """pywinauto の element_info を模したクラス"""
+
+    def __init__(self, control_type: str = "Pane", class_name: str = "", automation_id: str = "", name: str = ""):
+        self.control_type = control_type
+        self.class_name = class_name
+        self.automation_id = automation_id
+        self.name = name
+
+
+class FakeElement:
+    """pywinauto の UIA wrapper を模したクラス"""
+
+    calls = 0
+    call_delay = 0.0
+
+    def __init__(self,
+                 text: str = "",
+                 control_type: str = "Pane",
+                 class_name: str = "",
+                 automation_id: str = "",
+                 children: Optional[List["FakeElement"]] = None,
+                 rectangle: Optional[tuple] = None):
+        self._text = text
+        self._children = list(children or [])
+        self._rectangle = rectangle or (0, 0, 0, 0)
+        self.element_info = FakeElementInfo(control_type, class_name, automation_id, text)
+
+    @classmethod
+    def _call(cls):
+        cls.calls += 1
+        if cls.call_delay:
+            time.sleep(cls.call_delay)
+
+    @classmethod
+    def reset_calls(cls):
+        cls.calls = 0
+
+    def add(self, child: "FakeElement") -> "FakeElement":
+        self._children.append(child)
+        return child
+
+    def children(self, control_type: Optional[str] = None) -> List["FakeElement"]:
+        self._call()
+        if control_type:
+            return [c for c in self._children if c.element_info.control_type == control_type]
+        return list(self._children)
+
+    def descendants(self, control_type: Optional[str] = None) -> List["FakeElement"]:
+        """pywinautoと同様に、全子孫を深さ優先で列挙してから返す"""
+        self._call()
+        result = []
+        stack = list(reversed(self._children))
+        while stack:
+            elem = stack.pop()
+            if not control_type or elem.element_info.control_type == control_type:
+                result.append(elem)
+            stack.extend(reversed(elem._children))
+        return result
+
+    def window_text(self) -> str:
+        self._call()
+        return self._text
+
+    def rectangle(self) -> tuple:
+        self._call()
+        return self._rectangle
+
+    def wrapper_object(self) -> "FakeElement":
+        return self
+
+    def exists(self, timeout: float = 0) -> bool:
+        return True
+
+    def __repr__(self):
+        return f"FakeElement({self._text!r}, {self.element_info.control_type})"
+
+
+def build_fake_tree(depth: int = 4, breadth: int = 6, leaf_type: str = "Button", root_type: str = "Window") -> FakeElement:
+    """
+    均等な分岐数を持つ偽ツリーを構築する。
+
+    Args:
+        depth (int): ツリーの深さ
+        breadth (int): 各ノードの子の数
+        leaf_type (str): 最下層要素のコントロールタイプ
+        root_type (str): ルート要素のコントロールタイプ
+
+    Returns:
+        FakeElement: ルート要素
+    """
+    root = FakeElement("root", control_type=root_type)
+    level = [root]
+    for d in range(1, depth + 1):
+        next_level = []
+        for p_idx, parent in enumerate(level):
+            for c_idx in range(breadth):
+                control_type = leaf_type if d == depth else "Pane"
+                child = parent.add(FakeElement(f"{control_type}-{d}-{p_idx}-{c_idx}", control_type=control_type))
+                next_level.append(child)
+        level = next_level
+    return root
@@ -6,3 +6,4 @@ from .screenshot_action import ScreenshotAction
 from .web_actions import WebAction
 from .excel_actions import ExcelAction
 from .debug_action import DebugAction
+from .wait_action import WaitAction
@@ -5,13 +5,16 @@ Provides debugging utilities for UI automation development:
 - List all desktop windows
 - List descendants of a page object
 - Check for specific dialog classes
+- Query and diff captured UI tree snapshots
 """
-import importlib
 import logging
+import os
 from typing import Dict, Any, List
 from pywinauto import Desktop
 from src.core.execution.actions.base_action import BaseAction
 from src.core.execution.actions.action_dispatcher import ActionDispatcher
+from src.utils.element_resolver import resolve_target
+from src.utils.ui_snapshot import UISnapshot, format_diff, format_node
 
 
 class DebugAction(BaseAction):
@@ -22,8 +25,13 @@ class DebugAction(BaseAction):
     - list_desktop_windows: List all top-level desktop windows
     - list_descendants: List all descendants of a page element
     - check_dialog: Check if a dialog with specific class exists
+    - query_snapshot: Query a previously captured UI snapshot without walking the live tree
+    - diff_snapshots: Compare two UI snapshots (e.g. before/after a dialog opens)
     """
     
+    # Named snapshots captured by earlier debug steps (shared across steps)
+    _snapshots: Dict[str, UISnapshot] = {}
+    
     def __init__(self, context):
         super().__init__(context)
         self.logger = logging.getLogger(__name__)
@@ -40,6 +48,12 @@ class DebugAction(BaseAction):
         elif action == 'check_dialog':
             self._check_dialog(params)
         
+        elif action == 'query_snapshot':
+            self._query_snapshot(params)
+        
+        elif action == 'diff_snapshots':
+            self._diff_snapshots(params)
+        
         else:
             raise ValueError(f"Unknown debug action: {action}")
     
@@ -50,6 +64,8 @@ class DebugAction(BaseAction):
         Params:
             filter (str, optional): Filter windows by title (partial match)
             control_type (str, optional): Filter by control type
+            snapshot (str, optional): Keep the captured snapshot under this name for query_snapshot/diff_snapshots
+            save_path (str, optional): Save the captured snapshot to this file
         """
         title_filter = params.get('filter', '')
         control_type_filter = params.get('control_type', '')
@@ -58,26 +74,14 @@ class DebugAction(BaseAction):
         print("\n=== Desktop Windows ===")
         
         desktop = Desktop(backend='uia')
-        windows = desktop.windows()
+        snapshot = UISnapshot.capture(desktop.windows(), max_depth=0)
+        self._store_snapshot(snapshot, params)
         
-        for w in windows:
-            try:
-                title = w.window_text()
-                control_type = w.element_info.control_type
-                class_name = w.element_info.class_name
-                
-                # Apply filters
-                if title_filter and title_filter.lower() not in title.lower():
-                    continue
-                if control_type_filter and control_type_filter != control_type:
-                    continue
-                
-                if title:  # Only show windows with titles
-                    msg = f"  [{title}] control_type={control_type}, class={class_name}"
-                    self.logger.info(msg)
-                    print(msg)
-            except Exception as e:
-                self.logger.debug(f"Error reading window: {e}")
+        for node in snapshot.query(control_type=control_type_filter, text_contains=title_filter):
+            if node['text']:  # Only show windows with titles
+                msg = f"  [{node['text']}] control_type={node['control_type']}, class={node['class_name']}"
+                self.logger.info(msg)
+                print(msg)
         
         print("=== End Desktop Windows ===\n")
         self.logger.info("=== End Desktop Windows ===")
@@ -90,7 +94,11 @@ class DebugAction(BaseAction):
             target (str): Page object path (e.g., "notepad_page.NotepadPage" or "notepad_page.NotepadPage.window")
             filter (str, optional): Filter elements by text (partial match)
             control_type (str, optional): Filter by control type
-            depth (int, optional): Maximum depth to traverse (default: unlimited)
+            depth (int, optional): Maximum number of elements to show (default: unlimited).
+                Unless the snapshot is kept or saved, the tree walk stops once this many elements matched.
+            max_depth (int, optional): Maximum tree depth to capture (default: unlimited)
+            snapshot (str, optional): Keep the captured snapshot under this name for query_snapshot/diff_snapshots
+            save_path (str, optional): Save the captured snapshot to this file
         """
         target = params.get('target')
         text_filter = params.get('filter', '')
@@ -100,73 +108,43 @@ class DebugAction(BaseAction):
         if not target:
             raise ValueError("'target' is required for list_descendants action")
         
-        # Parse target: "module.Class" or "module.Class.property"
-        parts = target.split('.')
-        if len(parts) < 2:
-            raise ValueError(f"Invalid target format '{target}'. Expected 'module.Class' or 'module.Class.property'")
+        # "module.Class" targets default to the page's window
+        element = resolve_target(target, default_member='window')
         
-        module_name = parts[0]
-        class_name = parts[1]
-        property_name = parts[2] if len(parts) >= 3 else 'window'
+        self.logger.info(f"=== Descendants of {target} ===")
+        print(f"\n=== Descendants of {target} ===")
         
+        # Capture the tree once and answer the filters from the snapshot index
         try:
-            # Dynamic import
-            module = importlib.import_module(f"src.pages.{module_name}")
-            page_class = getattr(module, class_name)
-            page_instance = page_class()
+            wrapper = element.wrapper_object()
+            # A kept/saved snapshot needs the whole tree; otherwise stop at the output limit
+            limit = int(max_depth) if max_depth and not (params.get('snapshot') or params.get('save_path')) else None
+            needle = text_filter.lower() if text_filter else None
             
-            # Get the element
-            element = getattr(page_instance, property_name)
+            def shown(node):
+                return (node['depth'] >= 1
+                        and (not control_type_filter or node['control_type'] == control_type_filter)
+                        and (not needle or needle in node['text'].lower()))
             
-            self.logger.info(f"=== Descendants of {target} ===")
-            print(f"\n=== Descendants of {target} ===")
+            snapshot = UISnapshot.capture(wrapper, max_depth=params.get('max_depth'), predicate=shown, limit=limit)
+            self._store_snapshot(snapshot, params)
             
-            # Get wrapper and list descendants
-            try:
-                wrapper = element.wrapper_object()
-                descendants = wrapper.descendants()
-                
-                count = 0
-                for desc in descendants:
-                    try:
-                        text = desc.window_text()
-                        control_type = desc.element_info.control_type
-                        class_name_elem = desc.element_info.class_name
-                        
-                        # Apply filters
-                        if text_filter and text_filter.lower() not in text.lower():
-                            continue
-                        if control_type_filter and control_type_filter != control_type:
-                            continue
-                        
-                        msg = f"  [{text}] control_type={control_type}, class={class_name_elem}"
-                        self.logger.info(msg)
-                        print(msg)
-                        count += 1
-                        
-                        if max_depth and count >= max_depth:
-                            print(f"  ... (showing first {max_depth} elements)")
-                            break
-                            
-                    except Exception as e:
-                        self.logger.debug(f"Error reading descendant: {e}")
-                
-                summary = f"Total: {len(descendants)} elements" + (f" (filtered to {count})" if text_filter or control_type_filter else "")
-                print(summary)
-                self.logger.info(summary)
-                
-            except Exception as e:
-                error_msg = f"Error getting descendants: {e}"
-                self.logger.error(error_msg)
-                print(error_msg)
+            nodes = snapshot.query(control_type=control_type_filter, text_contains=text_filter, min_depth=1)
+            count = self._print_nodes(nodes, max_depth)
             
-            print(f"=== End Descendants ===\n")
-            self.logger.info("=== End Descendants ===")
+            truncated = limit is not None and count >= limit
+            summary = (f"Total: {len(snapshot) - 1}{'+' if truncated else ''} elements"
+                       + (f" (filtered to {count})" if text_filter or control_type_filter else ""))
+            print(summary)
+            self.logger.info(summary)
             
-        except ImportError as e:
-            raise ImportError(f"Could not import page module 'src.pages.{module_name}': {e}")
-        except AttributeError as e:
-            raise AttributeError(f"Could not find '{property_name}' on '{class_name}': {e}")
+        except Exception as e:
+            error_msg = f"Error getting descendants: {e}"
+            self.logger.error(error_msg)
+            print(error_msg)
+        
+        print(f"=== End Descendants ===\n")
+        self.logger.info("=== End Descendants ===")
     
     def _check_dialog(self, params: Dict[str, Any]):
         """
@@ -222,6 +200,111 @@ class DebugAction(BaseAction):
         
         print("=== End Dialog Check ===\n")
         self.logger.info("=== End Dialog Check ===")
+    
+    def _query_snapshot(self, params: Dict[str, Any]):
+        """
+        Query a captured UI snapshot from its index, without touching the live UI tree.
+        
+        Params:
+            snapshot (str): Snapshot name (from an earlier step) or snapshot file path
+            filter (str, optional): Filter elements by text (partial match)
+            control_type (str, optional): Filter by control type
+            class_name (str, optional): Filter by class name
+            automation_id (str, optional): Filter by automation id
+            depth (int, optional): Maximum number of elements to show
+            save_as (str, optional): Save the number of matched elements to a context variable
+        """
+        ref = params.get('snapshot')
+        if not ref:
+            raise ValueError("'snapshot' is required for query_snapshot action")
+        snapshot = self._get_snapshot(ref)
+        
+        self.logger.info(f"=== Snapshot Query: {ref} ===")
+        print(f"\n=== Snapshot Query: {ref} ===")
+        
+        nodes = snapshot.query(
+            control_type=params.get('control_type'),
+            class_name=params.get('class_name'),
+            automation_id=params.get('automation_id'),
+            text_contains=params.get('filter'),
+        )
+        self._print_nodes(nodes, params.get('depth'))
+        
+        summary = f"Matched: {len(nodes)} of {len(snapshot)} elements"
+        print(summary)
+        self.logger.info(summary)
+        print("=== End Snapshot Query ===\n")
+        self.logger.info("=== End Snapshot Query ===")
+        
+        save_as = params.get('save_as')
+        if save_as:
+            self.context.set_variable(save_as, len(nodes))
+    
+    def _diff_snapshots(self, params: Dict[str, Any]):
+        """
+        Compare two UI snapshots and list added, removed and changed elements.
+        
+        Params:
+            before (str): Snapshot name or file path
+            after (str): Snapshot name or file path
+            limit (int, optional): Maximum number of lines to show per change kind
+        """
+        before_ref = params.get('before')
+        after_ref = params.get('after')
+        if not before_ref or not after_ref:
+            raise ValueError("'before' and 'after' are required for diff_snapshots action")
+        
+        diff = self._get_snapshot(before_ref).diff(self._get_snapshot(after_ref))
+        limit = params.get('limit')
+        
+        self.logger.info(f"=== Snapshot Diff: {before_ref} -> {after_ref} ===")
+        print(f"\n=== Snapshot Diff: {before_ref} -> {after_ref} ===")
+        for line in format_diff(diff, int(limit) if limit else None):
+            self.logger.info(line)
+            print(line)
+        
+        summary = f"Added: {len(diff['added'])}, Removed: {len(diff['removed'])}, Changed: {len(diff['changed'])}"
+        print(summary)
+        self.logger.info(summary)
+        print("=== End Snapshot Diff ===\n")
+        self.logger.info("=== End Snapshot Diff ===")
+    
+    def _print_nodes(self, nodes: List[Dict[str, Any]], max_count=None) -> int:
+        count = 0
+        for node in nodes:
+            msg = format_node(node)
+            self.logger.info(msg)
+            print(msg)
+            count += 1
+            
+            if max_count and count >= int(max_count):
+                print(f"  ... (showing first {max_count} elements)")
+                break
+        return count
+    
+    @classmethod
+    def clear_snapshots(cls):
+        """Drops the named snapshots kept by earlier steps."""
+        cls._snapshots.clear()
+    
+    def _store_snapshot(self, snapshot: UISnapshot, params: Dict[str, Any]):
+        name = params.get('snapshot')
+        if name:
+            self._snapshots[name] = snapshot
+            self.logger.info(f"Snapshot '{name}' stored ({len(snapshot)} elements)")
+        
+        save_path = params.get('save_path')
+        if save_path:
+            os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+            snapshot.save(save_path)
+            self.logger.info(f"Snapshot saved to {save_path}")
+    
+    def _get_snapshot(self, ref: str) -> UISnapshot:
+        if ref in self._snapshots:
+            return self._snapshots[ref]
+        if os.path.exists(ref):
+            return UISnapshot.load(ref)
+        raise ValueError(f"Unknown snapshot '{ref}': not captured in this run and no such file")
 
 
 # Registration
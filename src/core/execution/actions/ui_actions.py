@@ -1,8 +1,9 @@
-import importlib
-import re
 from typing import Dict, Any
 from src.core.execution.actions.base_action import BaseAction
 from src.core.execution.actions.action_dispatcher import ActionDispatcher
+from src.utils.element_resolver import resolve_target
+from src.utils.keyboard_lock import keyboard_lock
+from src.utils.regex_pool import RegexPool
 
 class UIAction(BaseAction):
     def execute(self, params: Dict[str, Any]):
@@ -20,27 +21,16 @@ class UIAction(BaseAction):
         
         if not target:
              raise ValueError("Target is required for UIAction")
-             
-        parts = target.split('.')
-        if len(parts) < 3:
-            raise ValueError(f"Invalid target format '{target}'. Expected 'module.Class.property'")
-            
-        module_name = parts[0]
-        class_name = parts[1]
-        element_name = parts[2]
         
-        # Dynamic import
+        # Dynamic import (invalid format / missing page module propagate as-is)
+        try:
+            element = resolve_target(target)
+        except (ValueError, ImportError):
+            raise
+        except Exception as e:
+            raise Exception(f"UI Action Failed on {target}: {e}")
+        
         try:
-            module = importlib.import_module(f"src.pages.{module_name}")
-            page_class = getattr(module, class_name)
-            page_instance = page_class() # Instantiate
-            
-            # Get the element (WindowSpecification)
-            if not hasattr(page_instance, element_name):
-                 raise AttributeError(f"Page '{class_name}' has no element '{element_name}'")
-                 
-            element = getattr(page_instance, element_name)
-            
             # Perform Operation
             if operation == 'input':
                 # pywinauto set_text or type_keys
@@ -49,8 +39,10 @@ class UIAction(BaseAction):
                 if value is None: value = ""
                 # Clear field first using Ctrl+A + Delete
                 # This ensures we are setting the value, not appending
-                element.type_keys("^a{DELETE}", with_spaces=True)
-                element.type_keys(value, with_spaces=True)
+                # Hold the keyboard lock so the dialog watcher cannot send keys in between
+                with keyboard_lock:
+                    element.type_keys("^a{DELETE}", with_spaces=True)
+                    element.type_keys(value, with_spaces=True)
                 
             elif operation == 'click':
                 element.click_input()
@@ -70,10 +62,10 @@ class UIAction(BaseAction):
                 # Regex Extraction
                 regex_pattern = params.get('regex')
                 if regex_pattern:
-                    match = re.search(regex_pattern, text)
+                    match = RegexPool.search(regex_pattern, text, timeout=params.get('regex_timeout'))
                     if match:
                         # If capture groups exist, use the first one. Otherwise use entire match.
-                        if match.groups():
+                        if match.groups:
                             text = match.group(1)
                         else:
                             text = match.group(0)
@@ -87,8 +79,6 @@ class UIAction(BaseAction):
             else:
                 raise ValueError(f"Unknown UI operation: {operation}")
 
-        except ImportError as e:
-            raise ImportError(f"Could not import page module 'src.pages.{module_name}': {e}")
         except Exception as e:
             raise Exception(f"UI Action Failed on {target}: {e}")
 
@@ -1,10 +1,12 @@
 import os
-import re
-import importlib
+import logging
+from datetime import datetime
 from typing import Dict, Any
 from src.core.execution.actions.base_action import BaseAction
 from src.core.execution.actions.action_dispatcher import ActionDispatcher
+from src.utils.element_resolver import resolve_target
 from src.utils.file_validator import FileValidator
+from src.utils.regex_pool import RegexPool
 
 class VerifyAction(BaseAction):
     def execute(self, params: Dict[str, Any]):
@@ -17,7 +19,7 @@ class VerifyAction(BaseAction):
 
         if target:
             try:
-                element = self._resolve_target(target)
+                element = resolve_target(target)
             except Exception as e:
                 raise Exception(f"Failed to resolve verification target '{target}': {e}")
 
@@ -35,6 +37,10 @@ class VerifyAction(BaseAction):
                 self._assert_clickable(element, target)
                 return
 
+            if check_type == 'image_match':
+                self._verify_image_match(params, element)
+                return
+
             if actual_value is None:
                 actual_value = self._get_element_text(element)
 
@@ -61,7 +67,7 @@ class VerifyAction(BaseAction):
 
             haystack_str = str(haystack)
             if use_regex:
-                if re.search(needle, haystack_str) is None:
+                if RegexPool.search(needle, haystack_str, timeout=params.get('regex_timeout')) is None:
                     raise AssertionError(f"Regex '{needle}' not found in '{haystack_str}'")
             else:
                 if needle not in haystack_str:
@@ -82,7 +88,7 @@ class VerifyAction(BaseAction):
 
             haystack_str = str(haystack)
             if use_regex:
-                if re.search(needle, haystack_str):
+                if RegexPool.search(needle, haystack_str, timeout=params.get('regex_timeout')):
                     raise AssertionError(f"Regex '{needle}' unexpectedly matched '{haystack_str}'")
             else:
                 if needle in haystack_str:
@@ -97,9 +103,15 @@ class VerifyAction(BaseAction):
             if target_text is None:
                 raise AssertionError("No text available for 'matches' verification")
 
-            if re.fullmatch(pattern, str(target_text)) is None:
+            if RegexPool.fullmatch(pattern, str(target_text), timeout=params.get('regex_timeout')) is None:
                 raise AssertionError(f"Text '{target_text}' does not match pattern '{pattern}'")
 
+        elif check_type in ('contains_all', 'contains_any', 'contains_none'):
+            self._verify_multi_contains(check_type, params, actual_value)
+
+        elif check_type == 'image_match':
+            self._verify_image_match(params, None)
+
         elif check_type == 'file_exists':
             path = params.get('path')
             if not os.path.exists(path):
@@ -119,6 +131,11 @@ class VerifyAction(BaseAction):
             if not file_type:
                 if path.lower().endswith('.xlsx') or path.lower().endswith('.xls'):
                     file_type = 'excel'
+                elif path.lower().endswith('.csv') and 'expected' not in params:
+                    # .csv with text-style 'expected' keeps the previous text comparison
+                    file_type = 'csv'
+                elif path.lower().endswith('.json') and 'assertions' in params:
+                    file_type = 'json'
                 else:
                     file_type = 'text'
 
@@ -127,38 +144,238 @@ class VerifyAction(BaseAction):
                     path=path,
                     expected_content=params.get('expected'),
                     mode=params.get('mode', 'exact'),
-                    encoding=params.get('encoding', 'utf-8')
+                    encoding=params.get('encoding', 'utf-8'),
+                    tail=int(params['tail']) if params.get('tail') else None,
+                    regex_timeout=params.get('regex_timeout')
                 )
             elif file_type == 'excel':
-                FileValidator.validate_excel_file(
+                if params.get('cells') is not None:
+                    # Batch form: many cells/ranges checked in one pass, all mismatches reported together
+                    FileValidator.validate_excel_cells(
+                        path=path,
+                        checks=params.get('cells'),
+                        sheet_name=params.get('sheet')
+                    )
+                else:
+                    FileValidator.validate_excel_file(
+                        path=path,
+                        cell=params.get('cell'),
+                        expected_value=params.get('expected'),
+                        sheet_name=params.get('sheet')
+                    )
+            elif file_type == 'golden':
+                golden = params.get('golden')
+                if not golden:
+                    raise ValueError("'golden' parameter is required for golden file_content verification")
+                FileValidator.validate_sheet_against_golden(
+                    path=path,
+                    golden_path=golden,
+                    sheet_name=params.get('sheet'),
+                    cell_range=params.get('range'),
+                    named_range=params.get('named_range'),
+                    golden_sheet=params.get('golden_sheet'),
+                    golden_range=params.get('golden_range'),
+                    key_columns=params.get('key_columns'),
+                    ignore_columns=params.get('ignore_columns'),
+                    tolerances=params.get('tolerances'),
+                    tolerance=float(params.get('tolerance', 0.0))
+                )
+            elif file_type == 'csv':
+                FileValidator.validate_csv_file(
+                    path=path,
+                    encoding=params.get('encoding', 'utf-8'),
+                    delimiter=params.get('delimiter', ','),
+                    row_count=params.get('row_count'),
+                    columns=params.get('columns'),
+                    constraints=params.get('constraints'),
+                    expected_path=params.get('golden'),
+                    key_columns=params.get('key_columns'),
+                    ignore_columns=params.get('ignore_columns'),
+                    expected_encoding=params.get('golden_encoding'),
+                    expected_delimiter=params.get('golden_delimiter'),
+                    chunk_rows=int(params['chunk_rows']) if params.get('chunk_rows') else None
+                )
+            elif file_type == 'json':
+                FileValidator.validate_json_file(
                     path=path,
-                    cell=params.get('cell'),
-                    expected_value=params.get('expected'),
-                    sheet_name=params.get('sheet')
+                    assertions=params.get('assertions')
                 )
             else:
                 raise ValueError(f"Unsupported file_type for file_content verification: {file_type}")
 
+        elif check_type == 'directory_manifest':
+            self._verify_directory_manifest(params)
+
         else:
             raise ValueError(f"Unknown verify type: {check_type}")
 
-    def _resolve_target(self, target: str):
-        parts = target.split('.')
-        if len(parts) < 3:
-            raise ValueError(f"Invalid target format '{target}'. Expected 'module.Class.property'")
-        
-        module_name = parts[0]
-        class_name = parts[1]
-        element_name = parts[2]
-        
-        module = importlib.import_module(f"src.pages.{module_name}")
-        page_class = getattr(module, class_name)
-        page_instance = page_class()
-        
-        if not hasattr(page_instance, element_name):
-            raise AttributeError(f"Page '{class_name}' has no element '{element_name}'")
-        
-        return getattr(page_instance, element_name)
+    def _verify_image_match(self, params: Dict[str, Any], element):
+        """
+        要素（target未指定時は画面全体）の画像を基準画像と比較する。
+
+        params:
+            baseline: 基準画像のパス（必須）
+            tolerance: 許容するチャンネル差 0-255（既定 0）
+            threshold: 許容する変化画素の割合 0.0-1.0（既定 0.0）
+            masks: 比較から除外する [left, top, right, bottom] のリスト
+            update_baseline: true の場合は比較せず基準画像を更新する
+                （コンテキスト変数 UPDATE_BASELINES でも有効化できる）
+        """
+        from src.utils.image_diff import compare_images, render_heatmap
+
+        baseline_path = params.get('baseline')
+        if not baseline_path:
+            raise ValueError("'baseline' parameter is required for image_match verification")
+
+        if element is not None:
+            actual = element.capture_as_image()
+        else:
+            from PIL import ImageGrab
+            actual = ImageGrab.grab()
+
+        update = params.get('update_baseline', self.context.get_variable('UPDATE_BASELINES', False))
+        if isinstance(update, str):
+            update = update.lower() == 'true'
+
+        if update:
+            os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+            actual.save(baseline_path)
+            logging.getLogger(__name__).info(f"Baseline image updated: {baseline_path}")
+            return
+
+        if not os.path.exists(baseline_path):
+            raise AssertionError(f"Baseline image does not exist: {baseline_path} "
+                                 f"(run with update_baseline to create it)")
+
+        from PIL import Image
+        with Image.open(baseline_path) as baseline:
+            result = compare_images(actual, baseline,
+                                    tolerance=int(params.get('tolerance', 0)),
+                                    mask_regions=params.get('masks'))
+
+        threshold = float(params.get('threshold', 0.0))
+        if result.matches(threshold):
+            return
+
+        # 不一致時は実画像と差分ヒートマップを保存してメッセージに含める
+        output_dir = self.context.get_variable('SCREENSHOTDIR', 'reports/screenshots')
+        os.makedirs(output_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(baseline_path))[0]
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        actual_path = os.path.join(output_dir, f"IMAGE_ACTUAL_{name}_{timestamp}.png")
+        actual.save(actual_path)
+        detail = f"actual: {actual_path}"
+        if result.changed is not None:
+            heatmap_path = os.path.join(output_dir, f"IMAGE_DIFF_{name}_{timestamp}.png")
+            render_heatmap(actual, result).save(heatmap_path)
+            detail += f", diff: {heatmap_path}"
+        raise AssertionError(f"Image does not match baseline '{baseline_path}': {result.summary()} "
+                             f"(threshold {threshold:.4%}; {detail})")
+
+    def _verify_multi_contains(self, check_type: str, params: Dict[str, Any], actual_value):
+        """
+        複数の固定文字列をテキストから1回の走査でまとめて検索する。
+
+        params:
+            contains_all / contains_any / contains_none（または needles）: 文字列のリスト（必須）
+            ignore_case: true の場合は大文字小文字を区別しない
+            path: 指定時は要素のテキストの代わりにファイルを検索する（encoding、tail も指定可）
+        """
+        from src.utils.multi_match import find_needles
+        from src.utils import text_scan
+
+        needles = params.get(check_type) or params.get('needles')
+        if isinstance(needles, str):
+            needles = [needles]
+        if not needles:
+            raise ValueError(f"'{check_type}' (or 'needles') parameter is required for {check_type} verification")
+        needles = [str(needle) for needle in needles]
+
+        ignore_case = params.get('ignore_case', False)
+        if isinstance(ignore_case, str):
+            ignore_case = ignore_case.lower() == 'true'
+
+        path = params.get('path')
+        if path:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+            chunks = text_scan.iter_text_chunks(path, params.get('encoding', 'utf-8'),
+                                                tail=int(params['tail']) if params.get('tail') else None)
+            source = f"file '{path}'"
+        else:
+            haystack = actual_value if actual_value is not None else params.get('text')
+            if haystack is None:
+                raise AssertionError(f"No text available for '{check_type}' verification")
+            chunks = [str(haystack)]
+            source = f"text ({len(str(haystack))} chars)"
+
+        stop = {'contains_all': 'all', 'contains_any': 'any'}.get(check_type)
+        found = find_needles(chunks, needles, ignore_case=ignore_case, stop=stop)
+
+        def listing(items):
+            return ", ".join(f"'{item}'" for item in items)
+
+        if check_type == 'contains_all':
+            missing = [needle for needle in needles if needle not in found]
+            if missing:
+                raise AssertionError(f"{len(missing)} of {len(needles)} text(s) not found in {source}: "
+                                     f"{listing(missing)}")
+        elif check_type == 'contains_any':
+            if not found:
+                raise AssertionError(f"None of the {len(needles)} text(s) found in {source}: {listing(needles)}")
+        else:
+            forbidden = [needle for needle in needles if needle in found]
+            if forbidden:
+                raise AssertionError(f"{len(forbidden)} forbidden text(s) found in {source}: {listing(forbidden)}")
+
+    def _verify_directory_manifest(self, params: Dict[str, Any]):
+        """
+        出力ディレクトリ全体をマニフェストと比較する。
+
+        params:
+            path: 検証するディレクトリ（必須）
+            manifest: マニフェストの JSON ファイル、またはゴールデンディレクトリ（必須）
+            include / exclude: 対象・除外する相対パスのパターン（文字列またはリスト）
+            ignore_extra: true の場合はマニフェストに無いファイルを報告しない
+            workers: ハッシュ計算の並列数
+            update_baseline: true の場合は比較せずマニフェストを現在の内容で作り直す
+                （コンテキスト変数 UPDATE_BASELINES でも有効化できる）
+        """
+        from src.utils.dir_manifest import write_manifest
+
+        path = params.get('path')
+        manifest = params.get('manifest')
+        if not path or not manifest:
+            raise ValueError("'path' and 'manifest' parameters are required for directory_manifest verification")
+
+        include = params.get('include')
+        exclude = params.get('exclude')
+        if isinstance(include, str):
+            include = [include]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+
+        ignore_extra = params.get('ignore_extra', False)
+        if isinstance(ignore_extra, str):
+            ignore_extra = ignore_extra.lower() == 'true'
+
+        update = params.get('update_baseline', self.context.get_variable('UPDATE_BASELINES', False))
+        if isinstance(update, str):
+            update = update.lower() == 'true'
+
+        if update and not os.path.isdir(manifest):
+            files = write_manifest(path, manifest, include, exclude)
+            logging.getLogger(__name__).info(f"Manifest updated: {manifest} ({len(files)} files)")
+            return
+
+        FileValidator.validate_directory_manifest(
+            path=path,
+            manifest=manifest,
+            include=include,
+            exclude=exclude,
+            ignore_extra=ignore_extra,
+            workers=int(params['workers']) if params.get('workers') else None
+        )
 
     def _get_element_text(self, element):
         try:
@@ -0,0 +1,200 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from src.core.execution.actions.base_action import BaseAction
+from src.core.execution.actions.action_dispatcher import ActionDispatcher
+
+
+class WaitAction(BaseAction):
+    """
+    シナリオから明示的に状態の変化を待つアクション（type: wait）。
+    mode ごとの待機処理を _modes に登録し、新しい待機対象を追加しやすくする。
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.logger = logging.getLogger(__name__)
+        self._modes: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            'file_stable': self._wait_file_stable,
+            'condition': self._wait_condition,
+            'first_of': self._wait_first_of,
+        }
+
+    def execute(self, params: Dict[str, Any]):
+        mode = params.get('mode')
+        handler = self._modes.get(mode)
+        if handler is None:
+            raise ValueError(f"Unknown wait mode: {mode}. Supported: {sorted(self._modes)}")
+
+        save_as = params.get('save_as')
+        start = time.monotonic()
+        try:
+            handler(params)
+        except TimeoutError:
+            if save_as:
+                self.context.set_variable(save_as, False)
+            self._record_elapsed(params, time.monotonic() - start)
+            raise
+        if save_as:
+            self.context.set_variable(save_as, True)
+        self._record_elapsed(params, time.monotonic() - start)
+
+    def _record_elapsed(self, params: Dict[str, Any], elapsed: float):
+        """
+        実際に待機した秒数をログと変数（save_elapsed_as）に記録する。
+        replaces_sleep（置き換えた固定スリープの秒数）が指定されていれば短縮できた秒数も出力する。
+        """
+        message = f"Wait '{params.get('mode')}' finished after {elapsed:.2f}s"
+        if params.get('replaces_sleep') is not None:
+            replaced = float(params['replaces_sleep'])
+            message += f" (fixed sleep {replaced:.2f}s, saved {replaced - elapsed:.2f}s)"
+        self.logger.info(message)
+        if params.get('save_elapsed_as'):
+            self.context.set_variable(params['save_elapsed_as'], round(elapsed, 3))
+
+    def _poll(self, check: Callable[[], Any], timeout: float, interval: float,
+              max_interval: float) -> Tuple[Optional[Any], int]:
+        """
+        check() が真値を返すまで期限（time.monotonic() 基準）まで繰り返し呼び出す。
+        確認間隔は interval から倍々に伸ばし、max_interval で頭打ちにする。
+
+        Returns:
+            Tuple[Optional[Any], int]: (check() が返した真値、期限切れなら None, 確認回数)
+        """
+        deadline = time.monotonic() + timeout
+        current_interval = interval
+        checks = 0
+        while True:
+            result = check()
+            checks += 1
+            if result:
+                return result, checks
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, checks
+            time.sleep(min(current_interval, remaining))
+            current_interval = min(current_interval * 2, max_interval)
+
+    def _wait_condition(self, params: Dict[str, Any]):
+        """
+        ConditionEvaluator の条件（variable / element_exists / element_text_empty / checkbox_state）が
+        成立するまで待つ。
+
+        params:
+            condition: ステップの condition と同じ形式の条件（必須）
+            timeout: 待機上限秒（既定 10）
+            interval / max_interval: 最初の確認間隔 / 確認間隔の上限（既定 0.1 / 1.0）
+        """
+        condition = params.get('condition')
+        if not isinstance(condition, dict):
+            raise ValueError("'condition' parameter (dict) is required for condition wait")
+        evaluator, condition = self._prepare_condition(condition)
+
+        timeout = float(params.get('timeout', 10.0))
+        matched, checks = self._poll(lambda: evaluator.evaluate(condition), timeout,
+                                     float(params.get('interval', 0.1)),
+                                     float(params.get('max_interval', 1.0)))
+        if not matched:
+            raise TimeoutError(f"Condition {condition} was not met within {timeout}s ({checks} checks)")
+        self.logger.info(f"Condition met after {checks} checks: {condition}")
+
+    def _wait_first_of(self, params: Dict[str, Any]):
+        """
+        複数の条件を1つのループで確認し、最初に成立した条件の名前を記録する。
+        待機時間は各条件のタイムアウトの合計ではなく、最も早く成立した条件で決まる。
+
+        params:
+            conditions: 名前 → 条件 の辞書（必須、記述順に確認する）
+            timeout: 待機上限秒（既定 10）
+            interval / max_interval: 最初の確認間隔 / 確認間隔の上限（既定 0.1 / 1.0）
+            save_match_as: 成立した条件の名前を保存する変数名（タイムアウト時は None）
+        """
+        conditions = params.get('conditions')
+        if not isinstance(conditions, dict) or not conditions:
+            raise ValueError("'conditions' parameter (dict of name -> condition) is required for first_of wait")
+        prepared = [(name, *self._prepare_condition(condition)) for name, condition in conditions.items()]
+
+        def first_match():
+            for name, evaluator, condition in prepared:
+                if evaluator.evaluate(condition):
+                    return name
+            return None
+
+        timeout = float(params.get('timeout', 10.0))
+        matched, checks = self._poll(first_match, timeout,
+                                     float(params.get('interval', 0.1)),
+                                     float(params.get('max_interval', 1.0)))
+        if params.get('save_match_as'):
+            self.context.set_variable(params['save_match_as'], matched)
+        if not matched:
+            raise TimeoutError(f"None of the conditions {list(conditions)} was met within {timeout}s "
+                               f"({checks} checks)")
+        self.logger.info(f"Condition '{matched}' met first after {checks} checks")
+
+    def _prepare_condition(self, condition: Dict[str, Any]):
+        """
+        条件を待機用に検証する（all / any / not の子条件も含む）。
+        未知の種別やターゲットの解決エラーは期限まで待たずに即時失敗させる。
+        条件側の timeout は待機ステップの timeout と二重になるため取り除く。
+        """
+        from src.core.execution.condition import ConditionEvaluator
+        from src.utils.element_resolver import resolve_target
+
+        def validate(node: Dict[str, Any]) -> Dict[str, Any]:
+            cond_type = node.get('type')
+            if cond_type not in ConditionEvaluator.SUPPORTED_TYPES:
+                raise ValueError(f"Unknown condition type for wait: {cond_type}. "
+                                 f"Supported: {list(ConditionEvaluator.SUPPORTED_TYPES)}")
+            node = {k: v for k, v in node.items() if k != 'timeout'}
+            if cond_type == 'not':
+                node['condition'] = validate(node.get('condition') or {})
+            elif cond_type in ('all', 'any'):
+                node['conditions'] = [validate(child) for child in node.get('conditions') or []]
+            elif cond_type != 'variable':
+                resolve_target(node.get('target'))
+            return node
+
+        return ConditionEvaluator(self.context), validate(condition)
+
+    def _wait_file_stable(self, params: Dict[str, Any]):
+        """
+        ファイル（または glob に一致する最新のファイル）の書き込み完了を待つ。
+
+        params:
+            path: ファイルパスまたは glob パターン（必須）
+            quiet_period: サイズ・更新時刻が変化しないことを確認する秒数（既定 1.0）
+            timeout: 待機上限秒（既定 60）
+            interval / max_interval: 最初の確認間隔 / 確認間隔の上限（既定 0.1 / 2.0）
+            min_size: 完了とみなす最小バイト数（既定 0）
+            fresh: true の場合はこのステップの開始以降に更新されたファイルだけを対象にする
+                （前回の実行で残ったファイルで即座に完了しないようにする）
+            save_path_as: 完了したファイルのパスを保存する変数名
+        """
+        from src.utils.file_wait import wait_for_stable_file
+
+        path = params.get('path')
+        if not path:
+            raise ValueError("'path' parameter is required for file_stable wait")
+
+        fresh = params.get('fresh', False)
+        if isinstance(fresh, str):
+            fresh = fresh.lower() == 'true'
+
+        result = wait_for_stable_file(
+            path,
+            quiet_period=float(params.get('quiet_period', 1.0)),
+            timeout=float(params.get('timeout', 60.0)),
+            interval=float(params.get('interval', 0.1)),
+            max_interval=float(params.get('max_interval', 2.0)),
+            min_size=int(params.get('min_size', 0)),
+            # ファイルシステムの更新時刻の分解能を考慮して少し前から対象にする
+            modified_after=time.time() - 2.0 if fresh else None,
+        )
+        self.logger.info(f"File stable: {result.path} ({result.size} bytes) after {result.waited:.2f}s "
+                         f"({result.checks} checks, {result.notifications} notifications)")
+        if params.get('save_path_as'):
+            self.context.set_variable(params['save_path_as'], result.path)
+
+
+# Registration
+ActionDispatcher.register('wait', WaitAction)
@@ -1,13 +1,19 @@
-from typing import Dict, Any
-import re
-import importlib
+from typing import Dict, Any, List, Optional
 import logging
+import time
 from src.core.context import Context
+from src.utils.element_resolver import resolve_target
 
 class ConditionEvaluator:
+    # Condition types handled by evaluate(); anything else is ignored with a warning
+    SUPPORTED_TYPES = ('variable', 'element_exists', 'element_text_empty', 'checkbox_state', 'all', 'any', 'not')
+    COMPOUND_TYPES = ('all', 'any', 'not')
+
     def __init__(self, context: Context):
         self.context = context
         self.logger = logging.getLogger(__name__)
+        # Set when a condition could not be evaluated (unresolvable target, unreadable state, bad config)
+        self._errored = False
 
     def evaluate(self, condition: Dict[str, Any]) -> bool:
         """
@@ -25,6 +31,13 @@ class ConditionEvaluator:
             "expected": true,
             "timeout": 2
         }
+        {
+            "type": "any",
+            "conditions": [
+                {"type": "variable", "key": "SKIP_SAVE", "value": "true"},
+                {"type": "not", "condition": {"type": "element_exists", "target": "..."}}
+            ]
+        }
         """
         if not condition:
             return True
@@ -39,11 +52,109 @@ class ConditionEvaluator:
             return self._evaluate_text_empty(condition)
         elif cond_type == 'checkbox_state':
             return self._evaluate_checkbox_state(condition)
+        elif cond_type in self.COMPOUND_TYPES:
+            return self._evaluate_compound(condition)
         
         # Unknown condition type - log warning and return True (don't skip step)
         self.logger.warning(f"Unknown condition type: {cond_type}. Condition will be ignored.")
         return True
 
+    @classmethod
+    def cost(cls, condition: Dict[str, Any]) -> float:
+        """
+        Rough cost of evaluating a condition, used to order compound children.
+        Variable checks are free, UI probes without timeout cost one UIA query,
+        and timed waits cost up to their timeout.
+
+        Raises:
+            ValueError: If a 'timeout' is not a number
+        """
+        cond_type = condition.get('type')
+        if cond_type == 'variable':
+            return 0.0
+        if cond_type == 'not':
+            return cls.cost(condition.get('condition') or {})
+        if cond_type in ('all', 'any'):
+            return sum(cls.cost(child) for child in condition.get('conditions') or [])
+        timeout = condition.get('timeout', 0) or 0
+        try:
+            return 1.0 + float(timeout)
+        except (TypeError, ValueError):
+            raise ValueError(f"{cond_type} condition has an invalid timeout {timeout!r}; expected seconds")
+
+    def _error(self, message: str):
+        """Logs an evaluation error and marks the current condition as undecided."""
+        self._errored = True
+        self.logger.error(message)
+
+    def _evaluate_compound(self, condition: Dict[str, Any]) -> bool:
+        """
+        Evaluates 'all' / 'any' / 'not' conditions.
+        A child that could not be evaluated is undecided rather than False, so 'not' does not
+        turn an error into True. An undecided compound condition fails closed (False).
+
+        Raises:
+            ValueError: If a child has an invalid 'timeout' (see cost())
+        """
+        self._errored = False
+        result = self._evaluate_tree(condition)
+        if result is None:
+            self.logger.error(f"{condition.get('type')} condition could not be decided; treating it as not met")
+            return False
+        return result
+
+    def _evaluate_tree(self, condition: Dict[str, Any]) -> Optional[bool]:
+        """
+        Three-valued evaluation of a compound condition (None = undecided because of an error).
+        Children are evaluated cheapest first and evaluation stops as soon as the result is decided.
+        """
+        cond_type = condition.get('type')
+        if cond_type == 'not':
+            child = condition.get('condition')
+            if not isinstance(child, dict):
+                self.logger.error("'not' condition requires a 'condition' block")
+                return None
+            result = self._evaluate_timed(child)
+            return None if result is None else not result
+
+        children: List[Dict[str, Any]] = condition.get('conditions') or []
+        if not isinstance(children, list) or not children:
+            self.logger.error(f"'{cond_type}' condition requires a non-empty 'conditions' list")
+            return None
+
+        # sorted() is stable, so children of equal cost keep their written order
+        ordered = sorted(children, key=self.cost)
+        decisive = cond_type == 'any'
+        undecided = False
+        for evaluated, child in enumerate(ordered, 1):
+            result = self._evaluate_timed(child)
+            if result is None:
+                undecided = True
+            elif result == decisive:
+                if evaluated < len(ordered):
+                    self.logger.info(f"{cond_type} condition decided after {evaluated} of {len(ordered)} "
+                                     f"child condition(s); remaining skipped")
+                return decisive
+        return None if undecided else not decisive
+
+    def _evaluate_timed(self, condition: Dict[str, Any]) -> Optional[bool]:
+        """Evaluates a child condition and logs how long the probe took. Returns None on errors."""
+        start = time.perf_counter()
+        cond_type = condition.get('type')
+        if cond_type in self.COMPOUND_TYPES:
+            result = self._evaluate_tree(condition)
+        elif cond_type not in self.SUPPORTED_TYPES:
+            self.logger.error(f"Unknown condition type inside compound condition: {cond_type}")
+            result = None
+        else:
+            self._errored = False
+            result = self.evaluate(condition)
+            if self._errored:
+                result = None
+        self.logger.info(f"  {cond_type} condition -> {'error' if result is None else result} "
+                         f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return result
+
     def _evaluate_variable(self, condition: Dict[str, Any]) -> bool:
         key = condition.get('key')
         operator = condition.get('operator', 'equals')
@@ -103,7 +214,7 @@ class ConditionEvaluator:
             try:
                 exists = element.exists()
             except Exception as e:
-                self.logger.error(f"Error checking existence for '{target}': {e}")
+                self._error(f"Error checking existence for '{target}': {e}")
                 return False
         
         # Compare with expected value
@@ -134,7 +245,7 @@ class ConditionEvaluator:
             try:
                 text_value = element.window_text()
             except Exception as e:
-                self.logger.error(f"Error retrieving text for '{target}': {e}")
+                self._error(f"Error retrieving text for '{target}': {e}")
                 return False
         
         is_empty = (text_value is None) or (str(text_value) == '')
@@ -179,7 +290,7 @@ class ConditionEvaluator:
                 self.logger.debug(f"is_checked failed for '{target}': {e}")
         
         if actual_state is None:
-            self.logger.error(f"Could not determine checkbox state for '{target}'")
+            self._error(f"Could not determine checkbox state for '{target}'")
             return False
         
         result = (actual_state == expected)
@@ -196,34 +307,12 @@ class ConditionEvaluator:
         Resolve an element from a target string formatted as 'module.Class.element'.
         """
         if not target:
-            self.logger.error(f"{required_field} condition requires 'target' parameter")
-            return None
-        
-        parts = target.split('.')
-        if len(parts) < 3:
-            self.logger.error(f"Invalid target format '{target}'. Expected 'module.Class.element'")
+            self._error(f"{required_field} condition requires 'target' parameter")
             return None
-        
-        module_name = parts[0]
-        class_name = parts[1]
-        element_name = parts[2]
-        
+
         try:
-            module = importlib.import_module(f"src.pages.{module_name}")
-            page_class = getattr(module, class_name)
-            page_instance = page_class()
-            
-            if not hasattr(page_instance, element_name):
-                self.logger.error(f"Page '{class_name}' has no element '{element_name}'")
-                return None
-            
-            return getattr(page_instance, element_name)
-        
-        except ImportError as e:
-            self.logger.error(f"Could not import page module 'src.pages.{module_name}': {e}")
-        except AttributeError as e:
-            self.logger.error(f"Attribute error resolving target '{target}': {e}")
+            return resolve_target(target)
         except Exception as e:
-            self.logger.error(f"Error resolving target '{target}': {e}")
-        
+            self._error(f"Error resolving target '{target}': {e}")
+
         return None
@@ -6,6 +6,8 @@ from typing import Dict, Any
 from src.core.context import Context
 from src.core.execution.condition import ConditionEvaluator
 from src.core.execution.actions.action_dispatcher import ActionDispatcher
+from src.utils.screenshot import ScreenshotManager
+from src.utils.dialog_watcher import DialogWatcher
 
 class Runner:
     def __init__(self, context: Context):
@@ -25,7 +27,37 @@ class Runner:
         self.logger.info(f"Starting scenario: {scenario_name} ({file_name})")
         
         steps = scenario.get('steps', [])
-        
+
+        # 前のシナリオで解決したウィンドウハンドル等を持ち越さない
+        self._clear_scenario_caches()
+
+        # 予期しないダイアログ（回復・互換性の確認など）をシナリオ実行中に自動で閉じる
+        dialog_watcher = DialogWatcher.for_scenario(scenario)
+        if dialog_watcher:
+            dialog_watcher.start()
+        try:
+            self._execute_steps(steps)
+        finally:
+            if dialog_watcher:
+                dialog_watcher.stop()
+            self._clear_scenario_caches()
+
+        # Evidence screenshots are written in the background; make sure they are on disk.
+        # On failure, the session teardown in conftest.py flushes pending writes.
+        ScreenshotManager.flush()
+        self.logger.info(f"Finished scenario: {scenario_name}")
+
+    def _clear_scenario_caches(self):
+        ScreenshotManager.clear_region_cache()
+        try:
+            from src.pages.base_page import BasePage
+            from src.core.execution.actions.debug_action import DebugAction
+        except ImportError:
+            return
+        BasePage.clear_window_cache()
+        DebugAction.clear_snapshots()
+
+    def _execute_steps(self, steps):
         for i, step in enumerate(steps):
             step_name = step.get('name', f"Step {i+1}")
             source = step.get('_source')
@@ -60,8 +92,6 @@ class Runner:
                 self.logger.debug(traceback.format_exc())
                 raise e
 
-        self.logger.info(f"Finished scenario: {scenario_name}")
-
     def _resolve_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Recursively resolves variables in step parameters."""
         resolved = {}
@@ -1,8 +1,47 @@
-from pywinauto import Application, WindowSpecification
-from typing import Optional
-from src.utils.driver_factory import DriverFactory
+import logging
+import os
+from pywinauto import Application, Desktop, WindowSpecification
+from typing import Any, Callable, Iterable, Optional
+from src.utils.driver_factory import DriverFactory, get_process_ids_by_name
+from src.utils.window_cache import WindowCache
+from src.utils import ui_search
+from src.utils.ui_snapshot import UISnapshot
+from src.utils.image_locator import ImageElement
+
+# Reference images for find_by_image are resolved relative to this directory
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+
+logger = logging.getLogger(__name__)
+
+
+class _CachingWindowSpecification(WindowSpecification):
+    """
+    Lazy Desktop-scope window specification that reports the window handle once it resolves.
+
+    Used by find_process_window's Desktop fallback so the spec can be returned without an extra
+    exists() scan, while the handle still lands in the window cache on first real use.
+    """
+
+    def __init__(self, search_criteria, on_resolve: Callable[[int], None]):
+        super().__init__(search_criteria)
+        self._on_resolve = on_resolve
+
+    # Every attribute access, wait() and wrapper_object() goes through this (name-mangled) resolver
+    def _WindowSpecification__resolve_control(self, criteria, *args, **kwargs):
+        ctrls = super()._WindowSpecification__resolve_control(criteria, *args, **kwargs)
+        on_resolve, self._on_resolve = self._on_resolve, None
+        if on_resolve is not None:
+            try:
+                on_resolve(ctrls[0].handle)
+            except Exception:
+                logger.debug("Failed to cache resolved Desktop window", exc_info=True)
+        return ctrls
+
 
 class BasePage:
+    # Shared by all page objects so resolved connections survive page re-instantiation per step
+    _window_cache = WindowCache()
+
     def __init__(self, title_re: str = None, auto_id: str = None):
         """
         Initialize BasePage with a window searching criteria.
@@ -10,7 +49,7 @@ class BasePage:
         self.app = DriverFactory.get_app()
         self.title_re = title_re
         self.auto_id = auto_id
-        
+
     @property
     def window(self) -> WindowSpecification:
         """Returns the main window of the page."""
@@ -19,9 +58,117 @@ class BasePage:
             kwargs['title_re'] = self.title_re
         if self.auto_id:
             kwargs['auto_id'] = self.auto_id
-            
+
         return self.app.window(**kwargs)
 
+    def find_process_window(self, process_name: str, backend: str = 'uia', **criteria) -> WindowSpecification:
+        """
+        Returns a top-level window owned by the given process, searching process scope first.
+
+        The resolved window handle is cached per search criteria and validated on each call
+        (owner process, plus title/class against the criteria), so repeated accesses skip Application.connect / exists / Desktop scans.
+        Falls back to a Desktop-wide search when no process-scoped window is found.
+        """
+        key = (process_name.lower(), backend, tuple(sorted(criteria.items())))
+        entry = self._window_cache.get_window(key)
+        if entry:
+            if entry['app'] is not None:
+                return entry['app'].window(handle=entry['handle'])
+            return Desktop(backend=backend).window(handle=entry['handle'])
+
+        # 1. Process scope: connect to each matching process (connections are cached per pid)
+        for pid in get_process_ids_by_name(process_name):
+            try:
+                app = self._window_cache.get_app(pid, backend)
+                win = app.window(found_index=0, **criteria)
+                if win.exists(timeout=1):
+                    handle = win.wrapper_object().handle
+                    if self._window_cache.put_window(key, handle, backend, app, criteria):
+                        return app.window(handle=handle)
+                    return win
+            except Exception:
+                continue
+
+        # 2. Fallback to Desktop scope (Slower). The spec stays lazy (the caller usually waits on it);
+        #    its handle is cached the first time it resolves.
+        logger.info("Process ID search failed. Falling back to full Desktop search. This may take some time...")
+        spec = Desktop(backend=backend).window(found_index=0, **criteria)
+        return _CachingWindowSpecification(
+            spec.criteria[0],
+            lambda handle: self._window_cache.put_window(key, handle, backend, criteria=criteria))
+
+    def find_descendant(self,
+                        predicate: Optional[Callable[[Any], bool]] = None,
+                        control_type: Optional[str] = None,
+                        text_contains: Optional[Iterable[str]] = None,
+                        max_depth: Optional[int] = None,
+                        skip_control_types: Optional[Iterable[str]] = None,
+                        root: Any = None) -> Optional[Any]:
+        """
+        Returns the first descendant matching the criteria, searching breadth-first.
+
+        Unlike wrapper_object().descendants(), the walk stops at the first match and never
+        enters subtrees whose control type is in skip_control_types.
+        root defaults to the page window wrapper. Returns None when nothing matches.
+        """
+        if text_contains:
+            if isinstance(text_contains, str):
+                text_contains = [text_contains]
+            text_predicate = ui_search.text_contains(*text_contains)
+            if predicate:
+                user_predicate = predicate
+                predicate = lambda e: text_predicate(e) and user_predicate(e)
+            else:
+                predicate = text_predicate
+
+        if root is None:
+            root = self.window.wrapper_object()
+
+        return ui_search.find_descendant(
+            root,
+            predicate=predicate,
+            control_type=control_type,
+            max_depth=max_depth,
+            skip_control_types=skip_control_types,
+        )
+
+    def snapshot(self, max_depth: Optional[int] = None, root: Any = None) -> UISnapshot:
+        """
+        Captures the page window tree once into an indexed UISnapshot.
+
+        Use it when a page needs several lookups over the same static UI: queries are
+        answered from the in-memory index instead of repeated cross-process calls.
+        """
+        if root is None:
+            root = self.window.wrapper_object()
+        return UISnapshot.capture(root, max_depth=max_depth)
+
+    def find_by_image(self,
+                      template: str,
+                      roi: Optional[Iterable[int]] = None,
+                      threshold: float = 0.9,
+                      timeout: float = 5.0) -> ImageElement:
+        """
+        Locates an element on screen by matching a reference image.
+
+        Fallback for controls that are slow to reach via child_window/descendants or are not
+        exposed to UIA at all. The returned ImageElement supports click_input, rectangle,
+        window_text/get_value (read from the UIA element at its center), exists(timeout)
+        and wait/wait_not, so element_exists conditions and wait steps work on it.
+        The screen is searched lazily, on first use.
+
+        template: image path; relative paths are resolved under src/pages/images.
+        roi: optional [left, top, right, bottom] screen region that narrows the search.
+        """
+        if not os.path.isabs(template):
+            template = os.path.join(IMAGES_DIR, template)
+        return ImageElement(template, roi=list(roi) if roi else None, threshold=threshold, timeout=timeout)
+
+    @classmethod
+    def clear_window_cache(cls):
+        """Drops all cached application connections and window handles."""
+        cls._window_cache.clear()
+
     def wait_for_exists(self, timeout=10):
         self.window.wait('exists', timeout=timeout)
 
@@ -16,6 +16,8 @@ from pywinauto.keyboard import send_keys
 
 from src.utils.driver_factory import DriverFactory
 from src.utils.excel_automation_configs import ExcelConfig
+from src.utils.focus_tracker import FocusTracker
+from src.utils.keyboard_lock import keyboard_lock
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,8 @@ class ExcelPage:
     """Excel page object that owns Excel lifecycle and key operations."""
 
     copied_files: List[str] = []
+    # Shared across instances because ExcelAction creates a new page per step
+    focus_tracker = FocusTracker("Excel")
 
     def __init__(self):
         self._app = None
@@ -63,6 +67,7 @@ class ExcelPage:
         try:
             self._cleanup_recovery_files()
             DriverFactory.start_excel(file_path)
+            self.focus_tracker.invalidate()
             self._refresh_handles()
             logger.info("Excel started")
             return True
@@ -107,12 +112,22 @@ class ExcelPage:
         logger.warning("Excel window activation failed after retries")
         return False
 
+    def _window_handle(self) -> Optional[int]:
+        try:
+            return self.window.handle if self.window else None
+        except Exception:
+            logger.debug("Failed to read Excel window handle", exc_info=True)
+            return None
+
     def _ensure_active(self, operation_name: str = "operation") -> bool:
-        logger.debug(f"Activating Excel window before {operation_name}")
-        activated = self.activate_window(
-            max_retries=ExcelConfig.ERROR_HANDLING.get('max_retries', 3),
-            retry_delay=ExcelConfig.ERROR_HANDLING.get('retry_delay', 1.0),
-        )
+        def activate() -> bool:
+            logger.debug(f"Activating Excel window before {operation_name}")
+            return self.activate_window(
+                max_retries=ExcelConfig.ERROR_HANDLING.get('max_retries', 3),
+                retry_delay=ExcelConfig.ERROR_HANDLING.get('retry_delay', 1.0),
+            )
+
+        activated = self.focus_tracker.ensure_active(self._window_handle(), activate, operation_name)
         if not activated:
             logger.warning(f"Excel window not active before {operation_name}")
         return activated
@@ -123,23 +138,24 @@ class ExcelPage:
     # ----- user operations -----
     def select_cell(self, row: int = None, column: int = None, cell_address: str = None) -> bool:
         try:
-            self._ensure_active("select_cell")
-
-            if cell_address:
-                address = cell_address.upper()
-            elif row is not None and column is not None:
-                address = ExcelConfig.get_cell_address(row, column)
-            else:
-                raise ValueError("select_cell requires 'cell_address' or both 'row' and 'column'")
-
-            send_keys(ExcelConfig.get_shortcut('go_to'))
-            time.sleep(ExcelConfig.get_timing('cell_selection'))
-            send_keys(address)
-            time.sleep(ExcelConfig.get_timing('cell_selection'))
-            send_keys('{ENTER}')
-            time.sleep(ExcelConfig.get_timing('cell_selection'))
-            send_keys('{ESC}')
-            time.sleep(ExcelConfig.get_timing('cell_selection'))
+            with keyboard_lock:
+                self._ensure_active("select_cell")
+
+                if cell_address:
+                    address = cell_address.upper()
+                elif row is not None and column is not None:
+                    address = ExcelConfig.get_cell_address(row, column)
+                else:
+                    raise ValueError("select_cell requires 'cell_address' or both 'row' and 'column'")
+
+                send_keys(ExcelConfig.get_shortcut('go_to'))
+                time.sleep(ExcelConfig.get_timing('cell_selection'))
+                send_keys(address)
+                time.sleep(ExcelConfig.get_timing('cell_selection'))
+                send_keys('{ENTER}')
+                time.sleep(ExcelConfig.get_timing('cell_selection'))
+                send_keys('{ESC}')
+                time.sleep(ExcelConfig.get_timing('cell_selection'))
             logger.debug(f"Selected cell {address}")
             return True
         except Exception as e:
@@ -148,10 +164,11 @@ class ExcelPage:
 
     def input_text(self, text: str) -> bool:
         try:
-            self._ensure_active("input_text")
-            send_keys(str(text), with_spaces=True)
-            time.sleep(ExcelConfig.get_timing('text_input'))
-            send_keys('{ENTER}')
+            with keyboard_lock:
+                self._ensure_active("input_text")
+                send_keys(str(text), with_spaces=True)
+                time.sleep(ExcelConfig.get_timing('text_input'))
+                send_keys('{ENTER}')
             logger.debug(f"Input text: {text}")
             return True
         except Exception as e:
@@ -163,17 +180,18 @@ class ExcelPage:
             if not shortcut_key:
                 raise ValueError("shortcut_key is required")
 
-            self._ensure_active("execute_ribbon_shortcut")
-            send_keys('%')
-            time.sleep(ExcelConfig.get_timing('text_input'))
+            with keyboard_lock:
+                self._ensure_active("execute_ribbon_shortcut")
+                send_keys('%')
+                time.sleep(ExcelConfig.get_timing('text_input'))
 
-            if '>' in shortcut_key:
-                for part in [p.strip().upper() for p in shortcut_key.split('>')]:
-                    send_keys(part)
+                if '>' in shortcut_key:
+                    for part in [p.strip().upper() for p in shortcut_key.split('>')]:
+                        send_keys(part)
+                        time.sleep(ExcelConfig.get_timing('ribbon_operation'))
+                else:
+                    send_keys(shortcut_key.upper())
                     time.sleep(ExcelConfig.get_timing('ribbon_operation'))
-            else:
-                send_keys(shortcut_key.upper())
-                time.sleep(ExcelConfig.get_timing('ribbon_operation'))
 
             logger.debug(f"Executed ribbon shortcut: {shortcut_key}")
             return True
@@ -183,15 +201,16 @@ class ExcelPage:
 
     def save(self, file_path: Optional[str] = None) -> bool:
         try:
-            self._ensure_active("save")
-            if file_path:
-                send_keys(ExcelConfig.get_shortcut('save_as'))
-                time.sleep(ExcelConfig.get_timing('file_operation'))
-                send_keys(file_path)
-                time.sleep(ExcelConfig.get_timing('text_input'))
-                send_keys('{ENTER}')
-            else:
-                send_keys(ExcelConfig.get_shortcut('save_file'))
+            with keyboard_lock:
+                self._ensure_active("save")
+                if file_path:
+                    send_keys(ExcelConfig.get_shortcut('save_as'))
+                    time.sleep(ExcelConfig.get_timing('file_operation'))
+                    send_keys(file_path)
+                    time.sleep(ExcelConfig.get_timing('text_input'))
+                    send_keys('{ENTER}')
+                else:
+                    send_keys(ExcelConfig.get_shortcut('save_file'))
 
             time.sleep(ExcelConfig.get_timing('file_operation'))
             logger.debug("Saved workbook")
@@ -206,14 +225,15 @@ class ExcelPage:
                 logger.debug("Excel not running; nothing to close")
                 return True
 
-            self._ensure_active("close_workbook")
-            send_keys(ExcelConfig.get_shortcut('close_workbook'))
-            time.sleep(ExcelConfig.get_timing('file_operation'))
+            with keyboard_lock:
+                self._ensure_active("close_workbook")
+                send_keys(ExcelConfig.get_shortcut('close_workbook'))
+                time.sleep(ExcelConfig.get_timing('file_operation'))
 
-            if save:
-                send_keys('{ENTER}')
-            else:
-                send_keys('n')
+                if save:
+                    send_keys('{ENTER}')
+                else:
+                    send_keys('n')
 
             time.sleep(ExcelConfig.get_timing('dialog_wait'))
             logger.debug("Closed workbook")
@@ -231,6 +251,7 @@ class ExcelPage:
 
         self._app = None
         self._window = None
+        self.focus_tracker.reset()
         self._cleanup_recovery_files()
         logger.debug("Excel quit and cleanup complete")
 
@@ -262,7 +283,8 @@ class ExcelPage:
                 return True
 
             time.sleep(ExcelConfig.get_timing('dialog_wait'))
-            send_keys(key_action)
+            with keyboard_lock:
+                send_keys(key_action)
             time.sleep(ExcelConfig.get_timing('dialog_wait', 0.2))
             logger.debug("Dialog handled")
             return True
@@ -319,4 +341,5 @@ class ExcelPage:
         except Exception:
             logger.debug("Excel close in reset ignored", exc_info=True)
 
+        cls.focus_tracker.reset()
         cls.copied_files = []
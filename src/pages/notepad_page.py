@@ -10,28 +10,10 @@ class NotepadPage(BasePage):
     def window(self):
         # Prioritize searching by process ID for performance (Process Scope).
         # This avoids scanning the entire Desktop which is very slow when many windows are open.
-        from src.utils.driver_factory import get_process_ids_by_name
-        from pywinauto import Application, Desktop
-
-        # 1. Try to connect to notepad.exe processes directly
-        pids = get_process_ids_by_name("notepad.exe")
-        for pid in pids:
-            try:
-                app = Application(backend='uia').connect(process=pid)
-                # Search within this app's process
-                win = app.window(title_re=self.title_re, found_index=0)
-                if win.exists(timeout=1):
-                    return win
-            except Exception:
-                continue
-
-        # 2. Fallback to Desktop scope (Slower)
-        # Modern Notepad app launching behavior often detaches from the initial process handle
-        # or implies a package process that might be tricky to catch by name purely.
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info("Process ID search failed. Falling back to full Desktop search. This may take some time...")
-        return Desktop(backend='uia').window(title_re=self.title_re, found_index=0)
+        # Modern Notepad app launching behavior often detaches from the initial process handle,
+        # so BasePage falls back to Desktop scope when no notepad.exe window matches.
+        # The resolved window is cached, so repeated accesses within a scenario are cheap.
+        return self.find_process_window("notepad.exe", title_re=self.title_re)
 
     @property
     def editor(self):
@@ -85,22 +67,18 @@ class NotepadPage(BasePage):
         # Cancel button in save dialog. In Japanese "キャンセル".
         # Windows 11 modern Notepad: the cancel button is a descendant of the main window,
         # not inside a separate dialog window.
-        # See docs/knowledge/use_descendants.md for why we use descendants()
+        # See docs/knowledge/use_descendants.md for why we search descendants.
+        # The breadth-first search stops at the first matching button and skips the
+        # editor/list subtrees, which can hold many elements.
         try:
-            # Get the main window wrapper and search all descendants
-            window_wrapper = self.window.wrapper_object()
-            buttons = window_wrapper.descendants(control_type="Button")
-            for btn in buttons:
-                try:
-                    text = btn.window_text()
-                    # Match "キャンセル" or "Cancel"
-                    if "キャンセル" in text or "Cancel" in text:
-                        return btn
-                except:
-                    continue
+            return self.find_descendant(
+                control_type="Button",
+                text_contains=["キャンセル", "Cancel"],
+                max_depth=12,
+                skip_control_types=["Document", "Edit", "List", "Tree", "DataGrid"],
+            )
         except Exception:
-            pass
-        return None
+            return None
 
     @property
     def save_confirmation_dialog(self):
@@ -1 +1,7 @@
-from .driver_factory import DriverFactory
+# DriverFactory depends on Windows-only modules (winreg, pywinauto), so it is
+# imported lazily to keep the pure utilities (e.g. ui_search) importable on Linux.
+def __getattr__(name):
+    if name == 'DriverFactory':
+        from .driver_factory import DriverFactory
+        return DriverFactory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,331 @@
+"""
+大きなCSV出力をメモリに全体を読み込まずに検証するユーティリティモジュール。
+pandas の chunksize で一定行数ずつ（全列を文字列として）読み込み、
+行数・列名・列ごとの制約をチャンク単位で確認する。
+
+期待CSVとの比較では、行ごとにキーと行内容を 64bit ハッシュにまとめ、
+期待側のハッシュだけを NumPy 配列として保持する（1行あたり16バイト）。
+実際のCSVをチャンク単位で照合し、差異のあったキーについてだけ
+期待CSVをもう一度走査して列ごとの差分を取り出す。
+"""
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def iter_csv_chunks(path: str, encoding: str = 'utf-8', delimiter: str = ',',
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    CSVを全列文字列のDataFrameとして chunk_rows 行ずつ返す（空セルは空文字）。
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    with pd.read_csv(path, sep=delimiter, encoding=encoding, dtype=str, keep_default_na=False,
+                     chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def read_header(path: str, encoding: str = 'utf-8', delimiter: str = ',') -> List[str]:
+    """CSVの列名だけを読み込む"""
+    return list(pd.read_csv(path, sep=delimiter, encoding=encoding, dtype=str, nrows=0).columns)
+
+
+def _check_constraint(values: pd.Series, rule: Dict[str, Any], seen: Optional[List[np.ndarray]]) -> np.ndarray:
+    """
+    1列分のチャンクに制約を適用し、違反する行が True の配列を返す。
+
+    rule のキー:
+        not_empty: 空でないこと
+        unique: ファイル全体で重複しないこと（既出の値の 64bit ハッシュを seen[0] にソート済み配列で保持する）
+        min / max: 数値としての下限・上限（数値でない値も違反）
+        pattern: 値全体が一致する正規表現
+        allowed: 許可する値のリスト
+    空の値は not_empty 以外の制約の対象外とする。
+    """
+    empty = (values == '').to_numpy()
+    violations = np.zeros(len(values), dtype=bool)
+    if rule.get('not_empty'):
+        violations |= empty
+
+    if 'min' in rule or 'max' in rule:
+        numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        bad = np.isnan(numbers)
+        with np.errstate(invalid='ignore'):
+            if 'min' in rule:
+                bad |= numbers < float(rule['min'])
+            if 'max' in rule:
+                bad |= numbers > float(rule['max'])
+        violations |= bad & ~empty
+    if rule.get('pattern'):
+        violations |= ~values.str.fullmatch(rule['pattern']).to_numpy(dtype=bool) & ~empty
+    if rule.get('allowed') is not None:
+        violations |= ~values.isin([str(v) for v in rule['allowed']]).to_numpy() & ~empty
+    if seen is not None:
+        hashes = pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+        duplicated = pd.Series(hashes).duplicated().to_numpy().copy()
+        previous = seen[0]
+        if len(previous):
+            index = np.minimum(np.searchsorted(previous, hashes), len(previous) - 1)
+            duplicated |= previous[index] == hashes
+        violations |= duplicated & ~empty
+        seen[0] = np.sort(np.concatenate([previous, hashes[~empty]]))
+    return violations
+
+
+def scan_csv(path: str,
+             encoding: str = 'utf-8',
+             delimiter: str = ',',
+             constraints: Optional[Dict[str, Dict[str, Any]]] = None,
+             chunk_rows: int = DEFAULT_CHUNK_ROWS,
+             max_examples: int = 20) -> Dict[str, Any]:
+    """
+    CSVを1回走査して、行数と列ごとの制約違反を集計する。
+
+    Args:
+        constraints (Optional[Dict[str, Dict[str, Any]]]): 列名 → 制約（_check_constraint を参照）
+
+    Returns:
+        Dict[str, Any]: 'rows'、'columns'、'violations'（列名 → 違反数）、
+            'examples'（{'row', 'column', 'value', 'rule'} のリスト）、'missing_columns'
+    """
+    constraints = constraints or {}
+    columns = read_header(path, encoding, delimiter)
+    missing_columns = [c for c in constraints if c not in columns]
+    active = {c: r for c, r in constraints.items() if c in columns}
+    seen = {c: [np.array([], dtype=np.uint64)] for c, r in active.items() if r.get('unique')}
+
+    rows = 0
+    violations: Dict[str, int] = {}
+    examples: List[Dict[str, Any]] = []
+    for chunk in iter_csv_chunks(path, encoding, delimiter, chunk_rows):
+        for column, rule in active.items():
+            bad = _check_constraint(chunk[column], rule, seen.get(column))
+            count = int(bad.sum())
+            if not count:
+                continue
+            violations[column] = violations.get(column, 0) + count
+            for position in np.flatnonzero(bad)[:max(0, max_examples - len(examples))]:
+                examples.append({'row': rows + int(position) + 1, 'column': column,
+                                 'value': chunk[column].iat[position], 'rule': rule})
+        rows += len(chunk)
+
+    return {'rows': rows, 'columns': columns, 'violations': violations, 'examples': examples,
+            'missing_columns': missing_columns}
+
+
+def _hash_rows(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    if not columns:
+        return np.zeros(len(frame), dtype=np.uint64)
+    return pd.util.hash_pandas_object(frame[columns], index=False, categorize=False).to_numpy()
+
+
+def _collect_rows(path: str, encoding: str, delimiter: str, chunk_rows: int, key_columns: List[str],
+                  wanted: np.ndarray) -> Dict[int, Dict[str, str]]:
+    """キーのハッシュが wanted に含まれる行を取り出す（差異の詳細表示用）"""
+    found: Dict[int, Dict[str, str]] = {}
+    for chunk in iter_csv_chunks(path, encoding, delimiter, chunk_rows):
+        hashes = _hash_rows(chunk, key_columns)
+        for position in np.flatnonzero(np.isin(hashes, wanted)):
+            found.setdefault(int(hashes[position]), chunk.iloc[position].to_dict())
+    return found
+
+
+def compare_csv(actual_path: str,
+                expected_path: str,
+                key_columns: Optional[List[str]] = None,
+                ignore_columns: Optional[List[str]] = None,
+                encoding: str = 'utf-8',
+                delimiter: str = ',',
+                expected_encoding: Optional[str] = None,
+                expected_delimiter: Optional[str] = None,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                max_examples: int = 20) -> Dict[str, Any]:
+    """
+    CSVを期待CSVと比較する。値は文字列として完全一致で比較する。
+
+    Args:
+        key_columns (Optional[List[str]]): 行を対応付けるキー列。未指定時は行の位置で対応付ける。
+        ignore_columns (Optional[List[str]]): 比較しない列
+
+    Returns:
+        Dict[str, Any]: 'equal'、'rows_compared'、'changed_rows'、'examples'（差異セル）、
+            'missing_rows' / 'extra_rows'（キーの例）と件数、'missing_columns' / 'extra_columns'
+
+    Raises:
+        ValueError: キー列が存在しない、または一意でない場合
+    """
+    expected_encoding = expected_encoding or encoding
+    expected_delimiter = expected_delimiter or delimiter
+    ignore = set(ignore_columns or []) | set(key_columns or [])
+
+    actual_header = read_header(actual_path, encoding, delimiter)
+    expected_header = read_header(expected_path, expected_encoding, expected_delimiter)
+    columns = [c for c in expected_header if c in actual_header and c not in ignore]
+    result: Dict[str, Any] = {
+        'missing_columns': [c for c in expected_header if c not in actual_header and c not in ignore],
+        'extra_columns': [c for c in actual_header if c not in expected_header and c not in ignore],
+        'examples': [], 'missing_rows': [], 'extra_rows': [],
+        'missing_row_count': 0, 'extra_row_count': 0, 'changed_rows': 0, 'rows_compared': 0,
+    }
+
+    actual_chunks = iter_csv_chunks(actual_path, encoding, delimiter, chunk_rows)
+    expected_chunks = iter_csv_chunks(expected_path, expected_encoding, expected_delimiter, chunk_rows)
+    if key_columns:
+        for header, label in ((actual_header, 'actual'), (expected_header, 'expected')):
+            missing = [k for k in key_columns if k not in header]
+            if missing:
+                raise ValueError(f"Key column(s) {missing} not found in {label} CSV")
+        _compare_keyed(result, actual_chunks, expected_chunks, key_columns, columns, max_examples)
+        if result['examples']:
+            # 期待CSVから差異のあったキーの行だけを読み直して列ごとの差分を求める
+            wanted = np.array([e['lookup'] for e in result['examples']], dtype=np.uint64)
+            actual_rows = {e['lookup']: e.pop('actual_row') for e in result['examples']}
+            expected_rows = _collect_rows(expected_path, expected_encoding, expected_delimiter, chunk_rows,
+                                          key_columns, wanted)
+            result['examples'] = _cell_examples(result['examples'], actual_rows, expected_rows, columns, max_examples)
+    else:
+        _compare_positional(result, actual_chunks, expected_chunks, columns, max_examples)
+
+    result['equal'] = not (result['changed_rows'] or result['missing_row_count'] or result['extra_row_count']
+                           or result['missing_columns'] or result['extra_columns'])
+    return result
+
+
+def _key_label(frame: pd.DataFrame, position: int, key_columns: List[str]) -> Any:
+    values = tuple(frame[k].iat[position] for k in key_columns)
+    return values[0] if len(values) == 1 else values
+
+
+def _compare_keyed(result, actual_chunks, expected_chunks, key_columns, columns, max_examples):
+    # 期待側: キーのハッシュ順に並べた (キー, 行内容) のハッシュ配列と、例示用のキーの値
+    key_parts, row_parts, labels = [], [], {}
+    for chunk in expected_chunks:
+        key_parts.append(_hash_rows(chunk, key_columns))
+        row_parts.append(_hash_rows(chunk, columns))
+        for position in range(min(len(chunk), max_examples * 4)):
+            labels.setdefault(int(key_parts[-1][position]), _key_label(chunk, position, key_columns))
+    expected_keys = np.concatenate(key_parts) if key_parts else np.array([], dtype=np.uint64)
+    expected_rows = np.concatenate(row_parts) if row_parts else np.array([], dtype=np.uint64)
+    order = np.argsort(expected_keys, kind='stable')
+    expected_keys, expected_rows = expected_keys[order], expected_rows[order]
+    if len(expected_keys) > 1 and (expected_keys[1:] == expected_keys[:-1]).any():
+        raise ValueError(f"Key column(s) {key_columns} are not unique in expected CSV")
+
+    matched = np.zeros(len(expected_keys), dtype=bool)
+    for chunk in actual_chunks:
+        keys = _hash_rows(chunk, key_columns)
+        rows = _hash_rows(chunk, columns)
+        if len(np.unique(keys)) != len(keys):
+            raise ValueError(f"Key column(s) {key_columns} are not unique in actual CSV")
+        index = np.searchsorted(expected_keys, keys)
+        found = index < len(expected_keys)
+        found[found] = expected_keys[index[found]] == keys[found]
+
+        extra = np.flatnonzero(~found)
+        result['extra_row_count'] += len(extra)
+        for position in extra[:max(0, max_examples - len(result['extra_rows']))]:
+            result['extra_rows'].append(_key_label(chunk, position, key_columns))
+
+        hit = index[found]
+        if matched[hit].any():
+            raise ValueError(f"Key column(s) {key_columns} are not unique in actual CSV")
+        matched[hit] = True
+        changed = np.flatnonzero(found)[expected_rows[hit] != rows[found]]
+        result['rows_compared'] += len(hit)
+        result['changed_rows'] += len(changed)
+        for position in changed[:max(0, max_examples - len(result['examples']))]:
+            result['examples'].append({'row': _key_label(chunk, position, key_columns),
+                                       'lookup': int(keys[position]),
+                                       'actual_row': chunk.iloc[position].to_dict()})
+
+    missing = np.flatnonzero(~matched)
+    result['missing_row_count'] = len(missing)
+    result['missing_rows'] = [labels.get(int(expected_keys[i]), f"#{int(expected_keys[i]):016x}")
+                              for i in missing[:max_examples]]
+
+
+def _compare_positional(result, actual_chunks, expected_chunks, columns, max_examples):
+    actual_buffer = expected_buffer = None
+    offset = 0
+    while True:
+        if actual_buffer is None or not len(actual_buffer):
+            actual_buffer = next(actual_chunks, None)
+        if expected_buffer is None or not len(expected_buffer):
+            expected_buffer = next(expected_chunks, None)
+        if actual_buffer is None or expected_buffer is None:
+            break
+        size = min(len(actual_buffer), len(expected_buffer))
+        a, e = actual_buffer.iloc[:size], expected_buffer.iloc[:size]
+        actual_buffer, expected_buffer = actual_buffer.iloc[size:], expected_buffer.iloc[size:]
+
+        changed = np.flatnonzero(_hash_rows(a, columns) != _hash_rows(e, columns))
+        result['rows_compared'] += size
+        result['changed_rows'] += len(changed)
+        for position in changed[:max(0, max_examples - len(result['examples']))]:
+            result['examples'].extend(_cell_examples(
+                [{'row': offset + int(position) + 1, 'lookup': 0}], {0: a.iloc[position].to_dict()},
+                {0: e.iloc[position].to_dict()}, columns, max_examples - len(result['examples'])))
+        offset += size
+
+    # 片方が先に終わった場合、残りの行数を数える
+    for buffer, chunks, label in ((actual_buffer, actual_chunks, 'extra'), (expected_buffer, expected_chunks, 'missing')):
+        remaining = 0
+        while buffer is not None:
+            start = offset + remaining
+            for position in range(min(len(buffer), max(0, max_examples - len(result[f'{label}_rows'])))):
+                result[f'{label}_rows'].append(start + position + 1)
+            remaining += len(buffer)
+            buffer = next(chunks, None)
+        result[f'{label}_row_count'] = remaining
+
+
+def _cell_examples(examples, actual_rows, expected_rows, columns, max_examples):
+    """差異のある行の例（'lookup' で行を引く）を、列ごとの差異セルの例に展開する"""
+    cells = []
+    for example in examples:
+        actual = actual_rows.get(example['lookup'], {})
+        expected = expected_rows.get(example['lookup'], {})
+        for column in columns:
+            if actual.get(column) != expected.get(column):
+                cells.append({'row': example['row'], 'column': column,
+                              'expected': expected.get(column), 'actual': actual.get(column)})
+                if len(cells) >= max_examples:
+                    return cells
+    return cells
+
+
+def format_scan(result: Dict[str, Any]) -> str:
+    """制約違反の集計を失敗メッセージ用に整形する"""
+    lines = [f"{sum(result['violations'].values())} constraint violation(s) in {result['rows']} row(s)"]
+    if result['violations']:
+        lines.append("  by column: " + ", ".join(f"{c}={n}" for c, n in result['violations'].items()))
+    for example in result['examples']:
+        lines.append(f"  row {example['row']}, column '{example['column']}': {example['value']!r} violates {example['rule']}")
+    return "\n".join(lines)
+
+
+def format_comparison(result: Dict[str, Any]) -> str:
+    """期待CSVとの比較結果を失敗メッセージ用に整形する"""
+    lines = [f"{result['changed_rows']} changed row(s) of {result['rows_compared']} compared row(s)"]
+    for example in result['examples']:
+        lines.append(f"  row {example['row']!r}, column '{example['column']}': "
+                     f"expected {example['expected']!r}, got {example['actual']!r}")
+    if result['missing_row_count']:
+        lines.append(f"  {result['missing_row_count']} row(s) missing from output, e.g. {result['missing_rows'][:5]}")
+    if result['extra_row_count']:
+        lines.append(f"  {result['extra_row_count']} unexpected row(s) in output, e.g. {result['extra_rows'][:5]}")
+    if result['missing_columns']:
+        lines.append(f"  missing column(s): {result['missing_columns']}")
+    if result['extra_columns']:
+        lines.append(f"  unexpected column(s): {result['extra_columns']}")
+    return "\n".join(lines)
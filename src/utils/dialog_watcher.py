@@ -0,0 +1,270 @@
+"""
+予期しないダイアログをバックグラウンドで監視して処理するユーティリティモジュール。
+シナリオ実行中に新しく現れたトップレベルウィンドウだけをタイトル（正規表現）・クラス名で
+登録済みのルールと照合し、一致したらウィンドウを前面にしてキー操作（例: {ESC}）を送る。
+
+対象はダイアログらしいウィンドウ（所有者のあるウィンドウ、ポップアップ、標準ダイアログ）に限り、
+アプリ本体のメインウィンドウにはキーを送らない。キー操作は keyboard_lock で
+シナリオ側のキー操作と直列化する。
+
+ダイアログが出るかもしれない箇所ごとに excel handle_dialog 等でタイムアウトまで待つ代わりに、
+シナリオ開始時に監視を始めておけば、ダイアログが出なかった場合の待ち時間はかからない。
+ウィンドウの列挙元と処理は差し替え可能で、Windows 以外でも動作確認できる。
+"""
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from src.utils.keyboard_lock import keyboard_lock
+
+logger = logging.getLogger(__name__)
+
+# (ウィンドウハンドル, タイトル, クラス名)
+WindowInfo = Tuple[int, str, str]
+
+# 標準ダイアログ（MessageBox 等）のウィンドウクラス
+DIALOG_CLASS = '#32770'
+
+
+def is_dialog_window(handle: int) -> bool:
+    """所有者のあるウィンドウ、ポップアップ、標準ダイアログであればTrue（アプリのメインウィンドウはFalse）"""
+    import win32con
+    import win32gui
+
+    if win32gui.GetWindow(handle, win32con.GW_OWNER):
+        return True
+    if win32gui.GetClassName(handle) == DIALOG_CLASS:
+        return True
+    return bool(win32gui.GetWindowLong(handle, win32con.GWL_STYLE) & win32con.WS_POPUP)
+
+
+def list_top_level_windows() -> List[WindowInfo]:
+    """表示中のダイアログらしいトップレベルウィンドウを列挙する既定の列挙元"""
+    import win32gui
+
+    windows: List[WindowInfo] = []
+
+    def collect(handle, _):
+        if win32gui.IsWindowVisible(handle) and is_dialog_window(handle):
+            windows.append((handle, win32gui.GetWindowText(handle), win32gui.GetClassName(handle)))
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    return windows
+
+
+def send_keys_to_window(handle: int, keys: str):
+    """
+    ウィンドウを前面にしてキー操作を送る既定の処理。
+    ロックの待機中に閉じられた場合や前面にできなかった場合は、別のウィンドウに送らないよう例外とする。
+    """
+    import win32gui
+    from pywinauto.controls.hwndwrapper import HwndWrapper
+    from pywinauto.keyboard import send_keys
+
+    with keyboard_lock:
+        if not win32gui.IsWindow(handle):
+            raise RuntimeError(f"Window {handle} was closed before keys were sent")
+        # 監視スレッドからの SetForegroundWindow 単独はフォアグラウンドロックで拒否されやすいため、
+        # 前面化の回避策を含む pywinauto の set_focus を使う
+        try:
+            HwndWrapper(handle).set_focus()
+        except Exception:
+            logger.debug(f"set_focus failed for {handle}, falling back to SetForegroundWindow", exc_info=True)
+            try:
+                win32gui.SetForegroundWindow(handle)
+            except Exception:
+                logger.debug(f"SetForegroundWindow failed for {handle}", exc_info=True)
+        if win32gui.GetForegroundWindow() != handle:
+            raise RuntimeError(f"Could not bring window {handle} to the foreground")
+        send_keys(keys)
+
+
+@dataclass
+class DialogRule:
+    """監視対象のダイアログと、検出時に送るキー操作"""
+    name: str
+    title: Optional[Pattern]
+    class_name: Optional[str] = None
+    keys: str = '{ESC}'
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], name: Optional[str] = None) -> "DialogRule":
+        """
+        シナリオの dialog_handlers の要素からルールを生成する。
+
+        Args:
+            spec (Dict[str, Any]): 'title'（正規表現）、'class_name'、'keys'、'name'
+        """
+        if not spec.get('title') and not spec.get('class_name'):
+            raise ValueError(f"Dialog handler needs 'title' or 'class_name': {spec}")
+        return cls(
+            name=spec.get('name') or name or spec.get('title') or spec['class_name'],
+            title=re.compile(spec['title']) if spec.get('title') else None,
+            class_name=spec.get('class_name') or None,
+            keys=spec.get('keys', '{ESC}'),
+        )
+
+    def matches(self, title: str, class_name: str) -> bool:
+        if self.class_name and class_name != self.class_name:
+            return False
+        return self.title is None or self.title.search(title or '') is not None
+
+
+class DialogWatcher:
+    """新しく現れたトップレベルウィンドウをルールと照合して処理する監視スレッド"""
+
+    # config.ini の [DIALOG_WATCHER] から読み込んだ全シナリオ共通の設定
+    _enabled = False
+    _interval = 0.5
+    _rules: List[DialogRule] = []
+
+    def __init__(self,
+                 rules: Iterable[DialogRule],
+                 interval: float = 0.5,
+                 source: Optional[Callable[[], Iterable[WindowInfo]]] = None,
+                 action: Optional[Callable[[int, str], None]] = None):
+        """
+        Args:
+            rules (Iterable[DialogRule]): 照合するルール（先に一致したものを使用）
+            interval (float): ウィンドウを列挙する間隔（秒）
+            source (Optional[Callable]): (ハンドル, タイトル, クラス名) を列挙する関数。
+                Noneの場合は win32gui で表示中のダイアログらしいウィンドウを列挙する。
+            action (Optional[Callable[[int, str], None]]): (ハンドル, キー) を受け取る処理。Noneの場合は send_keys。
+        """
+        self.rules = list(rules)
+        self.interval = interval
+        self.source = source or list_top_level_windows
+        self.action = action or send_keys_to_window
+
+        # ハンドル → 前回の列挙時のタイトル
+        self._seen: Dict[int, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # (検出時刻, ルール名, タイトル, ハンドル, 成功したか)
+        self.events: List[Tuple[float, str, str, int, bool]] = []
+        self.scans = 0
+        self.errors = 0
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None):
+        """
+        config.ini の [DIALOG_WATCHER] セクションから共通の設定を反映する。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 設定値（キーは大文字小文字を区別しない）
+                - Enabled: true の場合のみ監視する
+                - Interval: ウィンドウを列挙する間隔（秒）
+                - Rule.<名前>: 'タイトルの正規表現 => キー操作'（キー操作を省略すると {ESC}）
+        """
+        opts = {str(k).lower(): str(v).strip() for k, v in (options or {}).items()}
+        cls._enabled = opts.get('enabled', 'false').lower() in ('1', 'true', 'yes', 'on')
+        cls._interval = float(opts.get('interval') or 0.5)
+        rules = []
+        for key, value in opts.items():
+            if not key.startswith('rule.') or not value:
+                continue
+            title, _, keys = value.partition('=>')
+            rules.append(DialogRule.from_dict({'title': title.strip(), 'keys': keys.strip() or '{ESC}'},
+                                              name=key[len('rule.'):]))
+        cls._rules = rules
+
+    @classmethod
+    def for_scenario(cls, scenario: Dict[str, Any]) -> Optional["DialogWatcher"]:
+        """
+        共通のルールにシナリオの dialog_handlers を加えた監視を生成する。
+        監視が無効、またはルールが1つも無い場合は None。
+        """
+        handlers = scenario.get('dialog_handlers') or []
+        if not cls._enabled and not handlers:
+            return None
+        rules = cls._rules + [DialogRule.from_dict(spec) for spec in handlers]
+        if not rules:
+            return None
+        return cls(rules, interval=cls._interval)
+
+    # ----- lifecycle -----
+    def start(self):
+        """監視を開始する。開始時点で表示されているウィンドウは対象外。"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._seen = {handle: title for handle, title, _ in self._list_windows() or []}
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="DialogWatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Dialog watcher started ({len(self.rules)} rule(s): {[r.name for r in self.rules]})")
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """監視を停止する"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info(f"Dialog watcher stopped: {self.format_stats()}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.scan_once()
+
+    def _list_windows(self) -> Optional[List[WindowInfo]]:
+        try:
+            return list(self.source())
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Dialog watcher failed to list windows: {e}")
+            return None
+
+    # ----- detection -----
+    def scan_once(self) -> int:
+        """
+        ウィンドウを1回列挙し、前回以降に現れたウィンドウをルールと照合して処理する。
+
+        Returns:
+            int: 処理したダイアログの数
+        """
+        windows = self._list_windows()
+        if windows is None:
+            # 列挙に失敗した回は記憶しているウィンドウを維持する（既存のウィンドウを新規とみなさない）
+            return 0
+        self.scans += 1
+        current = {}
+        handled = 0
+        for handle, title, class_name in windows:
+            current[handle] = title
+            # タイトルが後から設定されるウィンドウもあるため、タイトルが変わったものも照合する
+            if handle in self._seen and self._seen[handle] == title:
+                continue
+            rule = next((r for r in self.rules if r.matches(title, class_name)), None)
+            if rule is None:
+                continue
+            ok = True
+            try:
+                self.action(handle, rule.keys)
+                logger.info(f"Dialog watcher handled '{title}' ({class_name}) with rule '{rule.name}': "
+                            f"sent {rule.keys}")
+            except Exception as e:
+                ok = False
+                self.errors += 1
+                logger.warning(f"Dialog watcher failed to handle '{title}' with rule '{rule.name}': {e}")
+            self.events.append((time.time(), rule.name, title, handle, ok))
+            handled += 1
+        # 閉じたウィンドウのハンドルは再利用されるため、現在のウィンドウだけを記憶する
+        self._seen = current
+        return handled
+
+    # ----- stats -----
+    def stats(self) -> Dict[str, int]:
+        """監視の統計情報を返す"""
+        return {
+            "scans": self.scans,
+            "handled": sum(1 for event in self.events if event[4]),
+            "failed": sum(1 for event in self.events if not event[4]),
+            "errors": self.errors,
+        }
+
+    def format_stats(self) -> str:
+        """統計情報をログ出力用の文字列に整形する"""
+        return ", ".join(f"{key}={value}" for key, value in self.stats().items())
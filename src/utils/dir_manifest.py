@@ -0,0 +1,280 @@
+"""
+出力ディレクトリをマニフェスト（期待するファイルの一覧）と比較するユーティリティモジュール。
+マニフェストには相対パスごとにサイズ・SHA-256・任意の内容ルールを記述する。
+ハッシュはチャンク単位で読み込み、スレッドプールで並列に計算する
+（hashlib は大きなデータの更新中に GIL を解放するため、スレッドで並列化できる）。
+計算済みのハッシュとマニフェストは (パス, 更新時刻, サイズ) をキーにキャッシュし、
+変更されていないゴールデンマニフェスト・ゴールデンディレクトリは読み直さない。
+
+マニフェストの形式（JSON）:
+    {
+      "version": 1,
+      "files": {
+        "summary.csv": {"size": 1024, "sha256": "9f86d0..."},
+        "logs/export.log": {"content": {"mode": "contains", "expected": "Completed"}}
+      }
+    }
+"""
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+
+def hash_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """ファイルの SHA-256 を固定長バッファへの読み込みを繰り返して計算する"""
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _selected(relpath: str, include: Optional[Iterable[str]], exclude: Optional[Iterable[str]]) -> bool:
+    if include and not any(fnmatch.fnmatch(relpath, p) for p in include):
+        return False
+    return not any(fnmatch.fnmatch(relpath, p) for p in exclude or ())
+
+
+def scan_directory(root: str, include: Optional[Iterable[str]] = None,
+                   exclude: Optional[Iterable[str]] = None) -> Dict[str, os.stat_result]:
+    """
+    ディレクトリ配下のファイルを再帰的に列挙する。
+
+    Args:
+        root (str): 起点ディレクトリ
+        include (Optional[Iterable[str]]): 対象とする相対パスのパターン（fnmatch 形式、未指定時は全ファイル）
+        exclude (Optional[Iterable[str]]): 除外する相対パスのパターン
+
+    Returns:
+        Dict[str, os.stat_result]: '/' 区切りの相対パス → stat 結果
+    """
+    files: Dict[str, os.stat_result] = {}
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                relpath = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                if _selected(relpath, include, exclude):
+                    files[relpath] = entry.stat()
+    return files
+
+
+class HashCache:
+    """(絶対パス, 更新時刻, サイズ) をキーにした SHA-256 の LRU キャッシュ"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hash_many(self, paths: Dict[str, os.stat_result], workers: int = DEFAULT_WORKERS) -> Dict[str, str]:
+        """
+        複数ファイルのハッシュを取得する。キャッシュに無いものはスレッドプールで並列に計算する。
+
+        Args:
+            paths (Dict[str, os.stat_result]): 絶対パス → stat 結果
+            workers (int): 並列数
+
+        Returns:
+            Dict[str, str]: 絶対パス → SHA-256（16進）
+        """
+        result: Dict[str, str] = {}
+        pending: Dict[str, Tuple[str, int, int]] = {}
+        with self._lock:
+            for path, stat in paths.items():
+                key = (path, stat.st_mtime_ns, stat.st_size)
+                cached = self._entries.get(key)
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    result[path] = cached
+                    self.hits += 1
+                else:
+                    pending[path] = key
+                    self.misses += 1
+
+        if pending:
+            if len(pending) == 1 or workers <= 1:
+                computed = {path: hash_file(path) for path in pending}
+            else:
+                with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                    computed = dict(zip(pending, executor.map(hash_file, pending)))
+            with self._lock:
+                for path, digest in computed.items():
+                    self._entries[pending[path]] = digest
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            result.update(computed)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# 全ての検証で共有する（同じゴールデンディレクトリ・出力ファイルを繰り返し検証してもハッシュし直さない）
+hash_cache = HashCache()
+
+_manifest_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict[str, Any]]]] = {}
+_manifest_lock = threading.Lock()
+
+
+def build_manifest(root: str, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None,
+                   workers: int = DEFAULT_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """ディレクトリの現在の内容からマニフェストのファイル一覧を作成する"""
+    files = scan_directory(root, include, exclude)
+    absolute = {os.path.join(root, relpath): stat for relpath, stat in files.items()}
+    digests = hash_cache.hash_many(absolute, workers)
+    return {relpath: {'size': stat.st_size, 'sha256': digests[os.path.join(root, relpath)]}
+            for relpath, stat in sorted(files.items())}
+
+
+def load_manifest(source: str, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None,
+                  workers: int = DEFAULT_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    マニフェストを読み込む。
+
+    Args:
+        source (str): マニフェストの JSON ファイル、またはゴールデンディレクトリのパス
+        include / exclude: ゴールデンディレクトリの場合に対象とするパターン
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 相対パス → 期待値（size / sha256 / content）
+
+    Raises:
+        FileNotFoundError: マニフェストが存在しない場合
+        ValueError: マニフェストの形式が不正な場合
+    """
+    if os.path.isdir(source):
+        # ゴールデンディレクトリ: 変更されていないファイルのハッシュは hash_cache から再利用される
+        return build_manifest(source, include, exclude, workers)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Manifest not found: {source}")
+
+    abspath = os.path.abspath(source)
+    stat = os.stat(abspath)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _manifest_lock:
+        cached = _manifest_cache.get(abspath)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    with open(abspath, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    files = payload.get('files') if isinstance(payload, dict) else None
+    if not isinstance(files, dict):
+        raise ValueError(f"Manifest '{source}' must contain a 'files' object")
+    with _manifest_lock:
+        _manifest_cache[abspath] = (signature, files)
+    return files
+
+
+def write_manifest(root: str, path: str, include: Optional[Iterable[str]] = None,
+                   exclude: Optional[Iterable[str]] = None, workers: int = DEFAULT_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    ディレクトリの現在の内容からマニフェストを作成して保存する。
+    既存のマニフェストに記述された内容ルール（content）は引き継ぐ。
+    """
+    files = build_manifest(root, include, exclude, workers)
+    if os.path.exists(path):
+        try:
+            previous = load_manifest(path)
+        except (ValueError, json.JSONDecodeError):
+            previous = {}
+        for relpath, spec in previous.items():
+            if relpath in files and 'content' in spec:
+                files[relpath]['content'] = spec['content']
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'generated_at': datetime.now().isoformat(timespec='seconds'),
+                   'files': files}, f, ensure_ascii=False, indent=2)
+    return files
+
+
+def compare_directory(root: str, manifest: Dict[str, Dict[str, Any]],
+                      include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None,
+                      ignore_extra: bool = False, workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """
+    ディレクトリをマニフェストと比較する。
+    サイズが一致しないファイルはハッシュを計算しない。内容ルールは呼び出し側で検証する。
+
+    Returns:
+        Dict[str, Any]: 'missing'（無いファイル）、'extra'（マニフェストに無いファイル）、
+            'changed'（{'path', 'reasons'} のリスト）、'checked'（比較したファイル数）
+    """
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Directory not found: {root}")
+
+    files = scan_directory(root, include, exclude)
+    manifest = {p: spec for p, spec in manifest.items() if _selected(p, include, exclude)}
+    missing = sorted(p for p in manifest if p not in files)
+    extra = [] if ignore_extra else sorted(p for p in files if p not in manifest)
+
+    changed: Dict[str, List[str]] = {}
+    to_hash: Dict[str, os.stat_result] = {}
+    for relpath, spec in manifest.items():
+        stat = files.get(relpath)
+        if stat is None:
+            continue
+        expected_size = spec.get('size')
+        if expected_size is not None and stat.st_size != int(expected_size):
+            changed.setdefault(relpath, []).append(f"size {stat.st_size} != expected {expected_size}")
+        elif spec.get('sha256'):
+            to_hash[os.path.join(root, relpath)] = stat
+
+    digests = hash_cache.hash_many(to_hash, workers)
+    for relpath, spec in manifest.items():
+        digest = digests.get(os.path.join(root, relpath))
+        if digest is not None and digest != spec['sha256'].lower():
+            changed.setdefault(relpath, []).append(f"sha256 {digest[:12]}... != expected {spec['sha256'][:12]}...")
+
+    return {
+        'missing': missing,
+        'extra': extra,
+        'changed': [{'path': p, 'reasons': r} for p, r in sorted(changed.items())],
+        'checked': len(manifest) - len(missing),
+    }
+
+
+def format_manifest_diff(result: Dict[str, Any], limit: int = 50) -> str:
+    """比較結果を失敗メッセージ用に整形する"""
+    lines = [f"{len(result['missing'])} missing, {len(result['extra'])} extra, "
+             f"{len(result['changed'])} changed of {result['checked']} checked file(s)"]
+    for relpath in result['missing'][:limit]:
+        lines.append(f"  - {relpath}")
+    for relpath in result['extra'][:limit]:
+        lines.append(f"  + {relpath}")
+    for item in result['changed'][:limit]:
+        lines.append(f"  ~ {item['path']}: " + "; ".join(item['reasons']))
+    hidden = sum(max(0, len(result[k]) - limit) for k in ('missing', 'extra', 'changed'))
+    if hidden:
+        lines.append(f"  ... and {hidden} more")
+    return "\n".join(lines)
@@ -2,11 +2,12 @@ import os
 import time
 import winreg
 import logging
-import psutil
 from pywinauto import Application, Desktop
 from pywinauto.findwindows import find_window
 from typing import Optional, List
 
+from src.utils.process_snapshot import process_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,23 +46,15 @@ def get_excel_path():
 def get_process_ids_by_name(process_name: str) -> List[int]:
     """プロセス名からプロセスIDのリストを取得
     
+    プロセス一覧は ProcessSnapshot で短時間キャッシュされる。
+    
     Args:
         process_name: プロセス名 (例: 'EXCEL.EXE')
     
     Returns:
         List[int]: 該当するプロセスIDのリスト
     """
-    process_ids = []
-    process_name_lower = process_name.lower()
-    
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            if proc.info['name'] and proc.info['name'].lower() == process_name_lower:
-                process_ids.append(proc.info['pid'])
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    
-    return process_ids
+    return process_snapshot.get_pids(process_name)
 
 
 class DriverFactory:
@@ -89,6 +82,7 @@ class DriverFactory:
         cls._backend = backend
         cls._app = Application(backend=backend).start(path, timeout=timeout)
         time.sleep(1)
+        process_snapshot.invalidate()
         return cls._app
 
     @classmethod
@@ -139,6 +133,9 @@ class DriverFactory:
             cls._excel_app = Application(backend='uia').start(excel_path, timeout=timeout)
             logger.info("新しいExcelを起動しました")
         
+        # 起動したプロセスを次回検索時に拾えるようスナップショットを無効化
+        process_snapshot.invalidate()
+        
         # ウィンドウを待機・取得
         cls._excel_window = cls._wait_for_excel_window()
         
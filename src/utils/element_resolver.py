@@ -0,0 +1,47 @@
+"""
+Page Object のターゲット文字列（'module.Class.property'）を要素に解決するユーティリティモジュール。
+"""
+import importlib
+from typing import Any, Optional
+
+
+def resolve_target(target: str, default_member: Optional[str] = None) -> Any:
+    """
+    'module.Class.property' 形式のターゲットを src.pages 配下のページオブジェクトから解決する。
+
+    Args:
+        target (str): ターゲット文字列（例: 'notepad_page.NotepadPage.editor'）
+        default_member (str, optional): 'module.Class' 形式で property が省略された場合に使うプロパティ名
+
+    Returns:
+        Any: プロパティの値（通常は pywinauto の WindowSpecification / wrapper）
+
+    Raises:
+        ValueError: ターゲット形式が不正な場合
+        ImportError: ページモジュールを読み込めない場合
+        AttributeError: クラスまたはプロパティが存在しない場合
+    """
+    if not target:
+        raise ValueError("Target is required")
+
+    parts = target.split('.')
+    if len(parts) == 2 and default_member:
+        parts.append(default_member)
+    if len(parts) < 3:
+        expected = "'module.Class' or 'module.Class.property'" if default_member else "'module.Class.property'"
+        raise ValueError(f"Invalid target format '{target}'. Expected {expected}")
+
+    module_name, class_name, element_name = parts[0], parts[1], parts[2]
+
+    try:
+        module = importlib.import_module(f"src.pages.{module_name}")
+    except ImportError as e:
+        raise ImportError(f"Could not import page module 'src.pages.{module_name}': {e}")
+
+    page_class = getattr(module, class_name)
+    page_instance = page_class()
+
+    if not hasattr(page_instance, element_name):
+        raise AttributeError(f"Page '{class_name}' has no element '{element_name}'")
+
+    return getattr(page_instance, element_name)
@@ -1,24 +1,32 @@
 import os
-import re
-from typing import Optional, Union
-import openpyxl
+from typing import Any, Dict, List, Optional, Union
+from src.utils import text_scan
+from src.utils.workbook_cache import workbook_cache
 
 class FileValidator:
     """
-    Utility class for validating file contents (Text, Excel).
+    Utility class for validating file contents (Text, Excel, CSV, JSON, output directories).
     """
 
     @staticmethod
-    def validate_text_file(path: str, expected_content: str, mode: str = 'exact', encoding: str = 'utf-8') -> None:
+    def validate_text_file(path: str, expected_content: str, mode: str = 'exact', encoding: str = 'utf-8',
+                           tail: Optional[int] = None, regex_timeout: Optional[float] = None) -> None:
         """
         Validates the content of a text file.
 
+        The file is streamed in chunks (memory-mapped for UTF-8 'contains' checks), so large
+        logs are never loaded into memory as a whole. Failure messages include only a short
+        excerpt around the first difference or the closest partial match.
+
         Args:
             path (str): Path to the text file.
             expected_content (str): The expected content or pattern.
             mode (str): Validation mode ('exact', 'contains', 'regex'). Defaults to 'exact'.
             encoding (str): File encoding. Defaults to 'utf-8'.
-        
+            tail (Optional[int]): For 'contains' / 'regex', only scan the last N bytes of the file.
+            regex_timeout (Optional[float]): For 'regex', seconds allowed per chunk match before failing
+                with TimeoutError. Defaults to the [REGEX] Timeout setting (none when unset).
+
         Raises:
             FileNotFoundError: If the file does not exist.
             AssertionError: If the validation fails.
@@ -26,25 +34,32 @@ class FileValidator:
         """
         if not os.path.exists(path):
             raise FileNotFoundError(f"File not found: {path}")
-        
-        with open(path, 'r', encoding=encoding) as f:
-            content = f.read()
-            
+
         if mode == 'exact':
-            assert content == expected_content, f"Content mismatch.\nExpected: '{expected_content}'\nActual:   '{content}'"
+            difference = text_scan.compare_exact(path, expected_content, encoding)
+            assert difference is None, f"Content mismatch. {difference}"
         elif mode == 'contains':
-            assert expected_content in content, f"Content '{expected_content}' not found in file."
+            found, closest = text_scan.find_text(path, expected_content, encoding, tail=tail)
+            assert found, f"Content '{expected_content}' not found in file{FileValidator._scope(tail)}. {closest}"
         elif mode == 'regex':
-            pattern = re.compile(expected_content)
-            assert pattern.search(content), f"Pattern '{expected_content}' not found in file content."
+            found, closest = text_scan.search_regex(path, expected_content, encoding, tail=tail,
+                                                    timeout=regex_timeout)
+            assert found, f"Pattern '{expected_content}' not found in file content{FileValidator._scope(tail)}. {closest}"
         else:
             raise ValueError(f"Unknown validation mode: {mode}")
 
+    @staticmethod
+    def _scope(tail: Optional[int]) -> str:
+        return f" (last {int(tail)} bytes)" if tail else ''
+
     @staticmethod
     def validate_excel_file(path: str, cell: str, expected_value: Union[str, int, float], sheet_name: Optional[str] = None) -> None:
         """
         Validates the value of a specific cell in an Excel file.
 
+        The workbook is read through the shared read-only cache, so repeated checks
+        of the same (unchanged) file do not reload it.
+
         Args:
             path (str): Path to the Excel file.
             cell (str): Cell address (e.g., 'A1').
@@ -56,29 +71,289 @@ class FileValidator:
             ValueError: If the sheet is not found.
             AssertionError: If the validation fails.
         """
-        if not os.path.exists(path):
-             raise FileNotFoundError(f"File not found: {path}")
-        
+        FileValidator.validate_excel_cells(path, [{'cell': cell, 'expected': expected_value}], sheet_name=sheet_name)
+
+    @staticmethod
+    def validate_excel_cells(path: str, checks: Union[List[Dict[str, Any]], Dict[str, Any]], sheet_name: Optional[str] = None) -> None:
+        """
+        Validates many cells and ranges of an Excel file in a single pass.
+
+        Args:
+            path (str): Path to the Excel file.
+            checks (Union[List[Dict[str, Any]], Dict[str, Any]]): Either a mapping of
+                cell address to expected value (e.g. {"A1": "Name", "B2": 10}), or a list of
+                {"cell": "A1", "expected": ...} / {"range": "A1:B2", "expected": [[...], [...]]}
+                entries. Each entry may override the sheet with "sheet".
+            sheet_name (Optional[str]): Default sheet name. If None, uses the active sheet.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If a sheet is not found or a check is malformed.
+            AssertionError: If any cell differs. The message lists every mismatch.
+        """
+        if isinstance(checks, dict):
+            checks = [{'cell': cell, 'expected': expected} for cell, expected in checks.items()]
+
+        refs = []
+        for check in checks:
+            ref = check.get('cell') or check.get('range')
+            if not ref or 'expected' not in check:
+                raise ValueError(f"Each Excel check needs 'cell' (or 'range') and 'expected': {check}")
+            refs.append((check.get('sheet', sheet_name), ref))
+
         try:
-            workbook = openpyxl.load_workbook(path, data_only=True)
-            
-            if sheet_name:
-                if sheet_name not in workbook.sheetnames:
-                    raise ValueError(f"Sheet '{sheet_name}' not found in workbook. Available sheets: {workbook.sheetnames}")
-                sheet = workbook[sheet_name]
-            else:
-                sheet = workbook.active
-                
-            actual_value = sheet[cell].value
-            
-            # Simple string comparison to handle type differences (e.g. number vs string representation) generally
-            # But strict enough for text equality.
-            assert str(actual_value) == str(expected_value), f"Cell {cell} mismatch. Expected '{expected_value}' (type: {type(expected_value).__name__}), got '{actual_value}' (type: {type(actual_value).__name__})"
-            
+            values = workbook_cache.read(path, refs)
+        except (FileNotFoundError, ValueError):
+            raise
         except Exception as e:
-            if isinstance(e, (FileNotFoundError, ValueError, AssertionError)):
-                raise e
             raise Exception(f"Failed to validate Excel file: {e}")
-        finally:
-            if 'workbook' in locals():
-                workbook.close()
+
+        mismatches = []
+        for check, (_, ref), (sheet, actual) in zip(checks, refs, values):
+            expected = check['expected']
+            if ':' in ref:
+                mismatches.extend(FileValidator._compare_range(sheet, ref, actual, expected))
+            elif str(actual) != str(expected):
+                # Simple string comparison to handle type differences (e.g. number vs string representation)
+                mismatches.append((f"{sheet}!{ref}", f"Expected '{expected}' (type: {type(expected).__name__}), "
+                                                     f"got '{actual}' (type: {type(actual).__name__})"))
+
+        if len(refs) == 1 and len(mismatches) == 1 and ':' not in refs[0][1]:
+            raise AssertionError(f"Cell {refs[0][1]} mismatch. {mismatches[0][1]}")
+        if mismatches:
+            details = "\n  ".join(f"{location}: {detail}" for location, detail in mismatches)
+            raise AssertionError(f"{len(mismatches)} Excel cell mismatch(es) in {os.path.basename(path)}:\n  {details}")
+
+    @staticmethod
+    def _compare_range(sheet: str, ref: str, actual: List[List[Any]], expected: Any) -> List[tuple]:
+        """Compares a range (list of rows) cell by cell and returns mismatch descriptions."""
+        from openpyxl.utils.cell import get_column_letter
+        from src.utils.workbook_cache import parse_range
+
+        min_row, min_col, max_row, max_col = parse_range(ref)
+        if not isinstance(expected, list) or any(not isinstance(row, list) for row in expected):
+            return [(f"{sheet}!{ref}", "Expected value for a range must be a list of rows")]
+        if len(expected) != len(actual) or any(len(e) != len(a) for e, a in zip(expected, actual)):
+            return [(f"{sheet}!{ref}", f"Expected {len(expected)} rows x {len(expected[0]) if expected else 0} columns, "
+                                       f"range has {len(actual)} rows x {max_col - min_col + 1} columns")]
+
+        mismatches = []
+        for r, (expected_row, actual_row) in enumerate(zip(expected, actual)):
+            for c, (e, a) in enumerate(zip(expected_row, actual_row)):
+                if str(a) != str(e):
+                    mismatches.append((f"{sheet}!{get_column_letter(min_col + c)}{min_row + r}", f"Expected '{e}', got '{a}'"))
+        return mismatches
+
+    @staticmethod
+    def validate_sheet_against_golden(path: str,
+                                      golden_path: str,
+                                      sheet_name: Optional[str] = None,
+                                      cell_range: Optional[str] = None,
+                                      named_range: Optional[str] = None,
+                                      golden_sheet: Optional[str] = None,
+                                      golden_range: Optional[str] = None,
+                                      key_columns: Optional[List[str]] = None,
+                                      ignore_columns: Optional[List[str]] = None,
+                                      tolerances: Optional[Dict[str, float]] = None,
+                                      tolerance: float = 0.0) -> None:
+        """
+        Validates a whole sheet (or range / named range) of an output workbook against a golden
+        workbook or CSV file.
+
+        Args:
+            path (str): Path to the output Excel file.
+            golden_path (str): Path to the golden .xlsx or .csv file.
+            sheet_name (Optional[str]): Output sheet. If None, uses the active sheet.
+            cell_range (Optional[str]): Output range (e.g. 'A1:F500'). The first row is the header.
+            named_range (Optional[str]): Output named range (overrides sheet_name / cell_range).
+            golden_sheet (Optional[str]): Golden sheet. Defaults to sheet_name.
+            golden_range (Optional[str]): Golden range. Defaults to cell_range (or named_range).
+            key_columns (Optional[List[str]]): Columns that identify a row. If None, rows are compared by position.
+            ignore_columns (Optional[List[str]]): Columns excluded from the comparison.
+            tolerances (Optional[Dict[str, float]]): Absolute numeric tolerance per column.
+            tolerance (float): Numeric tolerance for columns not listed in tolerances.
+
+        Raises:
+            FileNotFoundError: If either file does not exist.
+            ValueError: If a sheet, named range or key column is not found.
+            AssertionError: If the tables differ. The message summarizes the differing cells.
+        """
+        from src.utils.sheet_compare import compare_frames, format_comparison, load_table
+
+        actual = load_table(path, sheet=sheet_name, cell_range=cell_range, named_range=named_range)
+        if golden_path.lower().endswith('.csv'):
+            expected = load_table(golden_path)
+        else:
+            expected = load_table(golden_path,
+                                  sheet=golden_sheet or sheet_name,
+                                  cell_range=golden_range or (None if named_range else cell_range),
+                                  named_range=None if golden_range else named_range)
+
+        result = compare_frames(actual, expected,
+                                key_columns=key_columns,
+                                ignore_columns=ignore_columns,
+                                tolerances=tolerances,
+                                default_tolerance=tolerance)
+        if not result['equal']:
+            raise AssertionError(f"Sheet does not match golden file '{os.path.basename(golden_path)}':\n"
+                                 f"{format_comparison(result)}")
+
+    @staticmethod
+    def validate_directory_manifest(path: str,
+                                    manifest: str,
+                                    include: Optional[List[str]] = None,
+                                    exclude: Optional[List[str]] = None,
+                                    ignore_extra: bool = False,
+                                    workers: Optional[int] = None) -> None:
+        """
+        Validates a whole output directory against a manifest of expected files.
+
+        Every expected file is checked for presence, size and SHA-256 (hashed in parallel, with
+        unchanged files served from a cache), then for its optional content rule. All problems
+        are collected into a single report.
+
+        Args:
+            path (str): Output directory to verify.
+            manifest (str): Manifest JSON file, or a golden directory to compare against.
+            include (Optional[List[str]]): Relative path patterns to consider (fnmatch). Defaults to all files.
+            exclude (Optional[List[str]]): Relative path patterns to ignore.
+            ignore_extra (bool): Do not report files that are not in the manifest.
+            workers (Optional[int]): Number of hashing threads.
+
+        Raises:
+            FileNotFoundError: If the directory or manifest does not exist.
+            ValueError: If the manifest is malformed.
+            AssertionError: If any file is missing, unexpected or changed.
+        """
+        from src.utils import dir_manifest
+
+        workers = workers or dir_manifest.DEFAULT_WORKERS
+        expected = dir_manifest.load_manifest(manifest, include, exclude, workers)
+        result = dir_manifest.compare_directory(path, expected, include, exclude, ignore_extra, workers)
+
+        changed = {item['path']: item for item in result['changed']}
+        for relpath, spec in expected.items():
+            rule = spec.get('content')
+            if not rule or relpath in result['missing']:
+                continue
+            try:
+                FileValidator._validate_content_rule(os.path.join(path, relpath), rule)
+            except AssertionError as e:
+                reason = str(e).splitlines()[0]
+                changed.setdefault(relpath, {'path': relpath, 'reasons': []})['reasons'].append(reason)
+        result['changed'] = [changed[p] for p in sorted(changed)]
+
+        if result['missing'] or result['extra'] or result['changed']:
+            raise AssertionError(f"Directory '{path}' does not match manifest '{os.path.basename(manifest)}':\n"
+                                 f"{dir_manifest.format_manifest_diff(result)}")
+
+    @staticmethod
+    def _validate_content_rule(path: str, rule: Dict[str, Any]) -> None:
+        """Applies a manifest content rule using the same keys as the file_content verify step."""
+        if rule.get('cells') is not None:
+            FileValidator.validate_excel_cells(path, rule['cells'], sheet_name=rule.get('sheet'))
+        else:
+            FileValidator.validate_text_file(path, rule.get('expected'), mode=rule.get('mode', 'contains'),
+                                             encoding=rule.get('encoding', 'utf-8'), tail=rule.get('tail'))
+
+    @staticmethod
+    def validate_csv_file(path: str,
+                          encoding: str = 'utf-8',
+                          delimiter: str = ',',
+                          row_count: Optional[Union[int, Dict[str, int]]] = None,
+                          columns: Optional[List[str]] = None,
+                          constraints: Optional[Dict[str, Dict[str, Any]]] = None,
+                          expected_path: Optional[str] = None,
+                          key_columns: Optional[List[str]] = None,
+                          ignore_columns: Optional[List[str]] = None,
+                          expected_encoding: Optional[str] = None,
+                          expected_delimiter: Optional[str] = None,
+                          chunk_rows: Optional[int] = None) -> None:
+        """
+        Validates a CSV file by streaming it in chunks, so multi-GB exports are never fully loaded.
+
+        Args:
+            path (str): Path to the CSV file.
+            encoding (str): File encoding. Defaults to 'utf-8'.
+            delimiter (str): Field delimiter. Defaults to ','.
+            row_count (Optional[Union[int, Dict[str, int]]]): Expected number of data rows, or {"min": n, "max": m}.
+            columns (Optional[List[str]]): Expected header, in order.
+            constraints (Optional[Dict[str, Dict[str, Any]]]): Per-column rules
+                (not_empty, unique, min, max, pattern, allowed).
+            expected_path (Optional[str]): Expected CSV to compare against (values compared as strings).
+            key_columns (Optional[List[str]]): Columns that identify a row. If None, rows are compared by position.
+            ignore_columns (Optional[List[str]]): Columns excluded from the comparison.
+            expected_encoding (Optional[str]): Encoding of the expected CSV. Defaults to encoding.
+            expected_delimiter (Optional[str]): Delimiter of the expected CSV. Defaults to delimiter.
+            chunk_rows (Optional[int]): Rows read per chunk.
+
+        Raises:
+            FileNotFoundError: If a file does not exist.
+            ValueError: If a key column is missing or not unique.
+            AssertionError: If any check fails. The message lists every failed check.
+        """
+        from src.utils import csv_stream
+
+        chunk_rows = chunk_rows or csv_stream.DEFAULT_CHUNK_ROWS
+        problems = []
+
+        if columns is not None:
+            header = csv_stream.read_header(path, encoding, delimiter)
+            if header != list(columns):
+                problems.append(f"Header mismatch. Expected {list(columns)}, got {header}")
+
+        if row_count is not None or constraints:
+            scan = csv_stream.scan_csv(path, encoding, delimiter, constraints, chunk_rows)
+            if isinstance(row_count, dict):
+                low, high = row_count.get('min'), row_count.get('max')
+                if (low is not None and scan['rows'] < int(low)) or (high is not None and scan['rows'] > int(high)):
+                    problems.append(f"Row count {scan['rows']} is outside the expected range {row_count}")
+            elif row_count is not None and scan['rows'] != int(row_count):
+                problems.append(f"Row count {scan['rows']} != expected {row_count}")
+            if scan['missing_columns']:
+                problems.append(f"Constrained column(s) not found: {scan['missing_columns']}")
+            if scan['violations']:
+                problems.append(csv_stream.format_scan(scan))
+
+        if expected_path:
+            result = csv_stream.compare_csv(path, expected_path,
+                                            key_columns=key_columns,
+                                            ignore_columns=ignore_columns,
+                                            encoding=encoding,
+                                            delimiter=delimiter,
+                                            expected_encoding=expected_encoding,
+                                            expected_delimiter=expected_delimiter,
+                                            chunk_rows=chunk_rows)
+            if not result['equal']:
+                problems.append(f"Does not match expected CSV '{os.path.basename(expected_path)}':\n"
+                                f"{csv_stream.format_comparison(result)}")
+
+        if problems:
+            raise AssertionError(f"CSV validation failed for {os.path.basename(path)}:\n" + "\n".join(problems))
+
+    @staticmethod
+    def validate_json_file(path: str, assertions: List[Dict[str, Any]]) -> None:
+        """
+        Validates a JSON file against a list of path assertions in a single streaming parse.
+
+        Args:
+            path (str): Path to the JSON file.
+            assertions (List[Dict[str, Any]]): Each entry has a 'path' (e.g. '$.results[*].status') and any of
+                'expected' (every match equals it), 'pattern' (every match fully matches the regex),
+                'count' (number of matches, or {"min": n, "max": m}) and 'exists'.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If an assertion or path expression is malformed.
+            AssertionError: If any assertion fails. The message lists every failed assertion.
+        """
+        from src.utils.json_stream import evaluate_json, format_results
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        if not assertions:
+            raise ValueError("At least one JSON assertion is required")
+
+        results = evaluate_json(path, assertions)
+        if not all(r['passed'] for r in results):
+            raise AssertionError(f"JSON validation failed for {os.path.basename(path)}:\n{format_results(results)}")
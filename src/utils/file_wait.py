@@ -0,0 +1,175 @@
+"""
+アプリケーションによるファイルの書き込み完了を待つユーティリティモジュール。
+ファイル（またはglobに一致する最新のファイル）が存在し、サイズと更新時刻が
+指定した時間（quiet_period）変化しなくなるまで待機する。
+
+確認間隔は変化が無い間は倍々に伸ばし（最大 max_interval）、変化を検出すると最小間隔に戻す。
+watchdog が導入されていればディレクトリの変更通知で待機を即座に打ち切って確認するため、
+間隔を伸ばしても検出が遅れない。未導入時や監視できない場合はポーリングのみで動作する。
+"""
+import glob
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+try:
+    # 任意: ファイルシステムの変更通知（Windows では ReadDirectoryChangesW）
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FileWaitResult:
+    """待機結果"""
+    path: Optional[str]
+    size: int
+    waited: float
+    checks: int
+    notifications: int
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """ディレクトリ内の変更で待機中のループを起こす"""
+
+    def __init__(self, event: threading.Event):
+        super().__init__()
+        self.event = event
+        self.count = 0
+
+    def on_any_event(self, event):
+        self.count += 1
+        self.event.set()
+
+
+def _watch_root(pattern: str) -> Optional[str]:
+    """パターンのうちワイルドカードを含まない最も深い既存ディレクトリを返す"""
+    root = os.path.dirname(os.path.abspath(pattern))
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    while root and not os.path.isdir(root):
+        parent = os.path.dirname(root)
+        if parent == root:
+            return None
+        root = parent
+    return root or None
+
+
+def _observe(pattern: str) -> Tuple[Optional[object], Optional[threading.Event], Optional[_ChangeHandler]]:
+    if Observer is None:
+        return None, None, None
+    root = _watch_root(pattern)
+    if root is None:
+        return None, None, None
+    wakeup = threading.Event()
+    handler = _ChangeHandler(wakeup)
+    try:
+        observer = Observer()
+        observer.schedule(handler, root, recursive=glob.has_magic(pattern) and '**' in pattern)
+        observer.start()
+    except Exception as e:
+        logger.debug(f"File system notifications unavailable for '{root}', polling instead: {e}")
+        return None, None, None
+    return observer, wakeup, handler
+
+
+def _newest(pattern: str, modified_after_ns: int = 0) -> Optional[Tuple[str, int, int]]:
+    """
+    パターンに一致するファイルのうち更新時刻が最新のものの (パス, サイズ, 更新時刻) を返す。
+    更新時刻が modified_after_ns より前のファイルは対象外。
+    """
+    if glob.has_magic(pattern):
+        candidates = glob.glob(pattern, recursive=True)
+    else:
+        candidates = [pattern]
+    newest = None
+    for path in candidates:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_mtime_ns < modified_after_ns or not os.path.isfile(path):
+            continue
+        if newest is None or stat.st_mtime_ns > newest[2]:
+            newest = (path, stat.st_size, stat.st_mtime_ns)
+    return newest
+
+
+def wait_for_stable_file(pattern: str,
+                         quiet_period: float = 1.0,
+                         timeout: float = 60.0,
+                         interval: float = 0.1,
+                         max_interval: float = 2.0,
+                         min_size: int = 0,
+                         modified_after: Optional[float] = None,
+                         use_notifications: bool = True) -> FileWaitResult:
+    """
+    ファイルが存在し、サイズと更新時刻が quiet_period 秒変化しなくなるまで待つ。
+
+    Args:
+        pattern (str): ファイルパス、または glob パターン（一致したファイルのうち最新のものを対象にする）
+        quiet_period (float): 変化が無いことを確認する秒数
+        timeout (float): 待機上限（秒）
+        interval (float): 最初の確認間隔（秒）
+        max_interval (float): 確認間隔の上限（秒）
+        min_size (int): 完了とみなす最小バイト数
+        modified_after (Optional[float]): 指定時はこの時刻（エポック秒）以降に更新されたファイルだけを対象にする
+        use_notifications (bool): 変更通知（watchdog）を使うか
+
+    Returns:
+        FileWaitResult: 対象ファイルと待機時間
+
+    Raises:
+        TimeoutError: 期限までにファイルが安定しなかった場合（最後に観測した状態を含む）
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    modified_after_ns = int(modified_after * 1e9) if modified_after else 0
+    observer, wakeup, handler = _observe(pattern) if use_notifications else (None, None, None)
+    last = None
+    stable_since = start
+    current_interval = interval
+    checks = 0
+    try:
+        while True:
+            if wakeup is not None:
+                wakeup.clear()
+            observed = _newest(pattern, modified_after_ns)
+            checks += 1
+            now = time.monotonic()
+
+            if observed != last:
+                last = observed
+                stable_since = now
+                current_interval = interval
+            elif observed is not None and observed[1] >= min_size and now - stable_since >= quiet_period:
+                return FileWaitResult(observed[0], observed[1], now - start, checks,
+                                      handler.count if handler else 0)
+            else:
+                current_interval = min(current_interval * 2, max_interval)
+
+            if now >= deadline:
+                state = (f"newest match '{last[0]}' size={last[1]}, unchanged for {now - stable_since:.2f}s"
+                         if last else "no matching file")
+                raise TimeoutError(f"File '{pattern}' did not become stable within {timeout}s "
+                                   f"(quiet_period={quiet_period}s, {state})")
+
+            # 安定を確認できる時刻・期限を越えて眠らない
+            sleep_for = min(current_interval, deadline - now)
+            if last is not None and last[1] >= min_size:
+                sleep_for = min(sleep_for, max(0.0, stable_since + quiet_period - now))
+            if wakeup is not None:
+                wakeup.wait(sleep_for)
+            else:
+                time.sleep(sleep_for)
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=1.0)
@@ -0,0 +1,106 @@
+"""
+ウィンドウのフォーカス状態を追跡するユーティリティモジュール。
+最後にアクティブ化したウィンドウハンドルを記憶し、前面ウィンドウが
+変わっていない場合は再アクティブ化（set_focus + 待機）を省略する。
+"""
+import logging
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def get_foreground_handle() -> Optional[int]:
+    """
+    現在の前面ウィンドウのハンドルを取得する。
+    win32guiが利用できない場合や取得に失敗した場合はNoneを返す。
+
+    Returns:
+        Optional[int]: 前面ウィンドウのハンドル
+    """
+    try:
+        import win32gui
+        return win32gui.GetForegroundWindow() or None
+    except Exception:
+        logger.debug("GetForegroundWindow failed", exc_info=True)
+        return None
+
+
+class FocusTracker:
+    """最後にアクティブ化したウィンドウを記憶し、不要なアクティブ化を省略するクラス"""
+
+    def __init__(self, name: str = "window"):
+        """
+        Args:
+            name (str): ログ出力用の名称（例: 'Excel'）
+        """
+        self.name = name
+        self._last_handle: Optional[int] = None
+        self.activations = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def is_active(self, handle: Optional[int]) -> bool:
+        """
+        指定ハンドルが最後にアクティブ化したウィンドウであり、かつ現在も前面にあるかを判定する。
+
+        Args:
+            handle (Optional[int]): 判定対象のウィンドウハンドル
+
+        Returns:
+            bool: アクティブ化を省略できる場合True
+        """
+        if not handle or handle != self._last_handle:
+            return False
+        return get_foreground_handle() == handle
+
+    def ensure_active(self, handle: Optional[int], activate: Callable[[], bool], operation_name: str = "operation") -> bool:
+        """
+        フォーカスが変わっている場合のみactivateを呼び出す。
+
+        Args:
+            handle (Optional[int]): 対象ウィンドウのハンドル
+            activate (Callable[[], bool]): 実際のアクティブ化処理
+            operation_name (str): ログ出力用の操作名
+
+        Returns:
+            bool: ウィンドウがアクティブな状態であればTrue
+        """
+        if self.is_active(handle):
+            self.skipped += 1
+            logger.debug(f"{self.name} window still in foreground before {operation_name}; activation skipped")
+            return True
+
+        activated = activate()
+        if activated:
+            self.activations += 1
+            self._last_handle = handle
+        else:
+            self.failures += 1
+            self._last_handle = None
+        logger.debug(f"{self.name} focus stats: {self.format_stats()}")
+        return activated
+
+    def invalidate(self):
+        """記憶しているハンドルを破棄する（ウィンドウ再作成・終了時に使用）"""
+        self._last_handle = None
+
+    def stats(self) -> Dict[str, int]:
+        """アクティブ化の統計情報を返す"""
+        return {
+            "activations": self.activations,
+            "skipped": self.skipped,
+            "failures": self.failures,
+        }
+
+    def format_stats(self) -> str:
+        """統計情報をログ出力用の文字列に整形する"""
+        return f"activations={self.activations}, skipped={self.skipped}, failures={self.failures}"
+
+    def reset(self):
+        """ハンドルと統計情報をリセットする"""
+        if self.activations or self.skipped or self.failures:
+            logger.info(f"{self.name} focus tracking summary: {self.format_stats()}")
+        self._last_handle = None
+        self.activations = 0
+        self.skipped = 0
+        self.failures = 0
@@ -0,0 +1,141 @@
+"""
+画像の見た目比較（ビジュアルリグレッション）用ユーティリティモジュール。
+NumPy でピクセル単位の差分をまとめて計算し、許容差・無視領域（マスク）・
+変化ピクセル比率の閾値で一致を判定する。不一致時は差分ヒートマップを生成する。
+"""
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+def to_rgb_array(image: Any) -> np.ndarray:
+    """PIL Image を (height, width, 3) の uint8 配列に変換する（配列はそのまま返す）"""
+    if isinstance(image, np.ndarray):
+        return image
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.asarray(image)
+
+
+def build_mask(shape: Sequence[int], regions: Optional[Iterable[Sequence[int]]]) -> Optional[np.ndarray]:
+    """
+    無視領域のリストから比較除外マスクを作成する。
+
+    Args:
+        shape (Sequence[int]): 画像の (height, width)
+        regions (Optional[Iterable[Sequence[int]]]): [left, top, right, bottom] のリスト（right/bottom は含まない）
+
+    Returns:
+        Optional[np.ndarray]: 除外する画素がTrueの bool 配列。領域が無い場合はNone。
+    """
+    if not regions:
+        return None
+    height, width = shape[:2]
+    mask = np.zeros((height, width), dtype=bool)
+    for region in regions:
+        if len(region) != 4:
+            raise ValueError(f"Mask region must be [left, top, right, bottom]: {region}")
+        left, top, right, bottom = (int(v) for v in region)
+        mask[max(0, top):max(0, bottom), max(0, left):max(0, right)] = True
+    return mask
+
+
+class ImageDiffResult:
+    """画像比較の結果"""
+
+    def __init__(self, delta: Optional[np.ndarray], changed: Optional[np.ndarray],
+                 compared_pixels: int, reason: Optional[str] = None):
+        self.delta = delta
+        self.changed = changed
+        self.compared_pixels = compared_pixels
+        self.changed_pixels = int(np.count_nonzero(changed)) if changed is not None else compared_pixels
+        self.reason = reason
+
+    @property
+    def ratio(self) -> float:
+        """比較対象画素に占める変化画素の割合"""
+        if self.reason:
+            return 1.0
+        return self.changed_pixels / self.compared_pixels if self.compared_pixels else 0.0
+
+    @property
+    def max_delta(self) -> int:
+        """チャンネル差の最大値"""
+        return int(self.delta.max()) if self.delta is not None and self.delta.size else 0
+
+    def matches(self, threshold: float = 0.0) -> bool:
+        """変化画素の割合が閾値以下であればTrue"""
+        return self.reason is None and self.ratio <= threshold
+
+    def summary(self) -> str:
+        if self.reason:
+            return self.reason
+        return (f"{self.changed_pixels}/{self.compared_pixels} pixels changed "
+                f"({self.ratio:.4%}), max channel delta {self.max_delta}")
+
+
+def compare_images(actual: Any, baseline: Any, tolerance: int = 0,
+                   mask_regions: Optional[Iterable[Sequence[int]]] = None) -> ImageDiffResult:
+    """
+    2つの画像をピクセル単位で比較する。
+
+    各画素のRGBチャンネル差の最大値が tolerance を超える画素を「変化あり」とする。
+    差分は uint8 のまま max - min で計算し、中間配列の型変換を避ける。
+    チャンネル方向の最大値は max(axis=2) ではなくチャンネルごとの np.maximum で求める
+    （要素数3の軸での縮約は非常に遅いため）。
+
+    Args:
+        actual (Any): 比較対象の PIL Image または (height, width, 3) の uint8 配列
+        baseline (Any): 基準の PIL Image または配列
+        tolerance (int): 許容するチャンネル差（0-255）
+        mask_regions (Optional[Iterable[Sequence[int]]]): 比較から除外する [left, top, right, bottom] のリスト
+
+    Returns:
+        ImageDiffResult: 比較結果
+    """
+    a = to_rgb_array(actual)
+    b = to_rgb_array(baseline)
+    if a.shape != b.shape:
+        return ImageDiffResult(None, None, a.shape[0] * a.shape[1],
+                               reason=f"Image size differs: actual {a.shape[1]}x{a.shape[0]}, "
+                                      f"baseline {b.shape[1]}x{b.shape[0]}")
+
+    diff = np.maximum(a, b) - np.minimum(a, b)
+    delta = np.maximum(np.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+    changed = delta > tolerance
+    compared = changed.size
+
+    mask = build_mask(a.shape, mask_regions)
+    if mask is not None:
+        changed &= ~mask
+        delta[mask] = 0
+        compared -= int(np.count_nonzero(mask))
+
+    return ImageDiffResult(delta, changed, compared)
+
+
+def render_heatmap(actual: Any, result: ImageDiffResult) -> Any:
+    """
+    差分ヒートマップを生成する。比較対象画像を薄いグレーで表示し、
+    変化画素をチャンネル差の大きさに応じた赤で重ねる。
+
+    Args:
+        actual (Any): 比較対象の PIL Image
+        result (ImageDiffResult): compare_images の結果
+
+    Returns:
+        Any: ヒートマップの PIL Image
+    """
+    from PIL import Image
+
+    gray = np.asarray(actual.convert('L'), dtype=np.uint8)
+    background = (gray // 3 + 170).astype(np.uint8)
+    heatmap = np.stack([background, background, background], axis=2)
+    if result.changed is not None:
+        intensity = result.delta[result.changed].astype(np.uint16)
+        heatmap[result.changed] = np.stack([
+            np.full_like(intensity, 255),
+            (200 - intensity * 200 // 255),
+            (200 - intensity * 200 // 255),
+        ], axis=1).astype(np.uint8)
+    return Image.fromarray(heatmap)
@@ -0,0 +1,377 @@
+"""
+参照画像とのテンプレートマッチングで画面上の要素を特定するユーティリティモジュール。
+UIAツリーからの探索が遅い、または要素が公開されていないレガシーアプリ向けの
+フォールバック用ロケーター。
+
+正規化相互相関（NCC）を NumPy で一括計算する（相関は FFT、窓ごとの和と二乗和は
+積分画像で求める）。画像ピラミッドの最も粗い階層で全体を探索し、候補位置の周辺だけを
+細かい階層で再評価する。探索範囲（ROI）を指定すると、その範囲のみを探索する。
+"""
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.keyboard_lock import keyboard_lock
+
+logger = logging.getLogger(__name__)
+
+
+def to_gray_array(image: Any) -> np.ndarray:
+    """PIL Image または配列を float64 のグレースケール配列に変換する"""
+    if isinstance(image, np.ndarray):
+        array = image
+        if array.ndim == 3:
+            array = array[..., :3] @ np.array([0.299, 0.587, 0.114])
+        return array.astype(np.float64, copy=False)
+    return np.asarray(image.convert('L'), dtype=np.float64)
+
+
+def virtual_screen_origin() -> Tuple[int, int]:
+    """
+    仮想スクリーン（全モニタを含む領域）の左上の画面座標を返す。
+    プライマリモニタの左や上にモニタがある場合は負の値になる。win32api が使えない環境では (0, 0)。
+    """
+    try:
+        import win32api
+        import win32con
+    except ImportError:
+        return (0, 0)
+    return (win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN),
+            win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN))
+
+
+def downsample(array: np.ndarray) -> np.ndarray:
+    """2x2 の平均で縦横を半分に縮小する"""
+    h, w = array.shape[0] // 2 * 2, array.shape[1] // 2 * 2
+    return array[:h, :w].reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3))
+
+
+def ncc_map(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """
+    画像中の全位置についてテンプレートとの正規化相互相関を計算する。
+
+    Args:
+        image (np.ndarray): グレースケール画像（float64）
+        template (np.ndarray): グレースケールのテンプレート（float64）
+
+    Returns:
+        np.ndarray: (ih - th + 1, iw - tw + 1) の相関係数（-1.0〜1.0）。
+            テンプレートが画像より大きい場合は空配列。
+    """
+    ih, iw = image.shape
+    th, tw = template.shape
+    if th > ih or tw > iw:
+        return np.empty((0, 0))
+
+    t = template - template.mean()
+    t_norm = np.sqrt((t * t).sum())
+    if t_norm == 0:
+        # 一様なテンプレートは相関が定義できない
+        return np.zeros((ih - th + 1, iw - tw + 1))
+
+    # 相関（テンプレートを反転した畳み込み）を FFT で計算し、有効範囲だけを取り出す
+    spectrum = np.fft.rfft2(image) * np.fft.rfft2(t[::-1, ::-1], s=(ih, iw))
+    numerator = np.fft.irfft2(spectrum, s=(ih, iw))[th - 1:, tw - 1:]
+
+    # 各窓の画素和と二乗和を積分画像から求める
+    n = th * tw
+    ii = np.zeros((ih + 1, iw + 1))
+    ii[1:, 1:] = image.cumsum(0).cumsum(1)
+    ii2 = np.zeros((ih + 1, iw + 1))
+    ii2[1:, 1:] = (image * image).cumsum(0).cumsum(1)
+    s1 = ii[th:, tw:] - ii[:-th, tw:] - ii[th:, :-tw] + ii[:-th, :-tw]
+    s2 = ii2[th:, tw:] - ii2[:-th, tw:] - ii2[th:, :-tw] + ii2[:-th, :-tw]
+    variance = np.maximum(s2 - s1 * s1 / n, 0.0)
+
+    denominator = np.sqrt(variance) * t_norm
+    result = np.zeros_like(numerator)
+    valid = denominator > 1e-6 * t_norm
+    result[valid] = numerator[valid] / denominator[valid]
+    return result
+
+
+def _top_candidates(scores: np.ndarray, count: int, min_distance: int) -> List[Tuple[int, int, float]]:
+    """相関マップから互いに離れた上位候補を (x, y, score) で返す"""
+    if scores.size == 0:
+        return []
+    flat = scores.ravel()
+    k = min(flat.size, count * 16)
+    order = np.argpartition(flat, -k)[-k:]
+    order = order[np.argsort(flat[order])[::-1]]
+    candidates: List[Tuple[int, int, float]] = []
+    for idx in order:
+        y, x = divmod(int(idx), scores.shape[1])
+        if all(abs(x - cx) > min_distance or abs(y - cy) > min_distance for cx, cy, _ in candidates):
+            candidates.append((x, y, float(flat[idx])))
+            if len(candidates) >= count:
+                break
+    return candidates
+
+
+class TemplateMatch:
+    """テンプレートマッチングの結果（画面座標）"""
+
+    def __init__(self, left: int, top: int, width: int, height: int, score: float):
+        self.left = left
+        self.top = top
+        self.right = left + width
+        self.bottom = top + height
+        self.score = score
+
+    def width(self) -> int:
+        return self.right - self.left
+
+    def height(self) -> int:
+        return self.bottom - self.top
+
+    def mid_point(self) -> Tuple[int, int]:
+        return ((self.left + self.right) // 2, (self.top + self.bottom) // 2)
+
+    def __repr__(self):
+        return f"TemplateMatch(L{self.left}, T{self.top}, R{self.right}, B{self.bottom}, score={self.score:.3f})"
+
+
+class TemplateMatcher:
+    """参照画像のピラミッドを保持し、スクリーンショット上の位置を探索するクラス"""
+
+    def __init__(self, template: Any, max_levels: int = 3, min_template_size: int = 8):
+        """
+        Args:
+            template (Any): 参照画像（PIL Image または配列）
+            max_levels (int): ピラミッドの最大縮小回数
+            min_template_size (int): 最も粗い階層でのテンプレートの短辺の最小ピクセル数
+        """
+        gray = to_gray_array(template)
+        self.height, self.width = gray.shape
+        self.templates = [gray]
+        while (len(self.templates) <= max_levels
+               and min(self.templates[-1].shape) // 2 >= min_template_size):
+            self.templates.append(downsample(self.templates[-1]))
+
+    @property
+    def levels(self) -> int:
+        return len(self.templates) - 1
+
+    def find(self,
+             screenshot: Any,
+             threshold: float = 0.9,
+             roi: Optional[Sequence[int]] = None,
+             origin: Tuple[int, int] = (0, 0),
+             candidates: int = 3) -> Optional[TemplateMatch]:
+        """
+        スクリーンショットからテンプレートに最も一致する位置を探索する。
+
+        Args:
+            screenshot (Any): 探索対象の画像（PIL Image または配列）
+            threshold (float): 一致とみなす相関係数の下限
+            roi (Optional[Sequence[int]]): 探索範囲 [left, top, right, bottom]（画面座標）
+            origin (Tuple[int, int]): screenshot の左上の画面座標
+            candidates (int): 粗い階層から細かい階層へ引き継ぐ候補数
+
+        Returns:
+            Optional[TemplateMatch]: 見つかった位置（画面座標）。閾値未満の場合はNone。
+        """
+        image = to_gray_array(screenshot)
+        offset_x, offset_y = origin
+        if roi:
+            left, top, right, bottom = (int(v) for v in roi)
+            left, top = max(left - offset_x, 0), max(top - offset_y, 0)
+            right, bottom = min(right - offset_x, image.shape[1]), min(bottom - offset_y, image.shape[0])
+            image = image[top:bottom, left:right]
+            offset_x, offset_y = offset_x + left, offset_y + top
+
+        pyramid = [image]
+        for _ in range(self.levels):
+            pyramid.append(downsample(pyramid[-1]))
+
+        # 最も粗い階層で全体を探索する。縮小時の位置ずれで相関が下がるため、
+        # 粗い階層では閾値を緩め、最終的な判定は元の解像度で行う
+        level = self.levels
+        coarse = ncc_map(pyramid[level], self.templates[level])
+        floor = threshold / 2 if level else threshold
+        found = [c for c in _top_candidates(coarse, candidates, max(self.templates[level].shape) // 2)
+                 if c[2] >= floor]
+
+        # 候補位置の周辺だけを細かい階層で再評価
+        radius = 3
+        while level > 0 and found:
+            level -= 1
+            template = self.templates[level]
+            th, tw = template.shape
+            layer = pyramid[level]
+            refined = []
+            for x, y, _ in found:
+                x0, y0 = max(2 * x - radius, 0), max(2 * y - radius, 0)
+                window = layer[y0:min(2 * y + th + radius, layer.shape[0]),
+                               x0:min(2 * x + tw + radius, layer.shape[1])]
+                scores = ncc_map(window, template)
+                if scores.size == 0:
+                    continue
+                dy, dx = np.unravel_index(int(np.argmax(scores)), scores.shape)
+                refined.append((x0 + int(dx), y0 + int(dy), float(scores[dy, dx])))
+            found = refined
+
+        if not found:
+            return None
+        x, y, score = max(found, key=lambda c: c[2])
+        if score < threshold:
+            return None
+        return TemplateMatch(offset_x + x, offset_y + y, self.width, self.height, score)
+
+
+class ImageElement:
+    """
+    テンプレートマッチングで特定した画面上の領域を、pywinauto の要素のように扱うクラス。
+    位置は最初に必要になった時点で探索する。click_input は領域の中心をクリックし、
+    window_text / get_value は中心座標にある UIA 要素から取得する。
+    """
+
+    # 参照画像のパス → TemplateMatcher（ピラミッド構築を1回にする）
+    _matchers: Dict[Tuple[str, int], TemplateMatcher] = {}
+
+    def __init__(self, template_path: str, roi: Optional[Sequence[int]] = None, threshold: float = 0.9,
+                 timeout: float = 5.0, max_levels: int = 3):
+        """
+        Args:
+            template_path (str): 参照画像のパス
+            roi (Optional[Sequence[int]]): 探索範囲 [left, top, right, bottom]（画面座標）
+            threshold (float): 一致とみなす相関係数の下限
+            timeout (float): 見つかるまで再試行する秒数
+            max_levels (int): ピラミッドの最大縮小回数
+        """
+        self.template_path = template_path
+        self.roi = roi
+        self.threshold = threshold
+        self.timeout = timeout
+        self.max_levels = max_levels
+        self._match: Optional[TemplateMatch] = None
+
+    @classmethod
+    def get_matcher(cls, template_path: str, max_levels: int = 3) -> TemplateMatcher:
+        key = (os.path.abspath(template_path), max_levels)
+        matcher = cls._matchers.get(key)
+        if matcher is None:
+            from PIL import Image
+            with Image.open(template_path) as template:
+                matcher = TemplateMatcher(template, max_levels=max_levels)
+            cls._matchers[key] = matcher
+        return matcher
+
+    def locate(self, timeout: Optional[float] = None, retry_interval: float = 0.2) -> Optional[TemplateMatch]:
+        """画面をキャプチャして参照画像を探索する。見つからなければ timeout まで retry_interval 秒ごとに再試行する。"""
+        from PIL import ImageGrab
+
+        matcher = self.get_matcher(self.template_path, self.max_levels)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            # ROI指定時はその範囲だけをキャプチャする
+            bbox = tuple(int(v) for v in self.roi) if self.roi else None
+            screenshot = ImageGrab.grab(bbox=bbox, all_screens=True)
+            # all_screens=True の全画面キャプチャは仮想スクリーンの左上が原点になる
+            origin = bbox[:2] if bbox else virtual_screen_origin()
+            match = matcher.find(screenshot, threshold=self.threshold, origin=origin)
+            if match or time.monotonic() >= deadline:
+                if match:
+                    logger.debug(f"Image locator matched {self.template_path} at {match}")
+                return match
+            time.sleep(max(0.0, min(retry_interval, deadline - time.monotonic())))
+
+    def _require_match(self) -> TemplateMatch:
+        if self._match is None:
+            self._match = self.locate()
+        if self._match is None:
+            raise LookupError(f"Reference image not found on screen: {self.template_path}")
+        return self._match
+
+    def exists(self, timeout: Optional[float] = None, retry_interval: float = 0.2) -> bool:
+        """参照画像が画面上にあるか。timeout 指定時は見つかるまで再試行する（pywinauto の exists と同様に既定は待たない）"""
+        self._match = self.locate(timeout=0 if timeout is None else timeout, retry_interval=retry_interval)
+        return self._match is not None
+
+    # 画像として見えていれば満たされるとみなす状態（pywinauto の wait の wait_for に対応）
+    WAIT_STATES = ('exists', 'visible', 'enabled', 'ready', 'active')
+
+    def _check_wait_states(self, wait_for: str):
+        unknown = [state for state in wait_for.split() if state.lower() not in self.WAIT_STATES]
+        if unknown:
+            raise ValueError(f"Unsupported wait state(s) for image element: {unknown}")
+
+    def wait(self, wait_for: str = 'exists', timeout: Optional[float] = None,
+             retry_interval: float = 0.2) -> "ImageElement":
+        """
+        参照画像が画面に現れるまで待機する（pywinauto の WindowSpecification.wait 相当）。
+
+        Args:
+            wait_for (str): 'exists' / 'visible' / 'enabled' / 'ready' / 'active'（空白区切りで複数可。いずれも画面上にあること）
+            timeout (Optional[float]): 最大待機秒数。Noneの場合は生成時の timeout
+            retry_interval (float): 再試行の間隔（秒）
+
+        Returns:
+            ImageElement: self（一致した位置を記憶する）
+
+        Raises:
+            TimeoutError: 期限までに見つからなかった場合
+        """
+        self._check_wait_states(wait_for)
+        timeout = self.timeout if timeout is None else timeout
+        if not self.exists(timeout=timeout, retry_interval=retry_interval):
+            raise TimeoutError(f"Reference image '{self.template_path}' did not appear within {timeout}s")
+        return self
+
+    def wait_not(self, wait_for_not: str = 'exists', timeout: Optional[float] = None,
+                 retry_interval: float = 0.2):
+        """
+        参照画像が画面から消えるまで待機する（pywinauto の WindowSpecification.wait_not 相当）。
+
+        Raises:
+            TimeoutError: 期限を過ぎても表示されている場合
+        """
+        self._check_wait_states(wait_for_not)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while self.exists():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Reference image '{self.template_path}' still on screen after {timeout}s")
+            time.sleep(min(retry_interval, remaining))
+        self._match = None
+
+    def rectangle(self) -> TemplateMatch:
+        return self._require_match()
+
+    def click_input(self, button: str = 'left', double: bool = False):
+        from pywinauto import mouse
+        x, y = self._require_match().mid_point()
+        if double:
+            mouse.double_click(button=button, coords=(x, y))
+        else:
+            mouse.click(button=button, coords=(x, y))
+
+    def type_keys(self, keys: str, with_spaces: bool = True):
+        from pywinauto import keyboard
+        with keyboard_lock:
+            self.click_input()
+            keyboard.send_keys(keys, with_spaces=with_spaces)
+
+    def _element_at_center(self) -> Any:
+        from pywinauto import Desktop
+        x, y = self._require_match().mid_point()
+        return Desktop(backend='uia').from_point(x, y)
+
+    def window_text(self) -> str:
+        return self._element_at_center().window_text()
+
+    def get_value(self) -> str:
+        return self._element_at_center().iface_value.CurrentValue
+
+    def capture_as_image(self) -> Any:
+        from PIL import ImageGrab
+        match = self._require_match()
+        return ImageGrab.grab(bbox=(match.left, match.top, match.right, match.bottom), all_screens=True)
+
+    def __repr__(self):
+        return f"ImageElement({self.template_path!r}, match={self._match})"
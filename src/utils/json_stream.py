@@ -0,0 +1,278 @@
+"""
+大きなJSON出力をストリーミングで解析し、パス式ごとのアサーションを1回の走査でまとめて評価する
+ユーティリティモジュール。ijson のイベント（prefix, event, value）を順に処理するため、
+メモリ使用量はファイルサイズに依存しない（値の比較が必要なオブジェクト・配列だけを組み立てる）。
+
+パス式の書式:
+    $.summary.total        オブジェクトのキー
+    $.results[0].id        配列の添字
+    $.results[*].status    配列の全要素
+    $.users.*.name         オブジェクトの全キー
+キーに '.' を含むパスは指定できない（ijson の prefix が '.' 区切りのため）。
+"""
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    # 任意: 未導入時は json.load で全体を読み込んでから同じ処理を行う（メモリ使用量は一定にならない）
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+MAX_FAILURES_PER_ASSERTION = 5
+_START_EVENTS = {'start_map', 'start_array'}
+_END_EVENTS = {'end_map', 'end_array'}
+# ノードの開始ではないイベント（一致判定の対象外）
+_SKIPPED_EVENTS = _END_EVENTS | {'map_key'}
+_SEGMENT = re.compile(r"\.([^.\[\]]+)|\[(\*|\d+)\]")
+
+
+def parse_path(path: str) -> List[Union[str, int]]:
+    """
+    パス式を要素のリストに変換する。'*' はキーの、-1 は配列添字のワイルドカード。
+
+    Raises:
+        ValueError: パス式が不正な場合
+    """
+    if not path.startswith('$'):
+        raise ValueError(f"JSON path must start with '$': {path}")
+    segments: List[Union[str, int]] = []
+    position = 1
+    while position < len(path):
+        match = _SEGMENT.match(path, position)
+        if not match:
+            raise ValueError(f"Invalid JSON path '{path}' at position {position}")
+        key, index = match.groups()
+        if key is not None:
+            segments.append(key)
+        else:
+            segments.append(-1 if index == '*' else int(index))
+        position = match.end()
+    return segments
+
+
+class _CompiledPath:
+    """パス式を ijson の prefix に対する正規表現と、配列添字の条件に変換したもの"""
+
+    def __init__(self, path: str):
+        self.path = path
+        parts = []
+        # (配列の prefix の要素数, 添字) の条件
+        self.indices: List[Tuple[int, int]] = []
+        # 要素数を数える必要がある配列の prefix の正規表現
+        self.arrays: List[str] = []
+        for segment in parse_path(path):
+            if isinstance(segment, int):
+                if segment >= 0:
+                    self.indices.append((len(parts), segment))
+                    self.arrays.append(r'\.'.join(parts))
+                parts.append('item')
+            elif segment == '*':
+                parts.append('[^.]+')
+            else:
+                parts.append(re.escape(segment))
+        self.regex = re.compile(r'\.'.join(parts) + r'\Z')
+        self.array_regexes = [re.compile(p + r'\Z') for p in self.arrays]
+
+
+def _events_from_object(obj: Any, prefix: str = '') -> Iterator[Tuple[str, str, Any]]:
+    """読み込み済みのオブジェクトから ijson.parse と同じ形式のイベントを生成する（ijson 未導入時用）"""
+    if isinstance(obj, dict):
+        yield prefix, 'start_map', None
+        for key, value in obj.items():
+            yield prefix, 'map_key', key
+            yield from _events_from_object(value, f"{prefix}.{key}" if prefix else key)
+        yield prefix, 'end_map', None
+    elif isinstance(obj, list):
+        yield prefix, 'start_array', None
+        item = f"{prefix}.item" if prefix else 'item'
+        for value in obj:
+            yield from _events_from_object(value, item)
+        yield prefix, 'end_array', None
+    elif obj is None:
+        yield prefix, 'null', None
+    elif isinstance(obj, bool):
+        yield prefix, 'boolean', obj
+    elif isinstance(obj, (int, float)):
+        yield prefix, 'number', obj
+    else:
+        yield prefix, 'string', obj
+
+
+class _Builder:
+    """イベント列からオブジェクト・配列を組み立てる"""
+
+    def __init__(self):
+        self.stack: List[Any] = []
+        self.keys: List[Optional[str]] = []
+        self.value: Any = None
+        self.done = False
+
+    def _add(self, value: Any):
+        if not self.stack:
+            self.value = value
+            self.done = True
+        elif isinstance(self.stack[-1], list):
+            self.stack[-1].append(value)
+        else:
+            self.stack[-1][self.keys[-1]] = value
+
+    def event(self, event: str, value: Any):
+        if event == 'map_key':
+            self.keys[-1] = value
+        elif event in _START_EVENTS:
+            container: Any = {} if event == 'start_map' else []
+            self.stack.append(container)
+            self.keys.append(None)
+        elif event in _END_EVENTS:
+            container = self.stack.pop()
+            self.keys.pop()
+            self._add(container)
+        else:
+            self._add(value)
+
+
+class JsonAssertion:
+    """1つのパス式に対するアサーションと、その評価状態"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not spec.get('path'):
+            raise ValueError(f"JSON assertion needs 'path': {spec}")
+        self.spec = spec
+        self.path = _CompiledPath(spec['path'])
+        self.has_expected = 'expected' in spec
+        self.pattern = re.compile(spec['pattern']) if spec.get('pattern') else None
+        self.needs_value = self.has_expected or self.pattern is not None
+        self.count = 0
+        self.failures: List[str] = []
+        self.failure_count = 0
+
+    def check(self, value: Any):
+        self.count += 1
+        if self.has_expected and value != self.spec['expected']:
+            self._fail(f"expected {self.spec['expected']!r}, got {value!r}")
+        elif self.pattern is not None and not (isinstance(value, (str, int, float))
+                                               and self.pattern.fullmatch(str(value))):
+            self._fail(f"{value!r} does not match pattern '{self.pattern.pattern}'")
+
+    def _fail(self, message: str):
+        self.failure_count += 1
+        if len(self.failures) < MAX_FAILURES_PER_ASSERTION:
+            self.failures.append(f"match #{self.count}: {message}")
+
+    def result(self) -> Dict[str, Any]:
+        problems = []
+        count_rule = self.spec.get('count')
+        exists = self.spec.get('exists')
+        if isinstance(count_rule, dict):
+            low, high = count_rule.get('min'), count_rule.get('max')
+            if (low is not None and self.count < int(low)) or (high is not None and self.count > int(high)):
+                problems.append(f"count {self.count} is outside the expected range {count_rule}")
+        elif count_rule is not None and self.count != int(count_rule):
+            problems.append(f"count {self.count} != expected {count_rule}")
+        if exists is False and self.count:
+            problems.append(f"expected no match, found {self.count}")
+        elif (exists or (count_rule is None and exists is None)) and not self.count:
+            problems.append("path not found")
+        problems.extend(self.failures)
+        if self.failure_count > len(self.failures):
+            problems.append(f"... and {self.failure_count - len(self.failures)} more mismatch(es)")
+        return {'path': self.path.path, 'count': self.count, 'passed': not problems, 'problems': problems}
+
+
+def evaluate_json(path: str, assertions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    JSONファイルを1回走査して、全てのアサーションを評価する。
+
+    Args:
+        path (str): JSONファイルのパス
+        assertions (List[Dict[str, Any]]): アサーションのリスト。各要素のキー:
+            path: パス式（必須）
+            expected: 一致した全ての値が等しいこと
+            pattern: 一致した全ての値（文字列化）が正規表現に全体一致すること
+            count: 一致した数（整数、または {"min": n, "max": m}）
+            exists: true / false（未指定で expected / pattern のみの場合は true とみなす）
+
+    Returns:
+        List[Dict[str, Any]]: アサーションと同じ順の結果（'path'、'count'、'passed'、'problems'）
+    """
+    checks = [JsonAssertion(spec) for spec in assertions]
+    # prefix → (一致するアサーションと添字条件, 要素として数える配列の prefix, 添字を数える配列か)。
+    # 同じ prefix が繰り返し現れるためメモ化し、どれにも該当しない prefix は ignored に入れる
+    memo: Dict[str, Tuple[List[Tuple[JsonAssertion, List[Tuple[str, int]]]], Optional[str], bool]] = {}
+    ignored = set()
+    counters: Dict[str, int] = {}
+    builders: List[Tuple[_Builder, JsonAssertion]] = []
+
+    def indexed_array(prefix: str) -> bool:
+        return any(r.match(prefix) for c in checks for r in c.path.array_regexes)
+
+    def classify(prefix: str):
+        parts = prefix.split('.') if prefix else []
+        matched = [(c, [('.'.join(parts[:depth]), index) for depth, index in c.path.indices])
+                   for c in checks if c.path.regex.match(prefix)]
+        parent = prefix[:-5] if prefix.endswith('.item') else ('' if prefix == 'item' else None)
+        element_of = parent if parent is not None and indexed_array(parent) else None
+        is_array = indexed_array(prefix)
+        if not matched and element_of is None and not is_array:
+            return None
+        return matched, element_of, is_array
+
+    with open(path, 'rb') as f:
+        if ijson is None:
+            logger.warning("ijson is not installed; loading the whole JSON document into memory")
+            events = _events_from_object(json.load(f))
+        else:
+            events = ijson.parse(f, use_float=True)
+
+        for prefix, event, value in events:
+            if builders:
+                for builder, _ in builders:
+                    builder.event(event, value)
+                if any(b.done for b, _ in builders):
+                    for builder, check in [item for item in builders if item[0].done]:
+                        check.check(builder.value)
+                    builders = [item for item in builders if not item[0].done]
+
+            if prefix in ignored or event in _SKIPPED_EVENTS:
+                continue
+            entry = memo.get(prefix)
+            if entry is None:
+                entry = classify(prefix)
+                if entry is None:
+                    ignored.add(prefix)
+                    continue
+                memo[prefix] = entry
+            matched, element_of, is_array = entry
+
+            if element_of is not None:
+                counters[element_of] = counters.get(element_of, 0) + 1
+            if is_array and event == 'start_array':
+                counters[prefix] = 0
+            for check, indices in matched:
+                if indices and any(counters.get(array, 0) - 1 != index for array, index in indices):
+                    continue
+                if not check.needs_value:
+                    check.check(None)
+                elif event in _START_EVENTS:
+                    builder = _Builder()
+                    builder.event(event, value)
+                    builders.append((builder, check))
+                else:
+                    check.check(value)
+
+    return [c.result() for c in checks]
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """失敗したアサーションを失敗メッセージ用に整形する"""
+    failed = [r for r in results if not r['passed']]
+    lines = [f"{len(failed)} of {len(results)} JSON assertion(s) failed"]
+    for result in failed:
+        lines.append(f"  {result['path']} ({result['count']} match(es)):")
+        lines.extend(f"    {problem}" for problem in result['problems'])
+    return "\n".join(lines)
@@ -0,0 +1,10 @@
+"""
+キー入力を送る処理の間で共有するロックを提供するユーティリティモジュール。
+pywinauto の send_keys は前面ウィンドウに送られるため、ダイアログ監視スレッドがウィンドウを
+前面にしてキーを送る処理と、シナリオ側の一連のキー操作（前面化とキー送信）を
+このロックで直列化し、キー入力が混ざらないようにする。
+"""
+import threading
+
+# 同じスレッド内での入れ子（一連の操作の中で type_keys を呼ぶ等）を許すため RLock とする
+keyboard_lock = threading.RLock()
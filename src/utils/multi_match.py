@@ -0,0 +1,95 @@
+"""
+複数の固定文字列（ニードル）がテキストに含まれるかを1回の走査でまとめて調べるユーティリティモジュール。
+ニードルの集合ごとに Aho-Corasick オートマトンを構築してキャッシュし、テキスト（またはファイルの
+チャンク列）を1回だけ走査する。チャンク境界をまたぐ一致は、前のチャンクの末尾
+（最長のニードルの長さ - 1 文字）を重ねることで検出する。
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    # 任意: 未導入時はニードルごとに部分一致検索する（結果は同じ）
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+MAX_AUTOMATA = 64
+
+_lock = threading.Lock()
+_automata: "OrderedDict[Tuple[Tuple[str, ...], bool], object]" = OrderedDict()
+
+
+def _automaton(keys: Tuple[str, ...], ignore_case: bool):
+    """ニードル集合のオートマトンを返す（キャッシュ済みであれば再利用する）"""
+    cache_key = (keys, ignore_case)
+    with _lock:
+        automaton = _automata.get(cache_key)
+        if automaton is not None:
+            _automata.move_to_end(cache_key)
+            return automaton
+
+    automaton = ahocorasick.Automaton()
+    for key in set(keys):
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+
+    with _lock:
+        _automata[cache_key] = automaton
+        while len(_automata) > MAX_AUTOMATA:
+            _automata.popitem(last=False)
+    return automaton
+
+
+def find_needles(chunks: Iterable[str], needles: List[str], ignore_case: bool = False,
+                 stop: Optional[str] = None) -> Set[str]:
+    """
+    テキストのチャンク列に含まれるニードルを調べる。
+
+    Args:
+        chunks (Iterable[str]): 検索対象のテキスト（1つの文字列なら [text]）
+        needles (List[str]): 固定文字列のリスト
+        ignore_case (bool): 大文字小文字を区別しない
+        stop (Optional[str]): 'all' なら全て見つかった時点で、'any' なら1つ見つかった時点で走査を打ち切る
+
+    Returns:
+        Set[str]: 見つかったニードル（needles の元の表記）
+    """
+    # 検索キー → 元のニードル（ignore_case で同じキーになるニードルはまとめて見つかる）
+    originals: Dict[str, List[str]] = {}
+    for needle in needles:
+        originals.setdefault(needle.lower() if ignore_case else needle, []).append(needle)
+    found: Set[str] = set(originals.pop('', []))
+    remaining = set(originals)
+    if not remaining or (stop == 'any' and found):
+        return found
+
+    keys = tuple(sorted(remaining))
+    overlap = max(len(key) for key in keys) - 1
+    automaton = _automaton(keys, ignore_case) if ahocorasick is not None else None
+
+    carry = ''
+    for chunk in chunks:
+        buffer = carry + (chunk.lower() if ignore_case else chunk)
+        if automaton is not None:
+            for _, key in automaton.iter(buffer):
+                if key in remaining:
+                    remaining.discard(key)
+                    found.update(originals[key])
+                    if stop == 'any' or (stop == 'all' and not remaining):
+                        return found
+        else:
+            for key in [key for key in remaining if key in buffer]:
+                remaining.discard(key)
+                found.update(originals[key])
+                if stop == 'any':
+                    return found
+            if stop == 'all' and not remaining:
+                return found
+        if not remaining:
+            break
+        carry = buffer[-overlap:] if overlap else ''
+    return found
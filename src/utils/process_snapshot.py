@@ -0,0 +1,184 @@
+"""
+プロセス一覧のスナップショットをキャッシュするユーティリティモジュール。
+psutil.process_iter による全プロセス走査を短いTTLでキャッシュし、
+プロセス名→PID のインデックスから検索する。
+TTL切れ時は新規PIDのみ名前を取得する差分更新を行う。
+PIDは (PID, 起動時刻) で識別し、再利用されたPIDは別プロセスとして名前を取得し直す。
+起動時刻の確認は、差分更新後に検索されたプロセス名のPIDに限って行う（全PIDを問い合わせると全走査と同じ負荷になるため）。
+名前を取得できない（AccessDenied）プロセスも記憶し、更新のたびに問い合わせ直さない。
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessSnapshot:
+    """プロセス名インデックス付きのプロセス一覧キャッシュ"""
+
+    DEFAULT_TTL = 1.0
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            ttl (float): スナップショットの有効期間（秒）
+        """
+        self.ttl = ttl
+        # PID → (起動時刻, 小文字のプロセス名)。名前を取得できないプロセスは名前を None として記憶する
+        self._entries: Dict[int, Tuple[Optional[float], Optional[str]]] = {}
+        self._index: Dict[str, Set[int]] = {}
+        self._taken_at: Optional[float] = None
+        # 現在のスナップショットで起動時刻を確認済み（または取得したばかり）のPID
+        self._verified: Set[int] = set()
+        self._lock = threading.Lock()
+
+        self.full_scans = 0
+        self.incremental_refreshes = 0
+        self.cache_hits = 0
+        self.pid_checks = 0
+        self.reused_pids = 0
+
+    def get_pids(self, process_name: str) -> List[int]:
+        """
+        プロセス名からプロセスIDのリストを取得する。
+
+        Args:
+            process_name (str): プロセス名 (例: 'EXCEL.EXE')。大文字小文字は区別しない。
+
+        Returns:
+            List[int]: 該当するプロセスIDのリスト
+        """
+        with self._lock:
+            if self._taken_at is None:
+                self._full_scan()
+            elif time.monotonic() - self._taken_at > self.ttl:
+                self._incremental_refresh()
+            else:
+                self.cache_hits += 1
+            name = process_name.lower()
+            self._verify(name)
+            return sorted(self._index.get(name, ()))
+
+    def invalidate(self, full: bool = False):
+        """
+        スナップショットを無効化する。次回検索時に更新される。
+
+        Args:
+            full (bool): Trueの場合は次回検索時に全走査する。Falseの場合は差分更新。
+        """
+        with self._lock:
+            if full:
+                self._entries.clear()
+                self._index.clear()
+                self._verified.clear()
+                self._taken_at = None
+            elif self._taken_at is not None:
+                self._taken_at = float('-inf')
+
+    def _full_scan(self):
+        self._entries.clear()
+        self._index.clear()
+        for proc in psutil.process_iter(['pid', 'name', 'create_time']):
+            # 取得できなかった属性は None になる（AccessDenied は名前 None として記憶する）
+            self._add(proc.info['pid'], proc.info['create_time'], proc.info['name'])
+        self._verified = set(self._entries)
+        self._taken_at = time.monotonic()
+        self.full_scans += 1
+        logger.debug(f"Process snapshot: full scan ({len(self._entries)} processes)")
+
+    def _incremental_refresh(self):
+        current = set(psutil.pids())
+        known = set(self._entries)
+
+        for pid in known - current:
+            self._remove(pid)
+
+        added = current - known
+        for pid in added:
+            self._query(pid)
+        # 残っているPIDは検索されたときに _verify で起動時刻を確認する
+        self._verified = set(added)
+
+        self._taken_at = time.monotonic()
+        self.incremental_refreshes += 1
+        logger.debug(f"Process snapshot: incremental refresh (+{len(added)}, -{len(known - current)})")
+
+    def _verify(self, name: str):
+        """name のPIDのうち未確認のものの起動時刻を確認し、TTL内に再利用されたPIDを取得し直す"""
+        for pid in list(self._index.get(name, ())):
+            if pid in self._verified:
+                continue
+            self._verified.add(pid)
+            created = self._entries[pid][0]
+            if created is None:
+                continue
+            self.pid_checks += 1
+            try:
+                if psutil.Process(pid).create_time() == created:
+                    continue
+            except psutil.AccessDenied:
+                continue
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._remove(pid)
+                continue
+            self._remove(pid)
+            self._query(pid)
+            self.reused_pids += 1
+            logger.debug(f"Process snapshot: pid {pid} was reused by another process")
+
+    def _query(self, pid: int):
+        try:
+            proc = psutil.Process(pid)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return
+        except psutil.AccessDenied:
+            self._add(pid, None, None)
+            return
+        try:
+            created = proc.create_time()
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            created = None
+        try:
+            self._add(pid, created, proc.name())
+        except psutil.AccessDenied:
+            self._add(pid, created, None)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            pass
+
+    def _add(self, pid: int, created: Optional[float], name: Optional[str]):
+        name = name.lower() if name else None
+        self._entries[pid] = (created, name)
+        if name:
+            self._index.setdefault(name, set()).add(pid)
+
+    def _remove(self, pid: int):
+        _, name = self._entries.pop(pid)
+        pids = self._index.get(name) if name else None
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._index[name]
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュの統計情報を返す"""
+        return {
+            "full_scans": self.full_scans,
+            "incremental_refreshes": self.incremental_refreshes,
+            "cache_hits": self.cache_hits,
+            "pid_checks": self.pid_checks,
+            "reused_pids": self.reused_pids,
+            # 差分更新も psutil.pids() と新規PIDの問い合わせを行うため、走査を全く行わなかった回数だけを数える
+            "full_scans_avoided": self.cache_hits,
+        }
+
+    def format_stats(self) -> str:
+        """統計情報をログ出力用の文字列に整形する"""
+        return ", ".join(f"{k}={v}" for k, v in self.stats().items())
+
+
+# セッション全体で共有するスナップショット
+process_snapshot = ProcessSnapshot()
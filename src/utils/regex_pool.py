@@ -0,0 +1,245 @@
+"""
+シナリオで指定された正規表現をコンパイル済みで共有するユーティリティモジュール。
+パターン文字列ごとにコンパイル結果を上限付きのLRUで保持し、UI読み取り・検証・ファイル検証で再利用する。
+
+タイムアウトを指定した照合は、使い回す子プロセス（ワーカー）で実行する。Python の re は
+照合中に GIL を手放さず途中で中断できないため、破滅的なバックトラックで期限を過ぎた場合は
+ワーカーを終了して TimeoutError とし、シナリオの実行が止まらないようにする（次の照合で再起動する）。
+"""
+import atexit
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ワーカーの起動待ち上限（秒）。照合のタイムアウトには含めない
+WORKER_START_TIMEOUT = 30.0
+
+
+@dataclass
+class RegexMatch:
+    """照合結果（プロセス間で受け渡せるよう re.Match から必要な値だけを取り出したもの）"""
+    start: int
+    end: int
+    text: str
+    groups: Tuple[Optional[str], ...]
+
+    @classmethod
+    def from_match(cls, match: Optional[re.Match]) -> Optional["RegexMatch"]:
+        if match is None:
+            return None
+        return cls(match.start(), match.end(), match.group(0), match.groups())
+
+    def group(self, index: int = 0) -> Optional[str]:
+        return self.text if index == 0 else self.groups[index - 1]
+
+
+def _run(regex: Pattern, mode: str, text: str, pos: int) -> Optional[RegexMatch]:
+    if mode == 'fullmatch':
+        return RegexMatch.from_match(regex.fullmatch(text, pos))
+    return RegexMatch.from_match(regex.search(text, pos))
+
+
+def _worker_main(conn):
+    """ワーカープロセス: (パターン, フラグ, mode, 文字列, 開始位置) を受け取り照合結果を返す"""
+    patterns: Dict[Tuple[str, int], Pattern] = {}
+    conn.send('ready')
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        pattern, flags, mode, text, pos = job
+        try:
+            regex = patterns.get((pattern, flags))
+            if regex is None:
+                if len(patterns) >= 256:
+                    patterns.clear()
+                regex = patterns[(pattern, flags)] = re.compile(pattern, flags)
+            conn.send(_run(regex, mode, text, pos))
+        except Exception as e:
+            conn.send(e)
+
+
+class _Worker:
+    """タイムアウト付きの照合を実行する使い回しの子プロセス"""
+
+    def __init__(self):
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # fork はスレッド（スクリーンショット保存等）と併用できないため常に spawn を使う
+        ctx = multiprocessing.get_context('spawn')
+        parent, child = ctx.Pipe()
+        process = ctx.Process(target=_worker_main, args=(child,), name="RegexWorker", daemon=True)
+        process.start()
+        child.close()
+        if not parent.poll(WORKER_START_TIMEOUT):
+            process.kill()
+            raise RuntimeError("Regex worker process did not start")
+        parent.recv()
+        self._process, self._conn = process, parent
+
+    def _kill(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.join(1.0)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = self._conn = None
+
+    def run(self, pattern: str, flags: int, mode: str, text: str, pos: int,
+            timeout: float) -> Optional[RegexMatch]:
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._kill()
+                self._start()
+            self._conn.send((pattern, flags, mode, text, pos))
+            if not self._conn.poll(timeout):
+                self._kill()
+                raise TimeoutError(
+                    f"Regex '{pattern}' did not finish within {timeout}s on {len(text)} characters "
+                    f"(likely catastrophic backtracking); the match was cancelled")
+            result = self._conn.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stop(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.send(None)
+                except Exception:
+                    pass
+            self._kill()
+
+
+class RegexPool:
+    """コンパイル済み正規表現の共有プールと、タイムアウト付き照合"""
+
+    _max_size = 256
+    # 既定の照合タイムアウト（秒）。None の場合はタイムアウト無しでこのプロセス内で照合する
+    _timeout: Optional[float] = None
+
+    _lock = threading.Lock()
+    _patterns: "OrderedDict[Tuple[str, int], Pattern]" = OrderedDict()
+    _worker = _Worker()
+
+    hits = 0
+    misses = 0
+    evictions = 0
+    timeouts = 0
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None):
+        """
+        config.ini の [REGEX] セクション相当の設定を反映する。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 設定値（キーは大文字小文字を区別しない）
+                - MaxPatterns: 保持するコンパイル済みパターン数の上限（既定 256）
+                - Timeout: 照合1回あたりのタイムアウト秒（未指定・0でタイムアウト無し）
+        """
+        opts = {str(k).lower(): str(v).strip() for k, v in (options or {}).items()}
+        cls._max_size = max(1, int(opts.get('maxpatterns') or 256))
+        timeout = float(opts.get('timeout') or 0)
+        cls._timeout = timeout if timeout > 0 else None
+        with cls._lock:
+            while len(cls._patterns) > cls._max_size:
+                cls._patterns.popitem(last=False)
+                cls.evictions += 1
+
+    @classmethod
+    def compile(cls, pattern: str, flags: int = 0) -> Pattern:
+        """
+        パターンをコンパイルする。コンパイル済みであればプールから返す。
+
+        Raises:
+            ValueError: パターンが不正な場合
+        """
+        key = (pattern, flags)
+        with cls._lock:
+            regex = cls._patterns.get(key)
+            if regex is not None:
+                cls._patterns.move_to_end(key)
+                cls.hits += 1
+                return regex
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error as e:
+            raise ValueError(f"Invalid regex '{pattern}': {e}")
+        with cls._lock:
+            cls.misses += 1
+            cls._patterns[key] = regex
+            while len(cls._patterns) > cls._max_size:
+                cls._patterns.popitem(last=False)
+                cls.evictions += 1
+        return regex
+
+    @classmethod
+    def search(cls, pattern: str, text: str, pos: int = 0, flags: int = 0,
+               timeout: Optional[float] = None) -> Optional[RegexMatch]:
+        """
+        re.search 相当。timeout（未指定時は設定値）を過ぎると TimeoutError。
+
+        Args:
+            timeout (Optional[float]): 照合のタイムアウト秒。0 の場合はタイムアウト無し
+        """
+        return cls._match('search', pattern, text, pos, flags, timeout)
+
+    @classmethod
+    def fullmatch(cls, pattern: str, text: str, flags: int = 0,
+                  timeout: Optional[float] = None) -> Optional[RegexMatch]:
+        """re.fullmatch 相当。timeout の扱いは search と同じ"""
+        return cls._match('fullmatch', pattern, text, 0, flags, timeout)
+
+    @classmethod
+    def _match(cls, mode: str, pattern: str, text: str, pos: int, flags: int,
+               timeout: Optional[float]) -> Optional[RegexMatch]:
+        # 不正なパターンはワーカーに送る前にこのプロセスで検出する
+        regex = cls.compile(pattern, flags)
+        timeout = cls._timeout if timeout is None else (float(timeout) or None)
+        if timeout is None:
+            return _run(regex, mode, text, pos)
+        start = time.perf_counter()
+        try:
+            return cls._worker.run(pattern, flags, mode, text, pos, timeout)
+        except TimeoutError:
+            cls.timeouts += 1
+            logger.error(f"Regex timed out after {time.perf_counter() - start:.2f}s: '{pattern}'")
+            raise
+
+    @classmethod
+    def shutdown(cls):
+        """ワーカープロセスを終了する"""
+        cls._worker.stop()
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """プールの統計情報を返す"""
+        return {
+            "patterns": len(cls._patterns),
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "evictions": cls.evictions,
+            "timeouts": cls.timeouts,
+        }
+
+    @classmethod
+    def format_stats(cls) -> str:
+        """統計情報をログ出力用の文字列に整形する"""
+        return ", ".join(f"{key}={value}" for key, value in cls.stats().items())
+
+
+atexit.register(RegexPool.shutdown)
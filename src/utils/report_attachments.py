@@ -0,0 +1,144 @@
+"""
+HTMLレポートに添付するスクリーンショットを管理するユーティリティモジュール。
+フルサイズ画像はファイルのまま残してレポートからリンクし、レポートには
+メモリ上の画像から生成した小さなサムネイルだけを埋め込む。埋め込み総量が
+上限を超えた後はリンクのみを添付し、self-contained なレポートの肥大化を防ぐ。
+"""
+import base64
+import html
+import io
+import logging
+import os
+import pathlib
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def encode_thumbnail(image: Any, max_dimension: int = 320, quality: int = 70) -> bytes:
+    """
+    画像から JPEG のサムネイルを生成する。
+
+    Args:
+        image (Any): PIL Image
+        max_dimension (int): 長辺の最大ピクセル数
+        quality (int): JPEG品質
+
+    Returns:
+        bytes: JPEG データ
+    """
+    thumb = image.copy()
+    thumb.thumbnail((max_dimension, max_dimension))
+    if thumb.mode not in ('RGB', 'L'):
+        thumb = thumb.convert('RGB')
+    buf = io.BytesIO()
+    thumb.save(buf, format='JPEG', quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def report_href(path: str, report_path: Optional[str]) -> str:
+    """
+    レポートからファイルへのリンク先を返す。
+
+    Args:
+        path (str): リンク先のファイル
+        report_path (Optional[str]): report.html のパス。None（--html 未指定）の場合は file:// の絶対URI
+
+    Returns:
+        str: report.html からの相対パス（区切りは '/'）、または絶対URI
+    """
+    if not report_path:
+        return pathlib.Path(os.path.abspath(path)).as_uri()
+    try:
+        return os.path.relpath(path, os.path.dirname(os.path.abspath(report_path))).replace(os.sep, '/')
+    except ValueError:
+        # Windows で report.html と別ドライブにある場合は相対パスにできない
+        return pathlib.Path(os.path.abspath(path)).as_uri()
+
+
+class ReportAttachments:
+    """レポートへのスクリーンショット添付（サムネイル埋め込み／リンク）を管理するクラス"""
+
+    _thumbnail_size: int = 320
+    _thumbnail_quality: int = 70
+    _embed_limit_bytes: int = 5 * 1024 * 1024
+
+    _lock = threading.Lock()
+    _embedded_bytes = 0
+    _thumbnails = 0
+    _links_only = 0
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None):
+        """
+        config.ini の [REPORT] セクション相当の設定を反映する。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 設定値（キーは大文字小文字を区別しない）
+                - ThumbnailSize: サムネイルの長辺ピクセル数（既定 320）
+                - ThumbnailQuality: サムネイルのJPEG品質（既定 70）
+                - EmbedLimitKB: レポートに埋め込むサムネイルの合計上限KB。超過後はリンクのみ（0で常にリンクのみ）
+        """
+        opts = {str(k).lower(): str(v).strip() for k, v in (options or {}).items()}
+        cls._thumbnail_size = int(opts.get('thumbnailsize') or 320)
+        cls._thumbnail_quality = max(1, min(95, int(opts.get('thumbnailquality') or 70)))
+        limit = opts.get('embedlimitkb', '')
+        cls._embed_limit_bytes = int(limit) * 1024 if limit else 5 * 1024 * 1024
+
+    @classmethod
+    def build_extra(cls, extras: Any, image: Any, screenshot_path: str, report_path: Optional[str]) -> Any:
+        """
+        スクリーンショット1枚分のレポート添付を生成する。
+
+        埋め込み上限内であればフルサイズ画像へのリンク付きサムネイル（HTML）を、
+        上限を超える場合はリンクのみを返す。
+
+        Args:
+            extras (Any): pytest_html.extras モジュール
+            image (Any): 撮影した PIL Image（Noneの場合はリンクのみ）
+            screenshot_path (str): フルサイズ画像のパス
+            report_path (Optional[str]): report.html のパス（リンクの相対パス計算に使用。Noneの場合は絶対URI）
+
+        Returns:
+            Any: pytest-html の extra
+        """
+        href = report_href(screenshot_path, report_path)
+        name = os.path.basename(screenshot_path)
+
+        thumbnail = None
+        if image is not None and cls._embed_limit_bytes > 0:
+            try:
+                thumbnail = encode_thumbnail(image, cls._thumbnail_size, cls._thumbnail_quality)
+            except Exception as e:
+                logger.warning(f"Failed to create screenshot thumbnail: {e}")
+
+        with cls._lock:
+            if thumbnail is not None:
+                encoded_size = (len(thumbnail) + 2) // 3 * 4
+                if cls._embedded_bytes + encoded_size > cls._embed_limit_bytes:
+                    thumbnail = None
+                else:
+                    cls._embedded_bytes += encoded_size
+                    cls._thumbnails += 1
+            if thumbnail is None:
+                cls._links_only += 1
+
+        if thumbnail is None:
+            return extras.url(href, name=f"Screenshot: {name}")
+
+        data = base64.b64encode(thumbnail).decode('ascii')
+        return extras.html(
+            f'<div class="image"><a href="{html.escape(href)}" target="_blank" title="{html.escape(name)}">'
+            f'<img src="data:image/jpeg;base64,{data}" alt="{html.escape(name)}"/></a></div>'
+        )
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """添付の統計情報を返す"""
+        with cls._lock:
+            return {
+                'thumbnails': cls._thumbnails,
+                'links_only': cls._links_only,
+                'embedded_bytes': cls._embedded_bytes,
+            }
@@ -0,0 +1,276 @@
+"""
+メモリ上で直近の画面を録画し続けるローリングレコーダー。
+バックグラウンドスレッドで低フレームレートのキャプチャを行い、縮小したフレームを
+直前フレームとの差分（XOR）として zlib 圧縮し、固定サイズのリングバッファに保持する。
+保持するフレーム数と圧縮後の合計バイト数の両方に上限があり、超過時は古いフレームから破棄する。
+失敗時に dump() で直近N秒をアニメーションPNGまたは連番PNGとして書き出す。
+キャプチャ元は差し替え可能で、合成フレームを使えば Windows 以外でも動作確認できる。
+"""
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def screen_source() -> Any:
+    """全画面をキャプチャする既定のキャプチャ元"""
+    from PIL import ImageGrab
+    return ImageGrab.grab()
+
+
+class ScreenRecorder:
+    """直近のフレームをメモリ上に保持するローリングレコーダー"""
+
+    def __init__(self,
+                 source: Optional[Callable[[], Any]] = None,
+                 fps: float = 2.0,
+                 seconds: float = 10.0,
+                 max_dimension: Optional[int] = 640,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 compress_level: int = 1,
+                 dump_seconds: Optional[float] = None,
+                 dump_format: str = 'apng'):
+        """
+        Args:
+            source (Optional[Callable[[], Any]]): PIL Image を返すキャプチャ関数。Noneの場合は全画面。
+            fps (float): 1秒あたりのキャプチャ回数
+            seconds (float): 保持する秒数（フレーム数の上限は fps * seconds）
+            max_dimension (Optional[int]): フレームの長辺の最大ピクセル数。Noneの場合は縮小しない。
+            max_bytes (int): 圧縮後フレームの合計バイト数の上限。
+                これに加えて差分復元用に未圧縮フレーム2枚分のメモリを使用する。
+            compress_level (int): zlib 圧縮レベル
+            dump_seconds (Optional[float]): dump() で書き出す既定の秒数。Noneの場合は保持中の全フレーム。
+            dump_format (str): dump() の既定の形式（'apng' / 'frames'）
+        """
+        if fps <= 0 or seconds <= 0:
+            raise ValueError("fps and seconds must be positive")
+        self.source = source or screen_source
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.max_frames = max(1, int(round(fps * seconds)))
+        self.max_dimension = max_dimension
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.dump_seconds = dump_seconds
+        self.dump_format = dump_format
+
+        self._lock = threading.Lock()
+        # (timestamp, shape, is_key, payload)
+        self._frames: deque = deque()
+        self._bytes = 0
+        # 最も古い保持フレームの直前フレーム（差分復元の起点）と最新フレームの画素
+        self._base: Optional[np.ndarray] = None
+        self._last: Optional[np.ndarray] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.captured = 0
+        self.evicted = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, options: Optional[Dict[str, Any]] = None) -> Optional["ScreenRecorder"]:
+        """
+        config.ini の [RECORDER] セクション相当の設定からレコーダーを生成する。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 設定値（キーは大文字小文字を区別しない）
+                - Enabled: true の場合のみ生成する
+                - Fps / Seconds / MaxDimension / MaxMemoryMB: キャプチャ頻度と各上限
+                - DumpSeconds / DumpFormat: 失敗時に書き出す秒数と形式
+
+        Returns:
+            Optional[ScreenRecorder]: 無効な場合はNone
+        """
+        opts = {str(k).lower(): str(v).strip() for k, v in (options or {}).items()}
+        if opts.get('enabled', 'false').lower() not in ('1', 'true', 'yes', 'on'):
+            return None
+        max_dimension = int(opts.get('maxdimension') or 640)
+        return cls(
+            fps=float(opts.get('fps') or 2.0),
+            seconds=float(opts.get('seconds') or 10.0),
+            max_dimension=max_dimension if max_dimension > 0 else None,
+            max_bytes=int(float(opts.get('maxmemorymb') or 64) * 1024 * 1024),
+            dump_seconds=float(opts['dumpseconds']) if opts.get('dumpseconds') else None,
+            dump_format=(opts.get('dumpformat') or 'apng').lower(),
+        )
+
+    # ----- lifecycle -----
+    def start(self):
+        """バックグラウンドでの録画を開始する"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ScreenRecorder", daemon=True)
+        self._thread.start()
+        logger.info(f"Screen recorder started ({self.fps} fps, {self.max_frames} frames, "
+                    f"{self.max_bytes // (1024 * 1024)} MB)")
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """録画を停止する。バッファの内容は保持される。"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            self.capture_once()
+            next_time += self.interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                # キャプチャが間に合わない場合は遅れを持ち越さない
+                next_time = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    # ----- recording -----
+    def capture_once(self) -> bool:
+        """
+        キャプチャ元から1フレーム取得してバッファに追加する。
+
+        Returns:
+            bool: 追加できた場合True
+        """
+        try:
+            image = self.source()
+            if self.max_dimension and max(image.size) > self.max_dimension:
+                image = image.copy()
+                image.thumbnail((self.max_dimension, self.max_dimension))
+            self.add_frame(np.asarray(image.convert('RGB')))
+            return True
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Screen recorder capture failed: {e}")
+            return False
+
+    def add_frame(self, pixels: np.ndarray, timestamp: Optional[float] = None):
+        """
+        フレームを差分圧縮してバッファに追加する。
+
+        Args:
+            pixels (np.ndarray): (height, width, 3) の uint8 配列
+            timestamp (Optional[float]): 撮影時刻（UNIX時刻）。Noneの場合は現在時刻。
+        """
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            is_key = self._last is None or self._last.shape != pixels.shape
+            data = pixels if is_key else np.bitwise_xor(pixels, self._last)
+            payload = zlib.compress(data.tobytes(), self.compress_level)
+            if len(payload) > self.max_bytes:
+                self.dropped += 1
+                return
+
+            self._frames.append((timestamp, pixels.shape, is_key, payload))
+            self._bytes += len(payload)
+            self._last = pixels
+            self.captured += 1
+
+            while len(self._frames) > self.max_frames or self._bytes > self.max_bytes:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        """最も古いフレームを破棄し、差分復元の起点をそのフレームの画素に進める"""
+        frame = self._frames.popleft()
+        self._bytes -= len(frame[3])
+        self._base = self._decode(frame, self._base)
+        self.evicted += 1
+
+    @staticmethod
+    def _decode(frame: Tuple, previous: Optional[np.ndarray]) -> np.ndarray:
+        _, shape, is_key, payload = frame
+        data = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(shape)
+        return data.copy() if is_key else np.bitwise_xor(data, previous)
+
+    # ----- playback -----
+    def frames(self, seconds: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """
+        保持中のフレームを復元して返す。
+
+        Args:
+            seconds (Optional[float]): 直近何秒分を返すか。Noneの場合は全フレーム。
+
+        Returns:
+            List[Tuple[float, Any]]: (撮影時刻, PIL Image) のリスト（古い順）
+        """
+        from PIL import Image
+
+        with self._lock:
+            snapshot = list(self._frames)
+            current = self._base
+
+        since = snapshot[-1][0] - seconds if snapshot and seconds is not None else None
+        result = []
+        for frame in snapshot:
+            current = self._decode(frame, current)
+            if since is None or frame[0] >= since:
+                result.append((frame[0], Image.fromarray(current)))
+        return result
+
+    def dump(self, path: str, seconds: Optional[float] = None, fmt: Optional[str] = None) -> Optional[str]:
+        """
+        直近のフレームをファイルに書き出す。
+
+        Args:
+            path (str): 出力先。fmt='apng' の場合はファイルパス（.png）、'frames' の場合はディレクトリ。
+            seconds (Optional[float]): 直近何秒分を書き出すか。Noneの場合は dump_seconds。
+            fmt (Optional[str]): 'apng'（アニメーションPNG）または 'frames'（連番PNG）。Noneの場合は dump_format。
+
+        Returns:
+            Optional[str]: 書き出したパス。フレームが無い場合はNone。
+        """
+        fmt = fmt or self.dump_format
+        frames = self.frames(seconds if seconds is not None else self.dump_seconds)
+        if not frames:
+            return None
+
+        if fmt == 'frames':
+            os.makedirs(path, exist_ok=True)
+            for i, (timestamp, image) in enumerate(frames):
+                image.save(os.path.join(path, f"frame_{i:04d}.png"))
+        elif fmt == 'apng':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # 各フレームの表示時間は実際の撮影間隔（ミリ秒）に合わせる
+            times = [t for t, _ in frames]
+            durations = [max(1, int((b - a) * 1000)) for a, b in zip(times, times[1:])]
+            durations.append(int(self.interval * 1000))
+            images = [img for _, img in frames]
+            images[0].save(path, format='PNG', save_all=True, append_images=images[1:],
+                           duration=durations, loop=0)
+        else:
+            raise ValueError(f"Unsupported recording format: {fmt}")
+
+        logger.info(f"Screen recording saved to {path} ({len(frames)} frames)")
+        return path
+
+    def clear(self):
+        """バッファを空にする"""
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self._base = None
+            self._last = None
+
+    def stats(self) -> Dict[str, Any]:
+        """録画の統計情報を返す"""
+        with self._lock:
+            return {
+                'frames': len(self._frames),
+                'bytes': self._bytes,
+                'captured': self.captured,
+                'evicted': self.evicted,
+                'dropped': self.dropped,
+                'errors': self.errors,
+            }
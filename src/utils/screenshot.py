@@ -1,15 +1,193 @@
 import os
 import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from PIL import ImageGrab
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Set
+
+from src.utils.screenshot_store import ScreenshotStore
+
+logger = logging.getLogger(__name__)
+
+# 画像形式と拡張子の対応
+FORMAT_EXTENSIONS = {
+    'png': '.png',
+    'webp': '.webp',
+    'jpeg': '.jpg',
+    'jpg': '.jpg',
+}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def build_save_options(filepath: str, png_compress_level: int = 6, jpeg_quality: int = 85) -> Dict[str, Any]:
+    """
+    保存先の拡張子に応じて Image.save に渡す引数を生成する。
+
+    Args:
+        filepath (str): 保存先パス
+        png_compress_level (int): PNGの圧縮レベル（0-9）
+        jpeg_quality (int): JPEG品質（1-95に制限）
+
+    Returns:
+        Dict[str, Any]: Image.save の追加引数
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == '.png':
+        return {'compress_level': max(0, min(9, int(png_compress_level)))}
+    if ext in ('.jpg', '.jpeg'):
+        return {'quality': max(1, min(95, int(jpeg_quality)))}
+    if ext == '.webp':
+        return {'lossless': True}
+    return {}
+
+
+def prepare_image(image: Any, filepath: str, max_dimension: Optional[int] = None) -> Any:
+    """
+    保存前に画像を縮小し、保存形式に合わせてカラーモードを変換する。
+
+    Args:
+        image (Any): PIL Image
+        filepath (str): 保存先パス（形式の判定に使用）
+        max_dimension (Optional[int]): 長辺の最大ピクセル数。超える場合は縦横比を保って縮小。
+
+    Returns:
+        Any: 変換後の PIL Image
+    """
+    if max_dimension and max(image.size) > max_dimension:
+        from PIL import Image
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    if os.path.splitext(filepath)[1].lower() in ('.jpg', '.jpeg') and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    return image
+
+
+class ScreenshotWriter:
+    """
+    スクリーンショットのエンコードと書き込みをバックグラウンドで行うクラス。
+    待機中の書き込み数が上限に達した場合、submitは空きが出るまでブロックする（背圧）。
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8):
+        """
+        Args:
+            max_workers (int): エンコード・書き込みを行うワーカースレッド数
+            max_pending (int): 同時に保持する未書き込み画像の上限
+        """
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, image: Any, filepath: str, store: Optional[ScreenshotStore] = None,
+               max_dimension: Optional[int] = None, **save_kwargs) -> Future:
+        """
+        画像の保存を予約する。縮小とエンコードはワーカースレッドで行う。
+
+        Args:
+            image (Any): PIL Image
+            filepath (str): 保存先パス
+            store (Optional[ScreenshotStore]): 指定時は重複排除ストア経由で保存する
+            max_dimension (Optional[int]): 長辺の最大ピクセル数
+            **save_kwargs: Image.save に渡す追加引数
+
+        Returns:
+            Future: 保存完了時に filepath を返す Future
+        """
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="screenshot-writer")
+                future = self._executor.submit(self._write, image, filepath, store, max_dimension, save_kwargs)
+                self._pending.add(future)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    @staticmethod
+    def _write(image: Any, filepath: str, store: Optional[ScreenshotStore],
+               max_dimension: Optional[int], save_kwargs: dict) -> str:
+        image = prepare_image(image, filepath, max_dimension)
+        if store is not None:
+            return store.save(image, filepath, **save_kwargs)
+        # 一時ファイルに書き込んでから置き換え、書き込み途中のファイルを読まれないようにする
+        # （同じパスへの書き込みが並行しても衝突しないよう、一時ファイル名は書き込みごとに一意にする）
+        root, ext = os.path.splitext(filepath)
+        tmp_path = f"{root}.{uuid.uuid4().hex}.tmp{ext}"
+        try:
+            image.save(tmp_path, **save_kwargs)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return filepath
+
+    def _on_done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+        if future.exception() is not None:
+            logger.error(f"Failed to write screenshot: {future.exception()}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        予約済みの書き込みがすべて完了するまで待機する。
+
+        Args:
+            timeout (Optional[float]): 最大待機秒数。Noneの場合は無制限。
+
+        Returns:
+            bool: すべて完了した場合True
+        """
+        with self._lock:
+            futures = list(self._pending)
+        if not futures:
+            return True
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} screenshot(s) still being written after {timeout}s")
+        return not not_done
+
+    def shutdown(self):
+        """書き込みを完了させてワーカースレッドを終了する"""
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
 
 class ScreenshotManager:
     """
     スクリーンショットの撮影と保存を管理するクラス。
     デスクトップ全体または特定のUI要素のキャプチャをサポートします。
+    キャプチャ後のエンコードと書き込みはバックグラウンドで行われるため、
+    ファイルを読む前に flush() で完了を待つ必要があります。
     """
 
+    # インスタンスはステップごとに生成されるため、書き込みキューと設定はクラスで共有する
+    _writer = ScreenshotWriter()
+    _dedup: bool = False
+    _perceptual_threshold: Optional[int] = None
+    _stores: Dict[str, ScreenshotStore] = {}
+    _region: str = 'screen'
+    _region_target: Optional[str] = None
+    # Region='target' で解決済みの要素（configure で破棄し、取得できなくなったら解決し直す）
+    _region_element: Any = None
+    _max_dimension: Optional[int] = None
+    _format: str = 'png'
+    _png_compress_level: int = 6
+    _jpeg_quality: int = 85
+
     def __init__(self, output_dir: str = "reports/screenshots"):
         """
         Args:
@@ -22,6 +200,101 @@ class ScreenshotManager:
             self.output_dir = os.path.abspath(self.output_dir)
         
         os.makedirs(self.output_dir, exist_ok=True)
+        # 直近に撮影した画像（レポート用サムネイル生成などでファイルを読み直さずに使う）
+        self.last_image = None
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None):
+        """
+        config.ini の [SCREENSHOT] セクション等からキャプチャ設定を反映します。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 設定値。キーは大文字小文字を区別しない。
+                - Dedup: 画素内容で重複排除して保存する（true/false）
+                - PerceptualThreshold: 知覚ハッシュで同一とみなすハミング距離（未指定時は完全一致のみ）
+                - Region: キャプチャ範囲 'screen'（全画面）/ 'app_window'（起動中アプリのウィンドウ）/ 'target'
+                - RegionTarget: Region='target' 時の 'module.Class.property'
+                - MaxDimension: 長辺の最大ピクセル数（未指定・0で縮小なし）
+                - Format: 'png' / 'webp'（可逆）/ 'jpeg'
+                - PngCompressLevel: PNG圧縮レベル（0-9）
+                - JpegQuality: JPEG品質（1-95）
+        """
+        opts = {str(k).lower(): str(v).strip() for k, v in (options or {}).items()}
+        cls._dedup = opts.get('dedup', 'false').lower() in ('1', 'true', 'yes', 'on')
+        threshold = opts.get('perceptualthreshold', '')
+        cls._perceptual_threshold = int(threshold) if threshold else None
+
+        region = (opts.get('region') or 'screen').lower()
+        if region not in ('screen', 'app_window', 'target'):
+            raise ValueError(f"Unknown screenshot region: {region}")
+        cls._region = region
+        cls._region_target = opts.get('regiontarget') or None
+        cls._region_element = None
+
+        max_dimension = opts.get('maxdimension', '')
+        cls._max_dimension = int(max_dimension) if max_dimension and int(max_dimension) > 0 else None
+
+        image_format = (opts.get('format') or 'png').lower()
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        cls._format = image_format
+        cls._png_compress_level = int(opts.get('pngcompresslevel') or 6)
+        cls._jpeg_quality = int(opts.get('jpegquality') or 85)
+
+    def _submit(self, image: Any, filepath: str):
+        self.last_image = image
+        save_kwargs = build_save_options(filepath, self._png_compress_level, self._jpeg_quality)
+        self._writer.submit(image, filepath, store=self._get_store(),
+                            max_dimension=self._max_dimension, **save_kwargs)
+
+    def _resolve_region(self) -> Optional[tuple]:
+        """設定されたキャプチャ範囲を (left, top, right, bottom) で返す。全画面の場合はNone。"""
+        if self._region == 'screen':
+            return None
+        try:
+            if self._region == 'target':
+                element = ScreenshotManager._region_element
+                if element is None:
+                    from src.utils.element_resolver import resolve_target
+                    element = self._find_now(resolve_target(self._region_target))
+                    ScreenshotManager._region_element = element
+            else:
+                from src.utils.driver_factory import DriverFactory
+                if DriverFactory.is_excel_running():
+                    element = DriverFactory.get_excel_window()
+                else:
+                    element = DriverFactory.get_app().top_window()
+                element = self._find_now(element)
+            if element is not None:
+                rect = element.rectangle()
+                if rect.right > rect.left and rect.bottom > rect.top:
+                    return (rect.left, rect.top, rect.right, rect.bottom)
+        except Exception as e:
+            logger.debug(f"Failed to resolve screenshot region '{self._region}', capturing full screen: {e}")
+        # 閉じられた要素を使い続けないよう、次回のキャプチャで解決し直す
+        ScreenshotManager._region_element = None
+        return None
+
+    @staticmethod
+    def _find_now(element: Any) -> Any:
+        """
+        WindowSpecification を待機せずに wrapper へ解決する。存在しない場合はNone。
+        （rectangle() を直接呼ぶと、要素が無い場合に pywinauto の検索タイムアウトまで待つため）
+        """
+        if hasattr(element, 'exists') and hasattr(element, 'wrapper_object'):
+            if not element.exists(timeout=0):
+                return None
+            return element.wrapper_object()
+        return element
+
+    def _get_store(self) -> Optional[ScreenshotStore]:
+        if not self._dedup:
+            return None
+        store = self._stores.get(self.output_dir)
+        if store is None:
+            store = ScreenshotStore(self.output_dir, perceptual_threshold=self._perceptual_threshold)
+            self._stores[self.output_dir] = store
+        return store
 
     def capture_screen(self, 
                       filename: str = None,
@@ -29,7 +302,7 @@ class ScreenshotManager:
                       test_name: str = None,
                       additional_name: str = None) -> Optional[str]:
         """
-        デスクトップ全体のスクリーンショットを撮影し保存します。
+        デスクトップ全体（設定により対象ウィンドウの範囲）のスクリーンショットを撮影し保存します。
 
         Args:
             filename (str, optional): 保存ファイル名。指定がない場合は新しいフォーマットで生成。
@@ -38,14 +311,15 @@ class ScreenshotManager:
             additional_name (str, optional): 追加の名称。新しいフォーマット用。
 
         Returns:
-            Optional[str]: 保存されたファイルの絶対パス。失敗時はNone。
+            Optional[str]: 保存先ファイルの絶対パス（書き込みはバックグラウンドで完了）。キャプチャ失敗時はNone。
         """
         filepath = self._prepare_filepath(filename, test_id, test_name, additional_name, prefix="screen")
         
         try:
-            # PillowのImageGrabを使用して全画面キャプチャ
-            screenshot = ImageGrab.grab()
-            screenshot.save(filepath)
+            # PillowのImageGrabを使用してキャプチャ（bboxがNoneの場合は全画面）
+            bbox = self._resolve_region()
+            screenshot = ImageGrab.grab(bbox=bbox, all_screens=bbox is not None)
+            self._submit(screenshot, filepath)
             return filepath
         except Exception as e:
             # print(f"Error capturing full screen: {e}")
@@ -69,7 +343,7 @@ class ScreenshotManager:
             additional_name (str, optional): 追加の名称。新しいフォーマット用。
 
         Returns:
-            Optional[str]: 保存されたファイルの絶対パス。失敗時はNone。
+            Optional[str]: 保存先ファイルの絶対パス（書き込みはバックグラウンドで完了）。キャプチャ失敗時はNone。
         """
         filepath = self._prepare_filepath(filename, test_id, test_name, additional_name, prefix="element")
 
@@ -77,7 +351,7 @@ class ScreenshotManager:
             # pywinautoの要素が capture_as_image() メソッドを持っていることを期待
             if hasattr(element, 'capture_as_image'):
                 image = element.capture_as_image()
-                image.save(filepath)
+                self._submit(image, filepath)
                 return filepath
             else:
                 # print(f"Element does not support capture_as_image: {type(element)}")
@@ -86,6 +360,51 @@ class ScreenshotManager:
             # print(f"Error capturing element: {e}")
             return None
 
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """
+        バックグラウンドで書き込み中のスクリーンショットがすべて保存されるまで待機します。
+
+        Args:
+            timeout (Optional[float]): 最大待機秒数。Noneの場合は無制限。
+
+        Returns:
+            bool: すべて保存済みの場合True
+        """
+        return cls._writer.flush(timeout)
+
+    @classmethod
+    def shutdown(cls):
+        """
+        書き込みを完了させてワーカースレッドを終了します（セッション終了時に使用）。
+        重複排除ストアを使用している場合は manifest.json を書き出します。
+        """
+        cls._writer.shutdown()
+        for store in cls._stores.values():
+            try:
+                manifest_path = store.write_manifest()
+                stats = store.stats()
+                logger.info(
+                    f"Screenshot store: {stats['stored']} stored, {stats['duplicates']} duplicates, "
+                    f"{stats['bytes_saved']} bytes saved ({manifest_path})"
+                )
+            except Exception as e:
+                logger.error(f"Failed to write screenshot manifest: {e}")
+
+    @classmethod
+    def clear_region_cache(cls):
+        """Region=target で解決済みの要素を破棄します（シナリオ間で閉じたウィンドウを使い回さないため）"""
+        cls._region_element = None
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """重複排除ストアの統計情報（全出力先の合計）を返します"""
+        totals = {'stored': 0, 'duplicates': 0, 'bytes_written': 0, 'bytes_saved': 0}
+        for store in cls._stores.values():
+            for key, value in store.stats().items():
+                totals[key] += value
+        return totals
+
     def _prepare_filepath(self, 
                          filename: str = None,
                          test_id: str = None,
@@ -105,10 +424,12 @@ class ScreenshotManager:
         Returns:
             str: 保存先のフルパス
         """
+        ext = FORMAT_EXTENSIONS[self._format]
+
         # 後方互換性: filenameが指定されている場合はそれを使用
         if filename:
-            if not filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-                filename += ".png"
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                filename += ext
             
             # ファイル名に使えない文字を置換（簡易実装）
             from src.utils.screenshot_filename import sanitize_filename
@@ -117,9 +438,10 @@ class ScreenshotManager:
         elif test_id and test_name:
             from src.utils.screenshot_filename import generate_normal_filename
             filename = generate_normal_filename(test_id, test_name, additional_name)
+            filename = os.path.splitext(filename)[0] + ext
         # どちらも指定されていない場合: タイムスタンプベースのファイル名
         else:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            filename = f"{prefix}_{timestamp}.png"
+            filename = f"{prefix}_{timestamp}{ext}"
 
         return os.path.join(self.output_dir, filename)
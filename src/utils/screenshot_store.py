@@ -0,0 +1,176 @@
+"""
+スクリーンショットのコンテンツアドレス型ストア。
+画素内容のハッシュをキーに画像を一度だけ保存し、人が読むファイル名
+（generate_normal_filename 等で生成）はストア内の実体へのハードリンクとして作成する。
+ハードリンクが作成できない場合はコピーにフォールバックする。
+対応関係は manifest.json に記録し、重複排除で節約したバイト数を集計する。
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STORE_DIRNAME = "_store"
+MANIFEST_FILENAME = "manifest.json"
+
+
+def content_hash(image: Any) -> str:
+    """
+    画像の画素内容から高速なハッシュ値を計算する（モード・サイズを含む）。
+
+    Args:
+        image (Any): PIL Image
+
+    Returns:
+        str: 32文字の16進ハッシュ
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode('ascii'))
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+def perceptual_hash(image: Any, hash_size: int = 8) -> int:
+    """
+    差分ハッシュ（dHash）を計算する。見た目が近い画像ほどハミング距離が小さくなる。
+
+    Args:
+        image (Any): PIL Image
+        hash_size (int): ハッシュの一辺のサイズ（ビット数は hash_size^2）
+
+    Returns:
+        int: ハッシュ値
+    """
+    small = image.convert('L').resize((hash_size + 1, hash_size))
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class ScreenshotStore:
+    """画素内容で重複排除するスクリーンショットストア"""
+
+    def __init__(self, output_dir: str, perceptual_threshold: Optional[int] = None):
+        """
+        Args:
+            output_dir (str): スクリーンショット保存先ディレクトリ（ストアはその配下の _store）
+            perceptual_threshold (Optional[int]): 知覚ハッシュのハミング距離の閾値。
+                指定時は距離が閾値以下の画像を同一とみなす。Noneの場合は完全一致のみ。
+        """
+        self.output_dir = output_dir
+        self.store_dir = os.path.join(output_dir, STORE_DIRNAME)
+        self.perceptual_threshold = perceptual_threshold
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._blobs: Dict[str, Dict[str, Any]] = {}
+        self._phashes: List[tuple] = []
+        self._manifest: List[Dict[str, Any]] = []
+
+        self.stored = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+        self.bytes_saved = 0
+
+    def save(self, image: Any, filepath: str, **save_kwargs) -> str:
+        """
+        画像をストアに保存し、filepath にリンクを作成する。
+
+        Args:
+            image (Any): PIL Image
+            filepath (str): 人が読むファイル名のパス
+            **save_kwargs: Image.save に渡す追加引数
+
+        Returns:
+            str: filepath
+        """
+        digest = content_hash(image)
+        ext = os.path.splitext(filepath)[1].lower() or '.png'
+        key = f"{digest}{ext}"
+
+        with self._lock:
+            if key not in self._blobs and self.perceptual_threshold is not None:
+                key = self._match_perceptual(image, key)
+            blob = self._blobs.setdefault(key, {'lock': threading.Lock(), 'size': None})
+
+        blob_path = os.path.join(self.store_dir, key)
+        with blob['lock']:
+            duplicate = blob['size'] is not None
+            if not duplicate:
+                tmp_path = f"{blob_path}.tmp{ext}"
+                image.save(tmp_path, **save_kwargs)
+                os.replace(tmp_path, blob_path)
+                blob['size'] = os.path.getsize(blob_path)
+
+        linked = self._link(blob_path, filepath)
+
+        with self._lock:
+            if duplicate:
+                self.duplicates += 1
+                if linked:
+                    self.bytes_saved += blob['size']
+                else:
+                    self.bytes_written += blob['size']
+            else:
+                self.stored += 1
+                self.bytes_written += blob['size']
+            self._manifest.append({
+                'file': os.path.basename(filepath),
+                'blob': f"{STORE_DIRNAME}/{key}",
+                'bytes': blob['size'],
+                'duplicate': duplicate,
+            })
+        return filepath
+
+    def _match_perceptual(self, image: Any, key: str) -> str:
+        phash = perceptual_hash(image)
+        ext = os.path.splitext(key)[1]
+        for known_hash, known_key in self._phashes:
+            if known_key.endswith(ext) and bin(known_hash ^ phash).count('1') <= self.perceptual_threshold:
+                return known_key
+        self._phashes.append((phash, key))
+        return key
+
+    @staticmethod
+    def _link(blob_path: str, filepath: str) -> bool:
+        """filepath にハードリンクを作成する。作成できない場合はコピーしてFalseを返す。"""
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        try:
+            os.link(blob_path, filepath)
+            return True
+        except OSError:
+            shutil.copyfile(blob_path, filepath)
+            return False
+
+    def write_manifest(self) -> str:
+        """
+        ファイル名とストア内実体の対応表を manifest.json に書き出す。
+
+        Returns:
+            str: manifest.json のパス
+        """
+        path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        with self._lock:
+            payload = {'stats': self.stats(), 'files': list(self._manifest)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """重複排除の統計情報を返す"""
+        return {
+            'stored': self.stored,
+            'duplicates': self.duplicates,
+            'bytes_written': self.bytes_written,
+            'bytes_saved': self.bytes_saved,
+        }
@@ -0,0 +1,262 @@
+"""
+出力ワークブックのシート全体（または名前付き範囲）を、ゴールデンファイル
+（ワークブックまたはCSV）と比較するユーティリティモジュール。
+両者を pandas の DataFrame に読み込み、列ごとにまとめて比較する。
+数値列には列ごとの許容差を適用でき、比較しない列の指定や、
+キー列による行の対応付け（行の並び順に依存しない比較）に対応する。
+"""
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from src.utils.workbook_cache import parse_range
+
+try:
+    # 任意: 導入されていれば高速な calamine で読み込む（未導入時は openpyxl の read_only）
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+logger = logging.getLogger(__name__)
+
+
+def _plain(value: Any) -> Any:
+    """NumPy のスカラーを Python の値に変換する（メッセージ表示用）"""
+    if isinstance(value, tuple):
+        return tuple(_plain(v) for v in value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _rows_to_frame(rows: Iterable[tuple], header: bool) -> pd.DataFrame:
+    rows = list(rows)
+    # 末尾の空行を除外
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+    if not header:
+        return pd.DataFrame.from_records(rows)
+    columns = [str(c) if c is not None else f"column_{i + 1}" for i, c in enumerate(rows[0])]
+    return pd.DataFrame.from_records(rows[1:], columns=columns)
+
+
+def load_table(path: str,
+               sheet: Optional[str] = None,
+               cell_range: Optional[str] = None,
+               named_range: Optional[str] = None,
+               header: bool = True,
+               encoding: str = 'utf-8') -> pd.DataFrame:
+    """
+    ワークブックのシート・範囲、またはCSVファイルを DataFrame に読み込む。
+
+    Args:
+        path (str): .xlsx / .xlsm / .csv ファイルのパス
+        sheet (Optional[str]): シート名（未指定時はアクティブシート）
+        cell_range (Optional[str]): 読み込む範囲（例: 'A1:F200'）
+        named_range (Optional[str]): 名前付き範囲（指定時は sheet / cell_range より優先）
+        header (bool): 先頭行を列名として扱うか
+        encoding (str): CSVのエンコーディング
+
+    Returns:
+        pd.DataFrame: 読み込んだ表
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        ValueError: シートまたは名前付き範囲が存在しない場合
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    if path.lower().endswith('.csv'):
+        return pd.read_csv(path, encoding=encoding, header=0 if header else None, keep_default_na=False,
+                           na_values=[''])
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        if named_range:
+            if named_range not in workbook.defined_names:
+                raise ValueError(f"Named range '{named_range}' not found in workbook")
+            destinations = list(workbook.defined_names[named_range].destinations)
+            if len(destinations) != 1:
+                raise ValueError(f"Named range '{named_range}' must refer to a single range")
+            sheet, cell_range = destinations[0]
+
+        if sheet:
+            if sheet not in workbook.sheetnames:
+                raise ValueError(f"Sheet '{sheet}' not found in workbook. Available sheets: {workbook.sheetnames}")
+        else:
+            sheet = workbook.active.title
+
+        bounds = parse_range(cell_range) if cell_range else None
+        if python_calamine is None:
+            worksheet = workbook[sheet]
+            if bounds:
+                min_row, min_col, max_row, max_col = bounds
+                rows = worksheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col,
+                                           values_only=True)
+            else:
+                rows = worksheet.iter_rows(values_only=True)
+            return _rows_to_frame(rows, header)
+    finally:
+        workbook.close()
+
+    calamine_sheet = python_calamine.CalamineWorkbook.from_path(path).get_sheet_by_name(sheet)
+    rows = calamine_sheet.to_python(skip_empty_area=False)
+    if bounds:
+        min_row, min_col, max_row, max_col = bounds
+        rows = [row[min_col - 1:max_col] for row in rows[min_row - 1:max_row]]
+    # calamine は空セルを '' で返すため openpyxl と同じく None に揃える
+    rows = [tuple(None if v == '' else v for v in row) for row in rows]
+    return _rows_to_frame(rows, header)
+
+
+def _normalize_text(values: pd.Series) -> np.ndarray:
+    """比較用に文字列へ正規化する（欠損は空文字）"""
+    values = values.astype(object)
+    return values.where(values.notna(), '').to_numpy().astype(str)
+
+
+def _compare_column(actual: pd.Series, expected: pd.Series, tolerance: float) -> np.ndarray:
+    """1列分を比較し、差異のある行が True の配列を返す"""
+    a_is_num = pd.api.types.is_numeric_dtype(actual) and not pd.api.types.is_bool_dtype(actual)
+    e_is_num = pd.api.types.is_numeric_dtype(expected) and not pd.api.types.is_bool_dtype(expected)
+    if not a_is_num and not e_is_num and (actual.dtype == object or expected.dtype == object):
+        # 両方とも文字列等の列（数値文字列が混在する可能性がある場合のみ数値変換を試みる）
+        if not (actual.map(type).eq(str).all() and expected.map(type).eq(str).all()):
+            a_is_num = e_is_num = None
+
+    if a_is_num and e_is_num:
+        a_num = actual.to_numpy(dtype=float)
+        e_num = expected.to_numpy(dtype=float)
+        both_nan = np.isnan(a_num) & np.isnan(e_num)
+        with np.errstate(invalid='ignore'):
+            return ~both_nan & ~(np.abs(a_num - e_num) <= tolerance)
+
+    if a_is_num is False and e_is_num is False:
+        return _normalize_text(actual) != _normalize_text(expected)
+
+    # 数値と文字列が混在する列: 両方数値として解釈できるセルは許容差で、それ以外は文字列で比較
+    a_num = pd.to_numeric(actual, errors='coerce').to_numpy(dtype=float)
+    e_num = pd.to_numeric(expected, errors='coerce').to_numpy(dtype=float)
+    both_numeric = ~np.isnan(a_num) & ~np.isnan(e_num)
+
+    differs = np.zeros(len(actual), dtype=bool)
+    differs[both_numeric] = np.abs(a_num[both_numeric] - e_num[both_numeric]) > tolerance
+    other = ~both_numeric
+    if other.any():
+        differs[other] = _normalize_text(actual[other]) != _normalize_text(expected[other])
+    return differs
+
+
+def _align_keys(frame: pd.DataFrame, key_columns: List[str], as_text: bool) -> pd.DataFrame:
+    keys = [frame[k].map(str) if as_text else frame[k] for k in key_columns]
+    return frame.set_index(keys).drop(columns=key_columns)
+
+
+def compare_frames(actual: pd.DataFrame,
+                   expected: pd.DataFrame,
+                   key_columns: Optional[List[str]] = None,
+                   ignore_columns: Optional[List[str]] = None,
+                   tolerances: Optional[Dict[str, float]] = None,
+                   default_tolerance: float = 0.0,
+                   max_examples: int = 20) -> Dict[str, Any]:
+    """
+    2つの表を比較する。
+
+    Args:
+        actual (pd.DataFrame): 出力された表
+        expected (pd.DataFrame): ゴールデンの表
+        key_columns (Optional[List[str]]): 行を対応付けるキー列。未指定時は行番号で対応付ける。
+        ignore_columns (Optional[List[str]]): 比較しない列
+        tolerances (Optional[Dict[str, float]]): 列名 → 数値の許容差（絶対値）
+        default_tolerance (float): tolerances に無い列の数値の許容差
+        max_examples (int): 結果に含める差異セルの例の最大数
+
+    Returns:
+        Dict[str, Any]: 比較結果。'equal'、'differing_cells'、'column_diffs'（列ごとの差異数）、
+            'examples'、'missing_rows' / 'extra_rows'、'missing_columns' / 'extra_columns' を含む。
+    """
+    ignore = set(ignore_columns or [])
+    tolerances = tolerances or {}
+
+    if key_columns:
+        for frame, label in ((actual, 'actual'), (expected, 'golden')):
+            missing = [k for k in key_columns if k not in frame.columns]
+            if missing:
+                raise ValueError(f"Key column(s) {missing} not found in {label} table")
+            if frame.duplicated(subset=key_columns).any():
+                raise ValueError(f"Key column(s) {key_columns} are not unique in {label} table")
+        # キー列の型が異なる場合（1 と '1' など）は文字列化して対応付ける
+        as_text = any(actual[k].dtype != expected[k].dtype for k in key_columns)
+        actual = _align_keys(actual, key_columns, as_text)
+        expected = _align_keys(expected, key_columns, as_text)
+        ignore.update(key_columns)
+    else:
+        actual = actual.reset_index(drop=True)
+        expected = expected.reset_index(drop=True)
+
+    missing_rows = expected.index.difference(actual.index, sort=False)
+    extra_rows = actual.index.difference(expected.index, sort=False)
+    common_rows = expected.index.intersection(actual.index, sort=False)
+
+    columns = [c for c in expected.columns if c in actual.columns and c not in ignore]
+    missing_columns = [c for c in expected.columns if c not in actual.columns and c not in ignore]
+    extra_columns = [c for c in actual.columns if c not in expected.columns and c not in ignore]
+
+    a = actual.loc[common_rows, columns]
+    e = expected.loc[common_rows, columns]
+
+    column_diffs: Dict[str, int] = {}
+    examples = []
+    total = 0
+    for column in columns:
+        differs = _compare_column(a[column], e[column], float(tolerances.get(column, default_tolerance)))
+        count = int(differs.sum())
+        if not count:
+            continue
+        column_diffs[column] = count
+        total += count
+        for position in np.flatnonzero(differs)[:max(0, max_examples - len(examples))]:
+            examples.append({
+                'row': _plain(common_rows[position]),
+                'column': column,
+                'expected': _plain(e[column].iloc[position]),
+                'actual': _plain(a[column].iloc[position]),
+            })
+
+    return {
+        'equal': not (total or len(missing_rows) or len(extra_rows) or missing_columns or extra_columns),
+        'rows_compared': len(common_rows),
+        'differing_cells': total,
+        'column_diffs': column_diffs,
+        'examples': examples,
+        'missing_rows': [_plain(r) for r in missing_rows[:max_examples]],
+        'missing_row_count': len(missing_rows),
+        'extra_rows': [_plain(r) for r in extra_rows[:max_examples]],
+        'extra_row_count': len(extra_rows),
+        'missing_columns': missing_columns,
+        'extra_columns': extra_columns,
+    }
+
+
+def format_comparison(result: Dict[str, Any]) -> str:
+    """比較結果を失敗メッセージ用に整形する"""
+    lines = [f"{result['differing_cells']} differing cell(s) in {result['rows_compared']} compared row(s)"]
+    if result['column_diffs']:
+        lines.append("  by column: " + ", ".join(f"{c}={n}" for c, n in result['column_diffs'].items()))
+    for example in result['examples']:
+        lines.append(f"  row {example['row']!r}, column '{example['column']}': "
+                     f"expected {example['expected']!r}, got {example['actual']!r}")
+    if result['missing_row_count']:
+        lines.append(f"  {result['missing_row_count']} row(s) missing from output, e.g. {result['missing_rows'][:5]}")
+    if result['extra_row_count']:
+        lines.append(f"  {result['extra_row_count']} unexpected row(s) in output, e.g. {result['extra_rows'][:5]}")
+    if result['missing_columns']:
+        lines.append(f"  missing column(s): {result['missing_columns']}")
+    if result['extra_columns']:
+        lines.append(f"  unexpected column(s): {result['extra_columns']}")
+    return "\n".join(lines)
@@ -0,0 +1,230 @@
+"""
+大きなテキストファイルをメモリに全体を読み込まずに検証するためのユーティリティモジュール。
+ファイルはチャンク単位で読み込み、前のチャンクの末尾を重ねて保持することで
+チャンク境界をまたぐ一致も検出する。UTF-8 の部分一致検索では mmap 上でバイト列として
+検索する。tail を指定するとファイル末尾の指定バイト数だけを対象にする。
+改行はテキストモードの open() と同様に '\r\n' / '\r' を '\n' に変換して扱う。
+失敗時のメッセージには、最も近い一致箇所の周辺だけを抜粋して含める。
+"""
+import codecs
+import io
+import mmap
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+from src.utils.regex_pool import RegexPool
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# 正規表現でチャンク境界をまたいで検出できる一致の最大文字数
+DEFAULT_REGEX_OVERLAP = 64 * 1024
+EXCERPT_CHARS = 120
+
+# 検索語のバイト列がそのまま文字境界で一致する（自己同期的な）エンコーディング
+_BYTE_SEARCHABLE = {'utf-8', 'ascii'}
+
+
+def excerpt(text: str, start: int, end: int, context: int = EXCERPT_CHARS) -> str:
+    """text[start:end] の前後 context 文字を含む抜粋を返す"""
+    left = max(0, start - context)
+    right = min(len(text), end + context)
+    prefix = '...' if left > 0 else ''
+    suffix = '...' if right < len(text) else ''
+    return f"{prefix}{text[left:right]}{suffix}".replace('\r', '\\r').replace('\n', '\\n')
+
+
+def _tail_offset(path: str, tail: Optional[int]) -> int:
+    if not tail:
+        return 0
+    return max(0, os.path.getsize(path) - int(tail))
+
+
+def iter_text_chunks(path: str, encoding: str = 'utf-8', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     tail: Optional[int] = None) -> Iterator[str]:
+    """
+    ファイルをテキストのチャンクとして順に返す。改行は '\n' に変換する（チャンク末尾の '\r' は次のチャンクと合わせて判定する）。
+
+    Args:
+        path (str): ファイルパス
+        encoding (str): エンコーディング
+        chunk_size (int): 1回に読み込む文字数
+        tail (Optional[int]): 指定時はファイル末尾のこのバイト数だけを読む
+    """
+    offset = _tail_offset(path, tail)
+    with open(path, 'rb') as raw:
+        raw.seek(offset)
+        if offset and codecs.lookup(encoding).name == 'utf-8':
+            # 途中から読む場合は、マルチバイト文字の途中（継続バイト）を読み飛ばす
+            while True:
+                byte = raw.read(1)
+                if not byte or (byte[0] & 0xC0) != 0x80:
+                    raw.seek(-len(byte), os.SEEK_CUR)
+                    break
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(errors='replace' if offset else 'strict'), translate=True)
+        while True:
+            data = raw.read(chunk_size)
+            text = decoder.decode(data, final=not data)
+            if text:
+                yield text
+            if not data:
+                return
+
+
+def _longest_prefix(haystack: str, needle: str, minimum: int = 3) -> Tuple[int, int]:
+    """
+    needle の先頭部分のうち haystack に現れる最長のものを二分探索で求める。
+
+    Returns:
+        Tuple[int, int]: (一致した長さ, haystack 内の位置)。minimum 未満の場合は (0, -1)。
+    """
+    low, high, best = minimum, len(needle), (0, -1)
+    while low <= high:
+        mid = (low + high) // 2
+        position = haystack.find(needle[:mid])
+        if position >= 0:
+            best = (mid, position)
+            low = mid + 1
+        else:
+            high = mid - 1
+    return best
+
+
+def _literal_prefix(pattern: str) -> str:
+    """正規表現の先頭にあるメタ文字を含まない部分を返す（近い一致を探す手がかりに使う）"""
+    match = re.match(r'[^.^$*+?{}\[\]\\|()]*', pattern)
+    literal = match.group(0) if match else ''
+    # 直後に量指定子がある場合、最後の文字は省略可能なので除外する
+    if literal and len(pattern) > len(literal) and pattern[len(literal)] in '*+?{':
+        literal = literal[:-1]
+    return literal
+
+
+class _ClosestMatch:
+    """検索失敗時に表示する「最も近い一致」の抜粋を保持する"""
+
+    def __init__(self, needle: str):
+        self.needle = needle
+        self.length = 0
+        self.text = ''
+
+    def update(self, buffer: str):
+        if not self.needle or self.length == len(self.needle):
+            return
+        length, position = _longest_prefix(buffer, self.needle, minimum=max(3, self.length + 1))
+        if length > self.length:
+            self.length = length
+            self.text = excerpt(buffer, position, position + length)
+
+    def describe(self) -> str:
+        if not self.length:
+            return "No similar text found."
+        return f"Closest match ({self.length}/{len(self.needle)} leading chars): '{self.text}'"
+
+
+def find_text(path: str, needle: str, encoding: str = 'utf-8', tail: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[bool, str]:
+    """
+    ファイルに needle が含まれるかを調べる。
+
+    Returns:
+        Tuple[bool, str]: (見つかったか, 見つからない場合の最も近い一致の説明)
+    """
+    if not needle:
+        return True, ''
+
+    if (codecs.lookup(encoding).name in _BYTE_SEARCHABLE and os.path.getsize(path) > 0
+            and '\n' not in needle and '\r' not in needle):
+        # UTF-8 はバイト列の一致が文字列の一致と等価なため mmap 上で直接検索する
+        # （改行を含む検索語は改行の変換が必要なため、テキストとして検索する）
+        encoded = needle.encode(encoding)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(encoded, _tail_offset(path, tail)) >= 0:
+                return True, ''
+
+    else:
+        overlap = len(needle) - 1
+        carry = ''
+        for chunk in iter_text_chunks(path, encoding, chunk_size, tail):
+            buffer = carry + chunk
+            if needle in buffer:
+                return True, ''
+            carry = buffer[-overlap:] if overlap else ''
+
+    # 失敗時のみ、もう一度走査して最も近い一致を探す
+    closest = _ClosestMatch(needle)
+    carry = ''
+    for chunk in iter_text_chunks(path, encoding, chunk_size, tail):
+        buffer = carry + chunk
+        closest.update(buffer)
+        carry = buffer[-(len(needle) - 1):] if len(needle) > 1 else ''
+    return False, closest.describe()
+
+
+def search_regex(path: str, pattern: str, encoding: str = 'utf-8', tail: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_REGEX_OVERLAP,
+                 timeout: Optional[float] = None) -> Tuple[bool, str]:
+    """
+    ファイル中に正規表現に一致する箇所があるかを調べる。
+
+    前のチャンクの末尾 overlap 文字を重ねて検索するため、overlap 文字以内の一致は
+    チャンク境界をまたいでも検出できる。バッファ末尾で終わる一致は、続きを読んで
+    確定するまで保留する（'$' や先読みがチャンク末尾で誤って一致するのを防ぐ）。
+    timeout はチャンクごとの照合のタイムアウト秒（RegexPool を参照）。
+
+    Returns:
+        Tuple[bool, str]: (一致したか, 一致しない場合の最も近い一致の説明)
+    """
+    RegexPool.compile(pattern)
+    closest = _ClosestMatch(_literal_prefix(pattern))
+    carry = ''
+    dropped = False
+    chunks = iter_text_chunks(path, encoding, chunk_size, tail)
+    chunk = next(chunks, None)
+    if chunk is None:
+        return RegexPool.search(pattern, '', timeout=timeout) is not None, closest.describe()
+
+    while chunk is not None:
+        following = next(chunks, None)
+        at_eof = following is None
+        buffer = carry + chunk
+        # 先頭を切り捨てたバッファでは、重ねた先頭1文字から検索を始めないことで
+        # '^' や '\A' がバッファ先頭（ファイル先頭ではない位置）に一致しないようにする
+        # 最初の一致がバッファ末尾で終わる場合、それ以降の一致も全て末尾で終わるため最初の一致だけを調べる
+        match = RegexPool.search(pattern, buffer, 1 if dropped else 0, timeout=timeout)
+        if match is not None and (at_eof or match.end < len(buffer)):
+            return True, ''
+        closest.update(buffer)
+        keep = min(len(buffer), overlap + 1)
+        dropped = dropped or keep < len(buffer)
+        carry = buffer[-keep:]
+        chunk = following
+    return False, closest.describe()
+
+
+def compare_exact(path: str, expected: str, encoding: str = 'utf-8',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+    """
+    ファイル全体が expected と一致するかを先頭から順に比較する。
+
+    Returns:
+        Optional[str]: 一致しない場合は最初の相違箇所の説明。一致する場合はNone。
+    """
+    position = 0
+    line = 1
+    for chunk in iter_text_chunks(path, encoding, chunk_size):
+        expected_part = expected[position:position + len(chunk)]
+        if chunk != expected_part:
+            offset = next((i for i, (a, b) in enumerate(zip(chunk, expected_part)) if a != b),
+                          min(len(chunk), len(expected_part)))
+            line += chunk.count('\n', 0, offset)
+            at = position + offset
+            return (f"Content differs at character {at} (line {line}).\n"
+                    f"Expected: '{excerpt(expected, at, at, EXCERPT_CHARS // 2)}'\n"
+                    f"Actual:   '{excerpt(chunk, offset, offset, EXCERPT_CHARS // 2)}'")
+        line += chunk.count('\n')
+        position += len(chunk)
+    if position != len(expected):
+        return (f"File ends at character {position}, expected {len(expected)} characters.\n"
+                f"Missing:  '{excerpt(expected, position, position, EXCERPT_CHARS // 2)}'")
+    return None
@@ -0,0 +1,109 @@
+"""
+UIツリーの幅優先探索ユーティリティモジュール。
+descendants() で全要素を列挙してから絞り込む代わりに、深さ制限付きで
+幅優先に走査し、最初に条件を満たした要素で探索を打ち切る。
+pywinautoのwrapper（children() / element_info / window_text() を持つオブジェクト）を
+ダックタイピングで扱うため、テスト用の偽ツリーでも同じ関数を利用できる。
+"""
+import logging
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[Any], bool]
+
+
+def get_control_type(element: Any) -> Optional[str]:
+    """要素のコントロールタイプを取得する。取得できない場合はNone。"""
+    try:
+        return element.element_info.control_type
+    except Exception:
+        return None
+
+
+def get_text(element: Any) -> str:
+    """要素のテキストを取得する。取得できない場合は空文字列。"""
+    try:
+        return element.window_text() or ""
+    except Exception:
+        return ""
+
+
+def iter_descendants(root: Any,
+                     max_depth: Optional[int] = None,
+                     skip_control_types: Optional[Iterable[str]] = None) -> Iterator[Tuple[Any, int]]:
+    """
+    rootの子孫を幅優先で列挙する（root自身は含まない）。
+
+    Args:
+        root (Any): 探索の起点となる要素
+        max_depth (Optional[int]): 探索する最大深さ（子=1）。Noneの場合は無制限。
+        skip_control_types (Optional[Iterable[str]]): 配下を探索しないコントロールタイプ。
+            該当要素自身は列挙されるが、その子孫は走査しない。
+
+    Yields:
+        Tuple[Any, int]: (要素, 深さ)
+    """
+    skip = set(skip_control_types or ())
+    queue = deque([(root, 0)])
+
+    while queue:
+        parent, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        try:
+            children = parent.children()
+        except Exception:
+            logger.debug("Failed to read children during tree search", exc_info=True)
+            continue
+
+        for child in children:
+            yield child, depth + 1
+            if skip and get_control_type(child) in skip:
+                continue
+            queue.append((child, depth + 1))
+
+
+def find_descendant(root: Any,
+                    predicate: Optional[Predicate] = None,
+                    control_type: Optional[str] = None,
+                    max_depth: Optional[int] = None,
+                    skip_control_types: Optional[Iterable[str]] = None) -> Optional[Any]:
+    """
+    条件を満たす最初の子孫要素を幅優先で探索する。
+
+    Args:
+        root (Any): 探索の起点となる要素
+        predicate (Optional[Predicate]): 要素を受け取り一致判定を返す関数
+        control_type (Optional[str]): 一致候補とするコントロールタイプ。
+            指定時はpredicateの評価前に絞り込むため、不要なテキスト取得を省略できる。
+        max_depth (Optional[int]): 探索する最大深さ（子=1）
+        skip_control_types (Optional[Iterable[str]]): 配下を探索しないコントロールタイプ
+
+    Returns:
+        Optional[Any]: 最初に一致した要素。見つからない場合はNone。
+    """
+    visited = 0
+    for element, depth in iter_descendants(root, max_depth, skip_control_types):
+        visited += 1
+        if control_type and get_control_type(element) != control_type:
+            continue
+        try:
+            matched = predicate(element) if predicate else True
+        except Exception:
+            matched = False
+        if matched:
+            logger.debug(f"Tree search matched at depth {depth} after visiting {visited} elements")
+            return element
+
+    logger.debug(f"Tree search found no match after visiting {visited} elements")
+    return None
+
+
+def text_contains(*needles: str) -> Predicate:
+    """要素テキストがいずれかの文字列を含むかを判定するpredicateを生成する。"""
+    def predicate(element: Any) -> bool:
+        text = get_text(element)
+        return any(needle in text for needle in needles)
+    return predicate
@@ -0,0 +1,385 @@
+"""
+UIツリーのスナップショットを扱うユーティリティモジュール。
+ライブのUIAツリーを一度だけ走査してコンパクトなメモリ上のモデルに取り込み、
+コントロールタイプ・クラス名・AutomationId・テキストのインデックスから
+絞り込み検索に応答する。スナップショットはgzip圧縮したJSONに保存でき、
+ダイアログ表示前後など2つのスナップショットをオフラインで差分比較できる。
+"""
+import gzip
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ノードのフィールド順（保存形式の列順と一致させる）
+FIELDS = ('parent', 'depth', 'control_type', 'class_name', 'automation_id', 'text', 'rect')
+INDEXED_FIELDS = ('control_type', 'class_name', 'automation_id', 'text')
+FORMAT_VERSION = 1
+
+
+def _read_element(element: Any) -> Dict[str, Any]:
+    """要素の属性を1回ずつ取得する。取得できない属性は空値とする。"""
+    info = getattr(element, 'element_info', None)
+
+    def attr(name):
+        try:
+            return getattr(info, name, None) or ''
+        except Exception:
+            return ''
+
+    try:
+        text = element.window_text() or ''
+    except Exception:
+        text = ''
+
+    rect = (0, 0, 0, 0)
+    try:
+        r = info.rectangle
+        rect = (r.left, r.top, r.right, r.bottom)
+    except Exception:
+        pass
+
+    return {
+        'control_type': attr('control_type'),
+        'class_name': attr('class_name'),
+        'automation_id': attr('automation_id'),
+        'text': text,
+        'rect': rect,
+    }
+
+
+def _read_children(element: Any) -> List[Any]:
+    return element.children()
+
+
+class _UIACache:
+    """
+    UIA の CacheRequest で起点以下のツリーと属性を1回のプロセス間呼び出しで取得する。
+    以降の属性・子要素の参照はキャッシュから読むため、要素ごとの問い合わせが発生しない
+    （window_text() 相当の TextPattern のテキストのみ、該当する要素で個別に取得する）。
+    """
+
+    PROPERTIES = ('Name', 'ControlType', 'ClassName', 'AutomationId', 'BoundingRectangle',
+                  'IsTextPatternAvailable')
+
+    def __init__(self, subtree: bool):
+        from pywinauto.uia_defines import IUIA
+        self.uia = IUIA()
+        dll = self.uia.UIA_dll
+        self.request = self.uia.iuia.CreateCacheRequest()
+        for name in self.PROPERTIES:
+            self.request.AddProperty(getattr(dll, f'UIA_{name}PropertyId'))
+        # pywinauto の children() と同じく、条件なし（Raw View）でツリーを辿る
+        self.request.TreeFilter = self.uia.true_condition
+        self.request.TreeScope = self.uia.tree_scope['subtree' if subtree else 'element']
+        self.text_pattern_id = dll.UIA_IsTextPatternAvailablePropertyId
+
+    @staticmethod
+    def supports(roots: List[Any]) -> bool:
+        return all(getattr(getattr(root, 'element_info', None), 'element', None) is not None for root in roots)
+
+    def build(self, root: Any) -> Any:
+        return root.element_info.element.BuildUpdatedCache(self.request)
+
+    def read(self, element: Any) -> Dict[str, Any]:
+        def cached(name, default=''):
+            try:
+                return getattr(element, f'Cached{name}') or default
+            except Exception:
+                return default
+
+        class_name = cached('ClassName')
+        text = cached('Name')
+        # window_text() と同様に、クラス名のある要素は TextPattern のテキストを優先する
+        if class_name:
+            try:
+                if element.GetCachedPropertyValue(self.text_pattern_id):
+                    from pywinauto.uia_defines import get_elem_interface
+                    text = get_elem_interface(element, 'Text').DocumentRange.GetText(-1) or text
+            except Exception:
+                pass
+
+        rect = (0, 0, 0, 0)
+        try:
+            r = element.CachedBoundingRectangle
+            rect = (r.left, r.top, r.right, r.bottom)
+        except Exception:
+            pass
+
+        return {
+            'control_type': self.uia.known_control_type_ids.get(cached('ControlType', 0), ''),
+            'class_name': class_name,
+            'automation_id': cached('AutomationId'),
+            'text': text,
+            'rect': rect,
+        }
+
+    @staticmethod
+    def children(element: Any) -> List[Any]:
+        array = element.GetCachedChildren()
+        if not array:
+            return []
+        return [array.GetElement(i) for i in range(array.Length)]
+
+
+class UISnapshot:
+    """インデックス付きのUIツリースナップショット"""
+
+    def __init__(self, nodes: Optional[List[Dict[str, Any]]] = None, taken_at: Optional[float] = None):
+        """
+        Args:
+            nodes (Optional[List[Dict[str, Any]]]): ノードのリスト（幅優先順）。
+                各ノードは FIELDS のキーを持つ辞書。
+            taken_at (Optional[float]): 取得時刻（UNIX時刻）
+        """
+        self.nodes: List[Dict[str, Any]] = nodes or []
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self._index: Dict[str, Dict[str, List[int]]] = {}
+        self._build_index()
+
+    # ----- capture -----
+    @classmethod
+    def capture(cls, roots: Any, max_depth: Optional[int] = None,
+                predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                limit: Optional[int] = None) -> "UISnapshot":
+        """
+        ライブのUIツリーを幅優先で走査してスナップショットを作成する。
+        UIA の要素は CacheRequest でツリーと属性をまとめて取得し、それ以外（win32 バックエンド等）は
+        要素ごとに children() と属性を問い合わせる。
+
+        Args:
+            roots (Any): 起点となる要素、または要素のリスト（深さ0として記録）
+            max_depth (Optional[int]): 走査する最大深さ。Noneの場合は無制限。
+            predicate (Optional[Callable]): limit の対象として数えるノードの条件（Noneの場合は全ノード）
+            limit (Optional[int]): predicate に一致するノードをこの数だけ取り込んだ時点で走査を打ち切る
+                （打ち切った場合のスナップショットはツリーの一部だけを含む）
+
+        Returns:
+            UISnapshot: 作成したスナップショット
+        """
+        if not isinstance(roots, (list, tuple)):
+            roots = [roots]
+
+        start = time.perf_counter()
+        read, read_children = _read_element, _read_children
+        if roots and _UIACache.supports(roots):
+            try:
+                cache = _UIACache(subtree=max_depth != 0)
+                roots = [cache.build(root) for root in roots]
+                read, read_children = cache.read, cache.children
+            except Exception:
+                logger.debug("UIA cache request failed; walking the tree element by element", exc_info=True)
+
+        nodes: List[Dict[str, Any]] = []
+        queue = deque((root, -1, 0) for root in roots)
+        matched = 0
+
+        while queue:
+            element, parent, depth = queue.popleft()
+            node = read(element)
+            node['parent'] = parent
+            node['depth'] = depth
+            nodes.append(node)
+            index = len(nodes) - 1
+
+            if limit is not None and (predicate is None or predicate(node)):
+                matched += 1
+                if matched >= limit:
+                    logger.debug(f"UI snapshot stopped after {matched} matching elements")
+                    break
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+            try:
+                children = read_children(element)
+            except Exception:
+                logger.debug("Failed to read children during snapshot", exc_info=True)
+                continue
+            for child in children:
+                queue.append((child, index, depth + 1))
+
+        logger.debug(f"UI snapshot captured {len(nodes)} elements in {time.perf_counter() - start:.2f}s")
+        return cls(nodes)
+
+    # ----- index / query -----
+    def _build_index(self):
+        self._index = {field: {} for field in INDEXED_FIELDS}
+        for i, node in enumerate(self.nodes):
+            for field in INDEXED_FIELDS:
+                self._index[field].setdefault(node[field], []).append(i)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def query(self,
+              control_type: Optional[str] = None,
+              class_name: Optional[str] = None,
+              automation_id: Optional[str] = None,
+              text: Optional[str] = None,
+              text_contains: Optional[str] = None,
+              min_depth: int = 0) -> List[Dict[str, Any]]:
+        """
+        条件に一致するノードをインデックスから検索する。完全一致条件はインデックスの
+        積集合で絞り込み、text_contains（大文字小文字を区別しない部分一致）は最後に適用する。
+
+        Args:
+            control_type (Optional[str]): コントロールタイプ（完全一致）
+            class_name (Optional[str]): クラス名（完全一致）
+            automation_id (Optional[str]): AutomationId（完全一致）
+            text (Optional[str]): テキスト（完全一致）
+            text_contains (Optional[str]): テキスト部分一致
+            min_depth (int): 対象とする最小深さ（1で起点要素を除外）
+
+        Returns:
+            List[Dict[str, Any]]: 一致したノード（幅優先順）。各ノードには 'index' が付与される。
+        """
+        exact = {'control_type': control_type, 'class_name': class_name,
+                 'automation_id': automation_id, 'text': text}
+        candidates = None
+        for field, value in exact.items():
+            if not value:
+                continue
+            hits = set(self._index[field].get(value, ()))
+            candidates = hits if candidates is None else candidates & hits
+            if not candidates:
+                return []
+
+        indices = sorted(candidates) if candidates is not None else range(len(self.nodes))
+        needle = text_contains.lower() if text_contains else None
+
+        result = []
+        for i in indices:
+            node = self.nodes[i]
+            if node['depth'] < min_depth:
+                continue
+            if needle and needle not in node['text'].lower():
+                continue
+            result.append(dict(node, index=i))
+        return result
+
+    def paths(self) -> List[str]:
+        """
+        各ノードのルートからのパス文字列を返す（差分比較のキーに使用）。
+        子孫はコントロールタイプ（AutomationId があればそれも）と、同じキーの兄弟の中での序数で識別する。
+        テキストはキーに含めないため、テキストの変化は差分の 'changed' として検出される。
+        起点（トップレベルウィンドウ）は並び順が変わりやすいため、タイトルで識別する。
+        """
+        counts: Dict[tuple, int] = {}
+        paths: List[str] = []
+        for node in self.nodes:
+            if node['parent'] < 0:
+                base = f"{node['control_type']}[{node['automation_id'] or node['text']}]"
+            elif node['automation_id']:
+                base = f"{node['control_type']}[{node['automation_id']}]"
+            else:
+                base = node['control_type']
+            ordinal = counts.get((node['parent'], base), 0)
+            counts[(node['parent'], base)] = ordinal + 1
+            key = f"{base}#{ordinal}" if ordinal or base == node['control_type'] else base
+            paths.append(key if node['parent'] < 0 else f"{paths[node['parent']]}/{key}")
+        return paths
+
+    # ----- serialization -----
+    def save(self, path: str):
+        """
+        スナップショットをgzip圧縮したJSONに保存する。文字列は重複を除いた
+        文字列表に格納し、ノードはその添字の配列として記録する。
+
+        Args:
+            path (str): 保存先パス（例: 'before.uisnap.json.gz'）
+        """
+        strings: List[str] = []
+        lookup: Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            if value not in lookup:
+                lookup[value] = len(strings)
+                strings.append(value)
+            return lookup[value]
+
+        rows = []
+        for node in self.nodes:
+            rows.append([
+                node['parent'], node['depth'],
+                intern(node['control_type']), intern(node['class_name']),
+                intern(node['automation_id']), intern(node['text']),
+                *node['rect'],
+            ])
+
+        payload = {'version': FORMAT_VERSION, 'taken_at': self.taken_at, 'strings': strings, 'nodes': rows}
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> "UISnapshot":
+        """
+        save() で保存したスナップショットを読み込む。
+
+        Args:
+            path (str): スナップショットファイルのパス
+
+        Returns:
+            UISnapshot: 読み込んだスナップショット
+        """
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        if payload.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported UI snapshot version: {payload.get('version')}")
+
+        strings = payload['strings']
+        nodes = []
+        for row in payload['nodes']:
+            parent, depth, ct, cls_name, aid, text, *rect = row
+            nodes.append({
+                'parent': parent, 'depth': depth,
+                'control_type': strings[ct], 'class_name': strings[cls_name],
+                'automation_id': strings[aid], 'text': strings[text],
+                'rect': tuple(rect),
+            })
+        return cls(nodes, taken_at=payload.get('taken_at'))
+
+    # ----- diff -----
+    def diff(self, other: "UISnapshot") -> Dict[str, List[Dict[str, Any]]]:
+        """
+        このスナップショット（変更前）と other（変更後）を比較する。
+        ノードはルートからのパスで対応付ける。
+
+        Args:
+            other (UISnapshot): 変更後のスナップショット
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 'added' / 'removed' / 'changed' のノード一覧
+        """
+        before = dict(zip(self.paths(), self.nodes))
+        after = dict(zip(other.paths(), other.nodes))
+
+        added = [dict(after[p], path=p) for p in after if p not in before]
+        removed = [dict(before[p], path=p) for p in before if p not in after]
+        changed = []
+        for p in before.keys() & after.keys():
+            changes = {f: (before[p][f], after[p][f])
+                       for f in ('class_name', 'text', 'rect') if before[p][f] != after[p][f]}
+            if changes:
+                changed.append({'path': p, 'changes': changes})
+        changed.sort(key=lambda c: c['path'])
+        return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def format_node(node: Dict[str, Any]) -> str:
+    """ノードをデバッグ出力用の1行に整形する"""
+    aid = f", auto_id={node['automation_id']}" if node['automation_id'] else ''
+    return f"  [{node['text']}] control_type={node['control_type']}, class={node['class_name']}{aid}"
+
+
+def format_diff(diff: Dict[str, List[Dict[str, Any]]], limit: Optional[int] = None) -> Iterable[str]:
+    """差分結果をデバッグ出力用の行に整形する"""
+    for kind, mark in (('added', '+'), ('removed', '-')):
+        for node in diff[kind][:limit]:
+            yield f"  {mark} {node['path']}"
+    for change in diff['changed'][:limit]:
+        details = ', '.join(f"{k}: {a!r} -> {b!r}" for k, (a, b) in change['changes'].items())
+        yield f"  ~ {change['path']} ({details})"
@@ -0,0 +1,158 @@
+"""
+解決済みウィンドウ接続をキャッシュするユーティリティモジュール。
+プロセスIDごとの Application 接続と、検索条件ごとのウィンドウハンドルを記憶し、
+同一シナリオ内での繰り返しの connect / exists / Desktop 走査を省略する。
+"""
+import logging
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_window_pid(handle: int) -> Optional[int]:
+    """
+    ウィンドウハンドルが有効であれば所有プロセスIDを返す。無効な場合はNone。
+
+    Args:
+        handle (int): ウィンドウハンドル
+
+    Returns:
+        Optional[int]: 所有プロセスID
+    """
+    try:
+        import win32gui
+        import win32process
+
+        if not win32gui.IsWindow(handle):
+            return None
+        _, pid = win32process.GetWindowThreadProcessId(handle)
+        return pid
+    except Exception:
+        logger.debug(f"Failed to validate window handle {handle}", exc_info=True)
+        return None
+
+
+def window_matches(handle: int, criteria: Dict[str, Any]) -> bool:
+    """
+    ウィンドウの現在のタイトル・クラス名が検索条件（title / title_re / class_name / class_name_re）を
+    満たしているかを確認する。それ以外の条件は確認しない。
+
+    Args:
+        handle (int): ウィンドウハンドル
+        criteria (Dict[str, Any]): pywinauto の window() に渡した検索条件
+
+    Returns:
+        bool: 条件を満たしている場合True（取得に失敗した場合はFalse）
+    """
+    checks = [k for k in ('title', 'title_re', 'class_name', 'class_name_re') if criteria.get(k) is not None]
+    if not checks:
+        return True
+    try:
+        import win32gui
+        from src.utils.regex_pool import RegexPool
+
+        actual = {'title': win32gui.GetWindowText(handle), 'class_name': win32gui.GetClassName(handle)}
+    except Exception:
+        logger.debug(f"Failed to read title/class of window {handle}", exc_info=True)
+        return False
+    for name in checks:
+        if name.endswith('_re'):
+            # pywinauto と同じく先頭からの一致で判定する
+            if RegexPool.compile(criteria[name]).match(actual[name[:-3]]) is None:
+                return False
+        elif actual[name] != criteria[name]:
+            return False
+    return True
+
+
+class WindowCache:
+    """Application接続とウィンドウハンドルのキャッシュ"""
+
+    def __init__(self):
+        self._apps: Dict[Tuple[int, str], Any] = {}
+        self._windows: Dict[Hashable, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_app(self, pid: int, backend: str = 'uia'):
+        """
+        プロセスIDに接続済みのApplicationを返す。未接続であれば接続してキャッシュする。
+
+        Args:
+            pid (int): プロセスID
+            backend (str): pywinauto バックエンド
+
+        Returns:
+            Application: 接続済みのApplication
+        """
+        key = (pid, backend)
+        app = self._apps.get(key)
+        if app is not None and not app.is_process_running():
+            self._apps.pop(key, None)
+            self.invalidations += 1
+            app = None
+        if app is None:
+            from pywinauto import Application
+            app = Application(backend=backend).connect(process=pid)
+            self._apps[key] = app
+        return app
+
+    def get_window(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュされたウィンドウ情報を返す。ハンドルが無効、所有プロセスが変わっていた、
+        またはタイトル・クラス名が検索条件を満たさなくなった場合はエントリを破棄してNoneを返す。
+
+        Args:
+            key (Hashable): 検索条件から作成したキー
+
+        Returns:
+            Optional[Dict[str, Any]]: {'handle', 'pid', 'app'} を持つ辞書
+        """
+        entry = self._windows.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if (get_window_pid(entry['handle']) != entry['pid']
+                or not window_matches(entry['handle'], entry['criteria'])):
+            logger.debug(f"Cached window {entry['handle']} is no longer valid; re-resolving")
+            self._windows.pop(key, None)
+            self._apps.pop((entry['pid'], entry['backend']), None)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put_window(self, key: Hashable, handle: int, backend: str = 'uia', app: Any = None,
+                   criteria: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        解決したウィンドウハンドルをキャッシュする。
+
+        Args:
+            key (Hashable): 検索条件から作成したキー
+            handle (int): ウィンドウハンドル
+            backend (str): pywinauto バックエンド
+            app (Any): 接続に使用したApplication（Desktop検索の場合はNone）
+            criteria (Optional[Dict[str, Any]]): 検索条件（ヒット時にタイトル・クラス名を再確認する）
+
+        Returns:
+            bool: キャッシュできた場合True
+        """
+        pid = get_window_pid(handle) if handle else None
+        if pid is None:
+            return False
+        self._windows[key] = {'handle': handle, 'pid': pid, 'backend': backend, 'app': app,
+                              'criteria': dict(criteria or {})}
+        return True
+
+    def clear(self):
+        """すべてのエントリを破棄する"""
+        self._apps.clear()
+        self._windows.clear()
+
+    def format_stats(self) -> str:
+        """統計情報をログ出力用の文字列に整形する"""
+        return f"hits={self.hits}, misses={self.misses}, invalidations={self.invalidations}"
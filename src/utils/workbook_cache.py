@@ -0,0 +1,206 @@
+"""
+Excel ファイル検証用の読み取り専用ワークブックキャッシュ。
+ワークブックは openpyxl の read_only モード（ストリーミング）で開き、
+検証に必要なシートの必要な行だけを値として取り出して保持する。
+キーは (絶対パス, 更新時刻, サイズ) で、ファイルが書き換えられると自動的に読み直す。
+ファイルハンドルは読み込み後すぐに閉じるため、アプリケーションによる上書きを妨げない。
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import openpyxl
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, range_boundaries
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cell(cell: str) -> Tuple[int, int]:
+    """'B3' を (行, 列) = (3, 2) に変換する"""
+    column, row = coordinate_from_string(cell.replace('$', ''))
+    return row, column_index_from_string(column)
+
+
+def parse_range(cell_range: str) -> Tuple[int, int, int, int]:
+    """'A1:C3' を (min_row, min_col, max_row, max_col) に変換する"""
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range.replace('$', ''))
+    return min_row, min_col, max_row, max_col
+
+
+class CachedWorkbook:
+    """1つのワークブックから読み込んだシート名と行の値を保持するクラス"""
+
+    # 必要な行の後ろに続けて読み込んでおく行数（近い行を続けて検証する場合に開き直さない）
+    READ_AHEAD_ROWS = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sheetnames: List[str] = []
+        self.active: Optional[str] = None
+        # シート名 → {行番号: 値のタプル}
+        self.rows: Dict[str, Dict[int, Tuple[Any, ...]]] = {}
+        self.loads = 0
+        self._handle = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """
+        この中で必要になったワークブックは1回だけ開き、終了時に閉じる。
+        同じワークブックに対する並行した読み込みは直列化する。
+        """
+        with self._lock:
+            try:
+                yield self
+            finally:
+                if self._handle is not None:
+                    self._handle.close()
+                    self._handle = None
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+            self.loads += 1
+            if not self.sheetnames:
+                self.sheetnames = list(self._handle.sheetnames)
+                active = self._handle.active
+                self.active = active.title if active is not None else self.sheetnames[0]
+        return self._handle
+
+    def resolve_sheet(self, sheet_name: Optional[str]) -> str:
+        """シート名を確定する。未指定の場合はアクティブシート。"""
+        if not self.sheetnames:
+            self._open()
+        if sheet_name is None:
+            return self.active
+        if sheet_name not in self.sheetnames:
+            raise ValueError(f"Sheet '{sheet_name}' not found in workbook. Available sheets: {self.sheetnames}")
+        return sheet_name
+
+    def ensure_rows(self, needed: Dict[str, Iterable[int]]):
+        """
+        未読み込みの行をまとめて読み込む。session() の中で呼び出すこと。
+
+        Args:
+            needed (Dict[str, Iterable[int]]): シート名 → 必要な行番号
+        """
+        missing = {}
+        for sheet, rows in needed.items():
+            loaded = self.rows.get(sheet, {})
+            rows = sorted(set(r for r in rows if r not in loaded))
+            if rows:
+                missing[sheet] = rows
+        if not missing:
+            return
+
+        workbook = self._open()
+        for sheet, rows in missing.items():
+            loaded = self.rows.setdefault(sheet, {})
+            wanted = set(rows)
+            worksheet = workbook[sheet]
+            last = rows[-1] + self.READ_AHEAD_ROWS
+            for index, values in enumerate(
+                    worksheet.iter_rows(min_row=rows[0], max_row=last, values_only=True), start=rows[0]):
+                if index in wanted or index > rows[-1]:
+                    loaded.setdefault(index, values)
+            # シートの終端より後ろの行は空として記録する
+            for row in wanted:
+                loaded.setdefault(row, ())
+
+    def value(self, sheet: str, row: int, column: int) -> Any:
+        values = self.rows[sheet][row]
+        return values[column - 1] if column <= len(values) else None
+
+
+class WorkbookCache:
+    """(パス, 更新時刻, サイズ) をキーにした LRU ワークブックキャッシュ"""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], CachedWorkbook]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> CachedWorkbook:
+        """
+        ワークブックのキャッシュエントリを取得する。ファイルが変更されていれば作り直す。
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        abspath = os.path.abspath(path)
+        stat = os.stat(abspath)
+        key = (abspath, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            # 同じパスの古い版は破棄する
+            for old_key in [k for k in self._entries if k[0] == abspath]:
+                del self._entries[old_key]
+            entry = CachedWorkbook(abspath)
+            self._entries[key] = entry
+            self.misses += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def read(self, path: str, refs: Iterable[Tuple[Optional[str], str]]) -> List[Tuple[str, Any]]:
+        """
+        複数のセル・範囲の値を1回の読み込みで取得する。
+
+        Args:
+            path (str): Excel ファイルのパス
+            refs (Iterable[Tuple[Optional[str], str]]): (シート名, セルまたは範囲) のリスト。
+                シート名が None の場合はアクティブシート。
+
+        Returns:
+            List[Tuple[str, Any]]: refs と同じ順の (確定したシート名, 値)。
+                範囲の場合の値は行ごとのリストのリスト。
+        """
+        workbook = self.get(path)
+        resolved = []
+        needed: Dict[str, set] = {}
+        with workbook.session():
+            for sheet_name, ref in refs:
+                sheet = workbook.resolve_sheet(sheet_name)
+                if ':' in ref:
+                    min_row, min_col, max_row, max_col = parse_range(ref)
+                else:
+                    min_row, min_col = max_row, max_col = parse_cell(ref)
+                resolved.append((sheet, ref, min_row, min_col, max_row, max_col))
+                needed.setdefault(sheet, set()).update(range(min_row, max_row + 1))
+
+            workbook.ensure_rows(needed)
+
+        result = []
+        for sheet, ref, min_row, min_col, max_row, max_col in resolved:
+            if ':' in ref:
+                value = [[workbook.value(sheet, r, c) for c in range(min_col, max_col + 1)]
+                         for r in range(min_row, max_row + 1)]
+            else:
+                value = workbook.value(sheet, min_row, min_col)
+            result.append((sheet, value))
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by all FileValidator calls so repeated checks of the same output file reuse loaded rows
+workbook_cache = WorkbookCache()
@@ -7,7 +7,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pytest
 import shutil
 import logging
-import base64
+import time
 from datetime import datetime
 
 try:
@@ -18,12 +18,19 @@ except ImportError:
 # モジュールレベル変数：セッション全体で共有する実行フォルダ名
 _run_folder_name = None
 
+# pytest-html のレポート生成時間（meta.json の report.generation_seconds）
+_report_timing = {"start": None, "seconds": None}
+
 from src.core.context import Context
 from src.core.scenario_loader import ScenarioLoader
 from src.utils.driver_factory import DriverFactory
 from src.utils.web_driver_factory import WebDriverFactory
 from src.core.execution.runner import Runner
 from src.utils.screenshot import ScreenshotManager
+from src.utils.report_attachments import ReportAttachments, report_href
+from src.utils.screen_recorder import ScreenRecorder
+from src.utils.dialog_watcher import DialogWatcher
+from src.utils.regex_pool import RegexPool
 from src.utils.run_context import get_run_folder_name
 
 def _get_run_folder():
@@ -33,6 +40,22 @@ def _get_run_folder():
         _run_folder_name = get_run_folder_name()
     return _run_folder_name
 
+class _ReportTimerStart:
+    """pytest_sessionfinish の最初（tryfirst）に計測を開始する"""
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session):
+        _report_timing["start"] = time.perf_counter()
+
+class _ReportTimerEnd:
+    """
+    pytest-html のレポート書き出し（trylast の pytest_sessionfinish）の後に経過時間を記録する。
+    trylast 同士は登録順に呼ばれるため、pytest-html の登録後（pytest_sessionstart）に登録する。
+    """
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if _report_timing["start"] is not None:
+            _report_timing["seconds"] = time.perf_counter() - _report_timing["start"]
+
 def pytest_configure(config):
     """pytest起動時にHTMLレポートの出力パスを設定"""
     run_folder = _get_run_folder()
@@ -43,10 +66,17 @@ def pytest_configure(config):
     html_report_path = os.path.join(base_reports, 'report.html')
     config.option.htmlpath = html_report_path
     config.option.self_contained_html = True
+    config.pluginmanager.register(_ReportTimerStart(), "report-timer-start")
+
+def pytest_sessionstart(session):
+    """pytest-html の登録後にレポート生成時間の計測終了フックを登録"""
+    session.config.pluginmanager.register(_ReportTimerEnd(), "report-timer-end")
 
 def pytest_addoption(parser):
     parser.addoption("--env", action="store", default="DEFAULT", help="Environment to run tests against")
     parser.addoption("--tag", action="store", default="", help="Filter scenarios by tag")
+    parser.addoption("--update-baselines", action="store_true", default=False,
+                     help="Overwrite baseline images (image_match) and manifests (directory_manifest) instead of comparing")
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_session(request):
@@ -67,11 +97,32 @@ def setup_session(request):
     
     # Contextに保存（config.iniの値を上書き）
     context.set_variable('SCREENSHOTDIR', screenshot_dir)
+    if request.config.getoption("--update-baselines"):
+        context.set_variable('UPDATE_BASELINES', True)
     
     # ディレクトリを作成
     os.makedirs(base_reports, exist_ok=True)
     os.makedirs(screenshot_dir, exist_ok=True)
     
+    # スクリーンショット設定（config.iniの[SCREENSHOT]セクション）
+    if context.config.has_section('SCREENSHOT'):
+        ScreenshotManager.configure(dict(context.config['SCREENSHOT']))
+    # レポート添付設定（config.iniの[REPORT]セクション）
+    if context.config.has_section('REPORT'):
+        ReportAttachments.configure(dict(context.config['REPORT']))
+    # 正規表現プールの設定（config.iniの[REGEX]セクション）
+    if context.config.has_section('REGEX'):
+        RegexPool.configure(dict(context.config['REGEX']))
+    # 予期しないダイアログの監視設定（config.iniの[DIALOG_WATCHER]セクション）
+    if context.config.has_section('DIALOG_WATCHER'):
+        DialogWatcher.configure(dict(context.config['DIALOG_WATCHER']))
+    # 直近の画面をメモリ上に録画（config.iniの[RECORDER]セクションで有効化）
+    if context.config.has_section('RECORDER'):
+        recorder = ScreenRecorder.from_config(dict(context.config['RECORDER']))
+        if recorder:
+            recorder.start()
+            request.config._screen_recorder = recorder
+    
     # ログファイルの設定
     log_file = os.path.join(base_reports, f'run_{run_folder}.log')
     file_handler = logging.FileHandler(log_file, encoding='utf-8')
@@ -102,6 +153,21 @@ def setup_session(request):
     
     DriverFactory.close_app()
 
+    recorder = getattr(request.config, '_screen_recorder', None)
+    if recorder:
+        recorder.stop()
+        logging.info(f"Screen recorder stats: {recorder.stats()}")
+
+    # Finish background screenshot writes before the session ends
+    ScreenshotManager.shutdown()
+
+    from src.utils.process_snapshot import process_snapshot
+    logging.info(f"Process snapshot stats: {process_snapshot.format_stats()}")
+    from src.pages.base_page import BasePage
+    logging.info(f"Window cache stats: {BasePage._window_cache.format_stats()}")
+    logging.info(f"Regex pool stats: {RegexPool.format_stats()}")
+    RegexPool.shutdown()
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_collection_modifyitems(session, config, items):
     """Log execution details after collection."""
@@ -153,27 +219,47 @@ def pytest_runtest_makereport(item, call):
             test_name = context.get_current_test_name()
             
             # Generate filename using new format
-            filename = generate_fail_filename(test_id, test_name)
+            # 拡張子は ScreenshotManager の設定（[SCREENSHOT] Format）に合わせる
+            filename = os.path.splitext(generate_fail_filename(test_id, test_name))[0]
             
             # Use ScreenshotManager to take the screenshot
             manager = ScreenshotManager(output_dir=output_dir)
             screenshot_path = manager.capture_screen(filename=filename)
             
+            # Wait for background writes (including this one) before the report links the file
+            ScreenshotManager.flush()
+            
             if screenshot_path:
                 logging.info(f"Screenshot saved to {screenshot_path}")
             else:
                 logging.warning("Failed to take screenshot.")
         except Exception as e:
             logging.error(f"Failed to take screenshot: {e}")
+
+        # 失敗直前の画面録画をスクリーンショットの隣に書き出す
+        recorder = getattr(item.config, '_screen_recorder', None)
+        if recorder:
+            try:
+                base = os.path.splitext(screenshot_path)[0] if screenshot_path else os.path.join(
+                    Context().get_variable('SCREENSHOTDIR', 'reports/screenshots'), f"FAIL_{item.name}")
+                recording_path = recorder.dump(
+                    f"{base}_recording.png" if recorder.dump_format == 'apng' else f"{base}_recording")
+                if recording_path and pytest_html is not None:
+                    extras = getattr(rep, "extras", [])
+                    href = report_href(recording_path, getattr(item.config.option, 'htmlpath', None))
+                    extras.append(pytest_html.extras.url(href, name="Screen recording"))
+                    rep.extras = extras
+            except Exception as e:
+                logging.error(f"Failed to save screen recording: {e}")
         
         # HTMLレポートにスクリーンショットを添付
-        if pytest_html is not None and screenshot_path and os.path.exists(screenshot_path):
+        # フルサイズ画像はファイルへのリンクとし、メモリ上の画像から作ったサムネイルのみ埋め込む
+        if pytest_html is not None and screenshot_path:
             try:
                 extras = getattr(rep, "extras", [])
-                # base64エンコードで画像を埋め込み（self-contained対応）
-                with open(screenshot_path, 'rb') as f:
-                    image_data = base64.b64encode(f.read()).decode('utf-8')
-                extras.append(pytest_html.extras.png(image_data))
+                extras.append(ReportAttachments.build_extra(
+                    pytest_html.extras, manager.last_image, screenshot_path,
+                    getattr(item.config.option, 'htmlpath', None)))
                 rep.extras = extras
             except Exception as e:
                 logging.error(f"Failed to attach screenshot to report: {e}")
@@ -193,8 +279,10 @@ def pytest_generate_tests(metafunc):
         
         metafunc.parametrize("scenario", scenarios, ids=ids)
 
+@pytest.hookimpl(hookwrapper=True)
 def pytest_sessionfinish(session, exitstatus):
-    """Generate meta.json at the end of the session."""
+    """Generate meta.json at the end of the session (after pytest-html has written the report)."""
+    yield
     try:
         from src.utils.meta_info import collect_meta_info
         
@@ -229,6 +317,14 @@ def pytest_sessionfinish(session, exitstatus):
         }
 
         meta_data = collect_meta_info(run_folder, cases_stats, artifacts)
+        meta_data["screenshots"] = ScreenshotManager.stats()
+        report_path = getattr(session.config.option, 'htmlpath', None)
+        report_seconds = _report_timing["seconds"]
+        meta_data["report"] = {
+            "generation_seconds": round(report_seconds, 3) if report_seconds is not None else None,
+            "size_bytes": os.path.getsize(report_path) if report_path and os.path.exists(report_path) else None,
+            "attachments": ReportAttachments.stats(),
+        }
         
         meta_json_path = os.path.join(base_reports, 'meta.json')
         import json